@@ -1,7 +1,14 @@
 # agents/base_agent.py
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any
-from models.groq_models import GroqModelManager
+from models.groq_models import get_groq_manager
+from utils.logging_config import get_logger
+from utils.metrics import PROMPT_BUILD_SECONDS
+from utils.request_context import agent_scope
+from utils.tracing import start_span
+from utils.turn_events import AGENT_STARTED, publish
+
+logger = get_logger("agent")
 
 class BaseSDLCAgent(ABC):
     def __init__(self, name: str, role: str, expertise: List[str]):
@@ -14,14 +21,15 @@ class BaseSDLCAgent(ABC):
     @property
     def groq_manager(self):
         if self._groq_manager is None:
-            self._groq_manager = GroqModelManager()
+            self._groq_manager = get_groq_manager()
         return self._groq_manager
 
     @abstractmethod
     def get_system_prompt(self) -> str:
         pass
 
-    async def process_request(self, user_input: str, context: Dict[str, Any]) -> str:
+    def build_messages(self, user_input: str, context: Dict[str, Any]) -> List[Dict[str, str]]:
+        """System + user messages for a request, with uploaded files folded into the context"""
         # Check if this is a direct call to this agent
         is_direct_call = context.get("direct_call", False)
         interaction_type = context.get("interaction_type", "")
@@ -71,40 +79,34 @@ class BaseSDLCAgent(ABC):
         # Additional safety check - if context is still too large, truncate further
         total_length = len(self.get_system_prompt()) + len(context_str) + len(user_input)
         if total_length > 15000:  # Conservative limit to avoid token issues
-            print(f"[AGENT] Warning: Context very large ({total_length} chars), truncating...")
+            logger.warning("Context very large (%d chars), truncating", total_length)
             # Reduce context_str if needed
             if len(context_str) > 10000:
                 context_str = context_str[:10000] + "\n[Context truncated for processing...]"
                 messages[1]["content"] = f"{context_str}\n\nRequest: {user_input}"
 
-        try:
-            completion = await self.groq_manager.get_completion(
-                role=self.role,
-                messages=messages,
-                temperature=0.7
-            )
+        return messages
+
+    async def process_request(self, user_input: str, context: Dict[str, Any]) -> str:
+        with agent_scope(self.role), start_span("agent", {"agent.role": self.role, "agent.name": self.name}) as span:
+            publish(AGENT_STARTED, agent=self.role)
+            with PROMPT_BUILD_SECONDS.time(role=self.role):
+                messages = self.build_messages(user_input, context)
 
-            # Handle streaming response from Groq
-            full_response = ""
             try:
-                for chunk in completion:
-                    if hasattr(chunk, 'choices') and len(chunk.choices) > 0:
-                        delta = chunk.choices[0].delta
-                        if hasattr(delta, 'content') and delta.content:
-                            full_response += delta.content
-            except Exception as stream_err:
-                print(f"[AGENT] Streaming error for {self.name}: {stream_err}")
-                # Fallback: try to get the response as a whole
-                if hasattr(completion, 'choices') and len(completion.choices) > 0:
-                    message = completion.choices[0].message
-                    if hasattr(message, 'content'):
-                        full_response = message.content
-            
-            result = full_response.strip() if full_response else f"I'm {self.name}, ready to help with {self.role} tasks."
-            print(f"[AGENT] {self.name} generated {len(result)} chars: {result[:100]}...")
-            return result
-            
-        except Exception as e:
-            error_msg = f"Error in {self.name}: {str(e)}"
-            print(f"[AGENT] {error_msg}")
-            return error_msg
\ No newline at end of file
+                full_response = await self.groq_manager.generate(
+                    role=self.role,
+                    messages=messages,
+                    temperature=0.7
+                )
+
+                result = full_response.strip() if full_response else f"I'm {self.name}, ready to help with {self.role} tasks."
+                span.set_attribute("response.chars", len(result))
+                logger.debug("%s generated %d chars", self.name, len(result))
+                return result
+
+            except Exception as e:
+                error_msg = f"Error in {self.name}: {str(e)}"
+                logger.error("Error in %s: %s", self.name, e)
+                span.record_exception(e)
+                return error_msg
\ No newline at end of file
@@ -0,0 +1 @@
+# benchmarks package - end-to-end and hot-path benchmarks for the FLUX backend
@@ -0,0 +1,90 @@
+# benchmarks/bench_hot_paths.py
+"""
+Microbenchmarks for the pure-CPU parts of a turn.
+
+Each benchmark runs one pass over the fixture corpus per round, so results
+read as "time to route/build/store the whole corpus once". Run from backend/:
+
+    pip install -r requirements_bench.txt
+    python -m pytest benchmarks --benchmark-autosave           # record a baseline
+    python -m pytest benchmarks --benchmark-compare            # diff against the last saved run
+"""
+import pytest
+
+from benchmarks import corpus
+
+ROUNDS = 200
+
+
+def _routing_states(messages):
+    return [{"user_request": m, "requested_agents": [], "called_agent": None} for m in messages]
+
+
+def test_route_from_entry(benchmark, workflow, messages, uncached_routing):
+    def run(states):
+        return [workflow._route_entry_point(state) for state in states]
+
+    routes = benchmark.pedantic(run, setup=lambda: ((_routing_states(messages),), {}), rounds=ROUNDS)
+    assert len(routes) == len(messages)
+
+
+def test_route_from_entry_cached(benchmark, workflow, messages):
+    """Repeated traffic: short messages are answered by the routing cache"""
+    def run(states):
+        return [workflow._route_entry_point(state) for state in states]
+
+    run(_routing_states(messages))
+    routes = benchmark.pedantic(run, setup=lambda: ((_routing_states(messages),), {}), rounds=ROUNDS)
+    assert len(routes) == len(messages)
+
+
+def test_a2a_mention_scan(benchmark, workflow):
+    def run(states):
+        return [
+            workflow._resolve_collaboration_agents(state, list(state["requested_agents"]), None)
+            for state in states
+        ]
+
+    results = benchmark.pedantic(run, setup=lambda: ((corpus.collaboration_states(),), {}), rounds=ROUNDS)
+    assert len(results) == len(corpus.MESSAGES)
+
+
+def test_simple_router_detect_called_agent(benchmark, simple_router, messages):
+    results = benchmark(lambda: [simple_router.detect_called_agent(m) for m in messages])
+    assert any(results)
+
+
+def test_simple_router_select_best_agent(benchmark, simple_router, messages):
+    results = benchmark(lambda: [simple_router._select_best_agent(m) for m in messages])
+    assert any(results)
+
+
+def test_main_minimal_detect_target_agents(benchmark, main_minimal, messages, uncached_routing):
+    results = benchmark(lambda: [main_minimal.detect_target_agents(m) for m in messages])
+    assert any(results)
+
+
+def test_agent_build_messages(benchmark, agent, messages):
+    contexts = corpus.agent_contexts()
+    pairs = [(messages[i % len(messages)], context) for i, context in enumerate(contexts)]
+    results = benchmark(lambda: [agent.build_messages(message, context) for message, context in pairs])
+    assert all(len(m) == 2 for m in results)
+
+
+@pytest.mark.parametrize("history_length", corpus.SESSION_HISTORY_LENGTHS)
+def test_session_read_update_cycle(benchmark, session_manager, history_length):
+    """One turn's worth of session I/O: read, append user + agent messages, update context"""
+    session_ids = [f"bench_{history_length}_{i}" for i in range(10)]
+    for session_id in session_ids:
+        session_manager.create_session(session_id, corpus.session_payload(history_length))
+    user_message, agent_message = corpus.history_message(0), corpus.history_message(1)
+
+    def run():
+        for session_id in session_ids:
+            session_manager.get_session(session_id)
+            session_manager.add_message_to_history(session_id, user_message)
+            session_manager.add_message_to_history(session_id, agent_message)
+            session_manager.update_session(session_id, {"current_phase": "collaboration"})
+
+    benchmark(run)
+    assert session_manager.get_session(session_ids[0])["current_phase"] == "collaboration"
@@ -0,0 +1,62 @@
+# benchmarks/conftest.py
+import os
+
+import pytest
+
+# main_minimal exits at import without a key; no request is ever sent from these benchmarks
+os.environ.setdefault("GROQ_API_KEY", "bench")
+
+from benchmarks import corpus
+
+
+@pytest.fixture(scope="session")
+def messages():
+    return list(corpus.MESSAGES)
+
+
+@pytest.fixture(scope="session")
+def workflow():
+    from workflows.sdlc_workflow import SDLCWorkflow
+    return SDLCWorkflow()
+
+
+@pytest.fixture
+def uncached_routing():
+    """Route every message from scratch; the routing cache would answer every round after the first"""
+    from core.routing_cache import get_routing_cache
+    cache = get_routing_cache()
+    size, cache.size = cache.size, 0
+    yield
+    cache.size = size
+
+
+@pytest.fixture(scope="session")
+def simple_router():
+    from core.simple_agent_router import SimpleAgentRouter
+    return SimpleAgentRouter()
+
+
+@pytest.fixture(scope="session")
+def main_minimal():
+    import main_minimal
+    return main_minimal
+
+
+@pytest.fixture(scope="session")
+def agent():
+    from agents.software_architect import SoftwareArchitect
+    return SoftwareArchitect()
+
+
+@pytest.fixture(params=["memory", "redis"])
+def session_manager(request):
+    from utils.session_manager import SessionManager
+    manager = SessionManager()
+    if request.param == "memory" and manager.redis_available:
+        manager.redis_available = False
+        manager.memory_storage = {}
+    elif request.param == "redis" and not manager.redis_available:
+        pytest.skip("Redis not reachable (REDIS_HOST/REDIS_PORT)")
+    yield manager
+    for session_id in [s for s in manager.get_active_sessions() if s.startswith("bench_")]:
+        manager.delete_session(session_id)
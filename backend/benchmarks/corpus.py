@@ -0,0 +1,106 @@
+# benchmarks/corpus.py
+"""
+Fixture corpus for the hot-path microbenchmarks.
+
+A fixed, realistic spread of chat traffic: direct calls by name, greetings,
+team calls, keyword-only requests, A2A mentions and dismissals, plus session
+payloads of increasing history length. Every benchmark round walks the whole
+corpus so timings are comparable between runs.
+"""
+from datetime import datetime
+from typing import Dict, List
+
+from benchmarks.scenarios import PROJECT_CONTEXT, _uploaded_spec
+
+MESSAGES: List[str] = [
+    # Direct calls by name (main.py / main_simple.py / main_minimal.py naming)
+    "Hi Marc, how should we structure the API layer for the payments service?",
+    "Hey Alex, can you sketch the data access code for the order repository?",
+    "Hello Jess, what test cases would you write for the checkout flow?",
+    "Dave, what does a zero-downtime deployment look like for this service?",
+    "Sara, can you turn these notes into user stories with acceptance criteria?",
+    "Emma, how should we plan the next two sprints?",
+    "Rob, what are the main security risks in our login flow?",
+    "@marc what do you think about splitting the monolith?",
+    "I would like to talk to Marc about caching",
+    "Can you bring in Jess to review the test plan?",
+    # Team calls
+    "Hi everyone, let's kick off the payments project.",
+    "Hello team, please give me a quick status on the mobile release.",
+    "Hi everybody, what do we need to ship the MVP by next month?",
+    "Let's brainstorm the onboarding flow together",
+    # Keyword-only requests
+    "What are the requirements for the reporting module?",
+    "We need a system design for real-time notifications",
+    "Please implement a retry wrapper around the billing client",
+    "How do we improve test coverage for the search service?",
+    "Set up the deployment pipeline on kubernetes",
+    "Give me a project timeline with milestones",
+    "Is our authentication vulnerable to session fixation?",
+    # Dismissals, thanks and no-op chatter
+    "Thanks Alex, you can drop off now",
+    "Thank you Jess, that's all for today",
+    "ok",
+    "Sounds good, let's continue tomorrow",
+    # Long message with several mentions
+    "Marc and Alex, the new ingestion service needs a design review and an implementation plan; "
+    "Jess should weigh in on test strategy and Dave on rollout. " * 4,
+]
+
+AGENT_RESPONSES: Dict[str, str] = {
+    "software_architect": (
+        "I'd split this into three services behind a gateway. Alex can own the data access layer, "
+        "Jessica should define contract tests, and David will need to plan the rollout."
+    ),
+    "developer": "Here's a sketch of the repository class with async methods for reads and writes. " * 6,
+    "qa_tester": "I'd cover the happy path, declined cards, timeouts and retries. Robert should review auth.",
+}
+
+
+def collaboration_states() -> List[dict]:
+    """SDLCState-shaped dicts for the A2A mention scan, one per corpus message"""
+    return [
+        {
+            "user_request": message,
+            "requested_agents": [],
+            "called_agent": None,
+            "project_context": dict(PROJECT_CONTEXT),
+            "uploaded_files": [],
+            "agent_outputs": dict(AGENT_RESPONSES),
+            "conversation_history": [],
+        }
+        for message in MESSAGES
+    ]
+
+
+def agent_contexts() -> List[dict]:
+    """Contexts of the shapes process_request sees: bare, direct call, collaboration, uploads"""
+    previous = dict(AGENT_RESPONSES)
+    return [
+        dict(PROJECT_CONTEXT),
+        {**PROJECT_CONTEXT, "direct_call": True, "interaction_type": "The user is speaking to you directly."},
+        {**PROJECT_CONTEXT, "previous_responses": previous, "conversation_flow": "ongoing multi-agent collaboration"},
+        {**PROJECT_CONTEXT, "uploaded_files": [_uploaded_spec(2000)]},
+        {**PROJECT_CONTEXT, "uploaded_files": [_uploaded_spec(20000), _uploaded_spec(5000)]},
+    ]
+
+
+def history_message(i: int) -> dict:
+    return {
+        "type": "agent_response" if i % 2 else "user_message",
+        "agent": "Marc (Software Architect)" if i % 2 else "user",
+        "message": f"Turn {i}: discussing service boundaries, data ownership and rollout order. " * 3,
+        "timestamp": datetime.now().isoformat(),
+    }
+
+
+def session_payload(history_length: int) -> dict:
+    return {
+        "project_context": dict(PROJECT_CONTEXT),
+        "conversation_history": [history_message(i) for i in range(history_length)],
+        "agent_outputs": dict(AGENT_RESPONSES),
+    }
+
+
+# History lengths to benchmark session reads/updates at (SessionManager keeps the last 50)
+SESSION_HISTORY_LENGTHS = [0, 10, 50]
@@ -0,0 +1,276 @@
+# benchmarks/e2e.py
+"""
+End-to-end WebSocket benchmark for the FLUX backends (replaces perf_test.py).
+
+Runs N concurrent sessions, each sending a weighted mix of scenarios
+(direct call, team call, file upload, long history), and records per turn:
+time to first agent response, time to completion, and frames received.
+Results are summarized as p50/p95/p99 per scenario and written as JSON for
+run-to-run comparison.
+
+Examples (from backend/):
+    # Against an already running server
+    python -m benchmarks.e2e --url ws://localhost:8000 --sessions 10 --turns 5
+
+    # Spawn the mock LLM and each app in turn, fully offline
+    python -m benchmarks.e2e --spawn main,main_simple,main_minimal --mock \
+        --sessions 20 --turns 5 --mix direct=4,team=1,upload=1,history=1 --output bench.json
+
+    # Compare against a previous run
+    python -m benchmarks.e2e --url ws://localhost:8000 --compare bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.request
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import websockets
+
+from benchmarks.scenarios import SCENARIOS
+from benchmarks.stats import summarize
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMPLETION_STATUSES = {"completed", "error", "ready"}
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario '{name}'. Available: {', '.join(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def _is_completion(frame: dict) -> bool:
+    # main.py / main_simple.py send status_update, main_minimal.py sends status
+    return frame.get("type") in ("status_update", "status") and frame.get("status") in COMPLETION_STATUSES
+
+
+async def run_turn(ws, payload: dict, timeout: float) -> dict:
+    started = time.perf_counter()
+    first_response = None
+    frames = 0
+    agent_responses = 0
+    error = None
+    await ws.send(json.dumps(payload))
+    try:
+        while True:
+            remaining = timeout - (time.perf_counter() - started)
+            frame = json.loads(await asyncio.wait_for(ws.recv(), timeout=max(0.001, remaining)))
+            frames += 1
+            if frame.get("type") == "agent_response":
+                if frame.get("agent") == "system" or frame.get("status") == "error":
+                    error = error or "agent_error"
+                else:
+                    agent_responses += 1
+                    if first_response is None:
+                        first_response = time.perf_counter() - started
+            if _is_completion(frame):
+                if frame.get("status") == "error":
+                    error = error or "turn_error"
+                break
+    except asyncio.TimeoutError:
+        error = "timeout"
+    except websockets.ConnectionClosed:
+        error = "disconnected"
+    return {
+        "ttft": first_response,
+        "complete": time.perf_counter() - started,
+        "frames": frames,
+        "agent_responses": agent_responses,
+        "error": error,
+    }
+
+
+async def run_session(url: str, index: int, turns: int, mix: Dict[str, float], seed: int, timeout: float) -> List[dict]:
+    rng = random.Random(seed + index)
+    session_id = f"bench_{index}_{uuid.uuid4().hex[:8]}"
+    results = []
+    async with websockets.connect(f"{url}/ws/{session_id}", max_size=None) as ws:
+        # Wait for the connection ack so it is not counted against the first turn
+        while True:
+            frame = json.loads(await asyncio.wait_for(ws.recv(), timeout=timeout))
+            if frame.get("status") == "connected":
+                break
+        for _ in range(turns):
+            scenario = rng.choices(list(mix), weights=list(mix.values()))[0]
+            result = await run_turn(ws, SCENARIOS[scenario](rng), timeout)
+            result["scenario"] = scenario
+            results.append(result)
+    return results
+
+
+async def run_target(url: str, sessions: int, turns: int, mix: Dict[str, float], seed: int, timeout: float) -> dict:
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(
+        *[run_session(url, i, turns, mix, seed, timeout) for i in range(sessions)], return_exceptions=True
+    )
+    wall = time.perf_counter() - started
+
+    turns_done = []
+    failed_sessions = 0
+    for outcome in outcomes:
+        if isinstance(outcome, Exception):
+            failed_sessions += 1
+            print(f"  ❌ Session failed: {outcome}")
+        else:
+            turns_done.extend(outcome)
+
+    def block(rows: List[dict]) -> dict:
+        return {
+            "turns": len(rows),
+            "errors": sum(1 for r in rows if r["error"]),
+            "ttft": summarize([r["ttft"] for r in rows if r["ttft"] is not None]),
+            "complete": summarize([r["complete"] for r in rows if not r["error"]]),
+            "frames": summarize([r["frames"] for r in rows]),
+            "agent_responses": summarize([r["agent_responses"] for r in rows]),
+        }
+
+    return {
+        "wall_seconds": wall,
+        "failed_sessions": failed_sessions,
+        "turns_per_second": len(turns_done) / wall if wall else None,
+        "overall": block(turns_done),
+        "scenarios": {name: block([r for r in turns_done if r["scenario"] == name]) for name in mix},
+    }
+
+
+def _wait_healthy(base_url: str, timeout: float = 60.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base_url}/health", timeout=2) as response:
+                if response.status == 200:
+                    return
+        except Exception:
+            time.sleep(0.5)
+    raise RuntimeError(f"{base_url} did not become healthy within {timeout:.0f}s")
+
+
+@contextmanager
+def spawned(module: str, port: int, env: dict):
+    """Run `module:app` under uvicorn for the duration of the block"""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", f"{module}:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_healthy(f"http://127.0.0.1:{port}")
+        yield f"ws://127.0.0.1:{port}"
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def print_report(name: str, result: dict) -> None:
+    print(f"\n🏁 {name}: {result['overall']['turns']} turns in {result['wall_seconds']:.1f}s "
+          f"({result['turns_per_second'] or 0:.2f} turns/s, {result['overall']['errors']} errors)")
+    print(f"  {'scenario':<10} {'turns':>5} {'err':>4} {'ttft p50':>9} {'p95':>7} {'p99':>7} "
+          f"{'done p50':>9} {'p95':>7} {'p99':>7} {'frames':>7}")
+
+    def fmt(value):
+        return f"{value:7.2f}" if value is not None else "      -"
+
+    for scenario, block in list(result["scenarios"].items()) + [("overall", result["overall"])]:
+        ttft, done = block["ttft"], block["complete"]
+        print(f"  {scenario:<10} {block['turns']:>5} {block['errors']:>4}   {fmt(ttft['p50'])} {fmt(ttft['p95'])} "
+              f"{fmt(ttft['p99'])}   {fmt(done['p50'])} {fmt(done['p95'])} {fmt(done['p99'])} "
+              f"{fmt(block['frames']['mean'])}")
+
+
+def print_comparison(current: dict, baseline: dict) -> None:
+    print("\n📊 Change vs baseline (positive = slower)")
+    for target, result in current["targets"].items():
+        previous = baseline.get("targets", {}).get(target)
+        if not previous:
+            print(f"  {target}: no baseline")
+            continue
+        for metric in ("ttft", "complete"):
+            for p in ("p50", "p95", "p99"):
+                now, before = result["overall"][metric][p], previous["overall"][metric][p]
+                if now is not None and before:
+                    print(f"  {target:<14} {metric:<9} {p}: {before:6.2f}s -> {now:6.2f}s ({(now - before) / before:+.1%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FLUX end-to-end WebSocket benchmark")
+    parser.add_argument("--url", default="ws://localhost:8000", help="Running server to benchmark")
+    parser.add_argument("--spawn", help="Comma-separated app modules to launch in turn (main,main_simple,main_minimal)")
+    parser.add_argument("--port", type=int, default=8765, help="Port for spawned apps")
+    parser.add_argument("--mock", action="store_true", help="Spawn mock_llm_server.py and point spawned apps at it")
+    parser.add_argument("--mock-port", type=int, default=9000)
+    parser.add_argument("--sessions", type=int, default=5)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--mix", default="direct=4,team=1,upload=1,history=1")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-turn timeout in seconds")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--compare", help="Previous JSON results to diff against")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "sessions": args.sessions,
+            "turns": args.turns,
+            "mix": mix,
+            "seed": args.seed,
+            "mock": args.mock,
+        },
+        "targets": {},
+    }
+
+    def bench(name: str, url: str):
+        print(f"\n🧪 Benchmarking {name} at {url} ({args.sessions} sessions x {args.turns} turns)")
+        result = asyncio.run(run_target(url, args.sessions, args.turns, mix, args.seed, args.timeout))
+        report["targets"][name] = result
+        print_report(name, result)
+
+    if args.spawn:
+        env = dict(os.environ)
+        mock = None
+        if args.mock:
+            env.setdefault("GROQ_API_KEY", "mock")
+            env["GROQ_BASE_URL"] = f"http://127.0.0.1:{args.mock_port}"
+            mock = subprocess.Popen([sys.executable, "mock_llm_server.py", "--port", str(args.mock_port)],
+                                    cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            _wait_healthy(env["GROQ_BASE_URL"])
+        try:
+            for module in [m.strip() for m in args.spawn.split(",") if m.strip()]:
+                with spawned(module, args.port, env) as url:
+                    bench(module, url)
+        finally:
+            if mock:
+                mock.terminate()
+    else:
+        bench(args.url, args.url)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
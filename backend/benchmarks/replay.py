@@ -0,0 +1,495 @@
+# benchmarks/replay.py
+"""
+Replay recorded turns offline, for benchmarking and bisecting regressions.
+
+Turns recorded with TURN_RECORD_FILE (utils/turn_recorder.py) are run again through
+SDLCWorkflow, SimpleAgentRouter or main_minimal's WebSocket handler, with the Groq client
+answering from the recording: each LLM call gets the chunks (or the error) recorded for
+it, at the recorded pace scaled by --speed, and nothing leaves the process. Turns start
+at their recorded times (idle gaps capped at --max-gap), one after another per session.
+
+A replayed call is matched to an unused recorded call of the same turn: by agent and
+prompt, then by prompt, then by agent (counted as "prompt changed"); calls with no
+recording get a canned answer at once (counted as "unrecorded"). For every turn the
+routing decisions are compared with the recorded ones, and the time to the first and the
+last answer is measured.
+
+Examples (from backend/):
+    # Record, then replay each turn on the entry point that recorded it at recorded speed
+    TURN_RECORD_FILE=turns.jsonl python main.py
+    python -m benchmarks.replay turns.jsonl
+
+    # As fast as possible through main_minimal, saving results; later diff a new build against them
+    python -m benchmarks.replay turns.jsonl --speed 0 --target minimal --output replay.json
+    python -m benchmarks.replay turns.jsonl --speed 0 --target minimal --compare replay.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from datetime import datetime
+from types import SimpleNamespace
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+# Replayed turns must not resume from (or leave) checkpoints, and no key is needed offline
+os.environ.setdefault("GROQ_API_KEY", "replay")
+os.environ.setdefault("TURN_CHECKPOINTS", "none")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import groq
+import httpx
+
+from benchmarks.stats import summarize
+from models.schemas import UserRequest
+from utils.request_context import bind_session, current_agent
+from utils.turn_recorder import TurnRecorder, set_turn_recorder, text_id
+
+# Which replay target runs a turn recorded by each entry point
+ENTRY_TARGETS = {"main": "workflow", "simple": "simple", "minimal": "minimal"}
+TARGETS = ("workflow", "simple", "minimal")
+UNRECORDED_ANSWER = "[replay] no recorded answer for this call"
+
+_STATUS_ERRORS = {
+    400: groq.BadRequestError, 401: groq.AuthenticationError, 403: groq.PermissionDeniedError,
+    404: groq.NotFoundError, 409: groq.ConflictError, 422: groq.UnprocessableEntityError,
+    429: groq.RateLimitError,
+}
+
+
+def load_recording(path: str) -> Tuple[List[dict], Dict[str, str]]:
+    """(turns in start order, each with its "routes" and "calls"; prompt texts by ID)"""
+    turns: Dict[str, dict] = {}
+    texts: Dict[str, str] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            kind = record.pop("k")
+            if kind == "text":
+                texts[record["id"]] = record["text"]
+            elif kind == "turn":
+                turns[record["turn"]] = {**record, "routes": [], "calls": []}
+            elif record.get("turn") in turns:
+                turns[record["turn"]]["routes" if kind == "route" else "calls"].append(record)
+    return sorted(turns.values(), key=lambda turn: turn["at"]), texts
+
+
+def schedule(turns: List[dict], max_gap: float) -> Dict[str, float]:
+    """Seconds after the first turn that each turn starts, with idle gaps capped at `max_gap`"""
+    offsets = {}
+    offset, previous = 0.0, None
+    for turn in turns:
+        if previous is not None:
+            offset += min(turn["at"] - previous, max_gap)
+        offsets[turn["turn"]] = offset
+        previous = turn["at"]
+    return offsets
+
+
+class TurnReplay:
+    """One recorded turn being replayed: the calls it used up and the routing decisions it made"""
+
+    def __init__(self, turn: dict, target: str):
+        self.turn = turn
+        self.target = target
+        self.used = set()  # indexes into turn["calls"]
+        self.routes: List[dict] = []
+        self.prompt_changed = 0
+        self.unrecorded = 0
+
+    def match(self, agent: Optional[str], prompt: List[List[str]]) -> Optional[dict]:
+        unused = [(i, call) for i, call in enumerate(self.turn["calls"]) if i not in self.used]
+        for exact, candidates in (
+            (True, [(i, c) for i, c in unused if c["agent"] == agent and c["prompt"] == prompt]),
+            (True, [(i, c) for i, c in unused if c["prompt"] == prompt]),
+            (False, [(i, c) for i, c in unused if c["agent"] == agent]),
+        ):
+            if candidates:
+                index, call = candidates[0]
+                self.used.add(index)
+                self.prompt_changed += not exact
+                return call
+        self.unrecorded += 1
+        return None
+
+
+replayed_turn: ContextVar[Optional[TurnReplay]] = ContextVar("replayed_turn", default=None)
+
+
+class _RouteCapture(TurnRecorder):
+    """Collects the routing decisions of replayed turns instead of writing records"""
+
+    def __init__(self):
+        super().__init__(lambda record: None)
+
+    def route(self, entry, mode, agents) -> None:
+        replay = replayed_turn.get()
+        if replay is not None:
+            replay.routes.append({"entry": entry, "mode": mode, "agents": list(agents)})
+
+
+def _error(description: dict) -> Exception:
+    """The exception a recorded failure was raised as"""
+    request = httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+    status = description.get("status")
+    if status is not None:
+        response = httpx.Response(status, headers=description.get("headers") or {}, request=request)
+        error_class = _STATUS_ERRORS.get(status, groq.InternalServerError if status >= 500 else groq.APIStatusError)
+        return error_class(description.get("message", ""), response=response, body=None)
+    if description.get("type") == "timeout":
+        return groq.APITimeoutError(request=request)
+    if description.get("type") == "connection":
+        return groq.APIConnectionError(message=description.get("message") or "Connection error.", request=request)
+    return RuntimeError(f"{description.get('type')}: {description.get('message')}")
+
+
+def _chunk(content: Optional[str], usage: Optional[List[int]] = None) -> SimpleNamespace:
+    x_groq = SimpleNamespace(usage=SimpleNamespace(prompt_tokens=usage[0], completion_tokens=usage[1])) if usage else None
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))], x_groq=x_groq, usage=None)
+
+
+class ReplayClient:
+    """Stands in for AsyncGroq: chat completions are answered from the recording"""
+
+    def __init__(self, scale: float):
+        self.scale = scale  # recorded seconds -> replayed seconds; 0 replays without waiting
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        self.models = SimpleNamespace(list=self._list_models)
+
+    async def _list_models(self):
+        return SimpleNamespace(data=[])
+
+    async def wait_until(self, started: float, ms: float) -> None:
+        delay = started + ms / 1000 * self.scale - time.monotonic()
+        await asyncio.sleep(delay if delay > 0 else 0)
+
+    async def create(self, model: str, messages: list, stream: bool = False, **kwargs):
+        started = time.monotonic()
+        replay = replayed_turn.get()
+        prompt = [[message.get("role"), text_id(str(message.get("content", "")))] for message in messages]
+        call = replay.match(current_agent.get(), prompt) if replay is not None else None
+        if call is None:
+            # Warm-up, or a call the recording never made (e.g. a newly routed agent)
+            call = {"chunks": [[0, UNRECORDED_ANSWER]], "ms": 0, "usage": None}
+        if "error" in call and not call["chunks"]:
+            await self.wait_until(started, call["ms"])
+            raise _error(call["error"])
+        if stream:
+            return _ReplayStream(self, call, started)
+        await self.wait_until(started, call["ms"])
+        if "error" in call:
+            raise _error(call["error"])
+        usage = call.get("usage")
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="".join(text for _, text in call["chunks"])))],
+            usage=SimpleNamespace(prompt_tokens=usage[0], completion_tokens=usage[1]) if usage else None,
+        )
+
+
+class _ReplayStream:
+    """A recorded stream: its chunks at their recorded offsets, then its end, error or stall"""
+
+    def __init__(self, client: ReplayClient, call: dict, started: float):
+        self.client = client
+        self.call = call
+        self.started = started
+        self.position = 0
+        self.ended = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        chunks = self.call["chunks"]
+        if self.position < len(chunks):
+            offset, text = chunks[self.position]
+            self.position += 1
+            await self.client.wait_until(self.started, offset)
+            return _chunk(text)
+        if self.ended:
+            raise StopAsyncIteration
+        self.ended = True
+        if "error" in self.call:
+            await self.client.wait_until(self.started, self.call["ms"])
+            raise _error(self.call["error"])
+        if self.call.get("cancelled"):
+            # The caller gave up on this call when it was recorded; the rest never arrived
+            await asyncio.Event().wait()
+        await self.client.wait_until(self.started, self.call["ms"])
+        return _chunk(None, self.call.get("usage"))
+
+    async def close(self) -> None:
+        self.ended = True
+
+
+class WorkflowSession:
+    """Turns through SDLCWorkflow.stream_events, as main.py runs them"""
+
+    def __init__(self, session_id: str):
+        from workflows.sdlc_workflow import SDLCWorkflow
+        self.workflow = SDLCWorkflow()
+
+    async def turn(self, replay: TurnReplay) -> AsyncIterator[Tuple[str, str]]:
+        from utils.turn_events import AGENT_FINISHED
+        from workflows.sdlc_workflow import build_initial_state
+        state = build_initial_state(UserRequest(**replay.turn["request"]))
+        async for event in self.workflow.stream_events(state):
+            if event.type == AGENT_FINISHED:
+                yield event.agent, event.text
+
+    async def close(self) -> None:
+        pass
+
+
+class SimpleSession:
+    """Turns through SimpleAgentRouter.stream_route, as main_simple.py runs them"""
+
+    def __init__(self, session_id: str):
+        from core.simple_agent_router import SimpleAgentRouter
+        self.router = SimpleAgentRouter()
+
+    async def turn(self, replay: TurnReplay) -> AsyncIterator[Tuple[str, str]]:
+        from core.simple_websocket_handler import turn_context
+        user_request = UserRequest(**replay.turn["request"])
+        context = turn_context(user_request, replay.turn.get("timestamp"))
+        async for reply in self.router.stream_route(user_request.request, context, user_request.requested_agents):
+            yield reply
+
+    async def close(self) -> None:
+        pass
+
+
+class _ScriptedSocket:
+    """The WebSocket main_minimal's handler talks to: messages come from replay, frames go back to it"""
+
+    def __init__(self):
+        self.inbox: "asyncio.Queue[Optional[tuple]]" = asyncio.Queue()
+        self.frames: Optional[asyncio.Queue] = None
+
+    async def accept(self) -> None:
+        pass
+
+    async def receive_text(self) -> str:
+        from fastapi import WebSocketDisconnect
+        item = await self.inbox.get()
+        if item is None:
+            raise WebSocketDisconnect()
+        text, replay, self.frames = item
+        # Runs in the handler's task, so the turn's agent tasks see which turn is replayed
+        replayed_turn.set(replay)
+        return text
+
+    async def send_text(self, text: str) -> None:
+        if self.frames is not None:
+            self.frames.put_nowait(json.loads(text))
+
+
+class MinimalSession:
+    """Turns through main_minimal's WebSocket handler, routing, fan-out and A2A included"""
+
+    def __init__(self, session_id: str):
+        import main_minimal
+        self.socket = _ScriptedSocket()
+        self.handler = asyncio.ensure_future(main_minimal.websocket_endpoint(self.socket, session_id))
+
+    async def turn(self, replay: TurnReplay) -> AsyncIterator[Tuple[str, str]]:
+        frames: asyncio.Queue = asyncio.Queue()
+        self.socket.inbox.put_nowait((json.dumps(replay.turn["request"]), replay, frames))
+        while True:
+            frame = await frames.get()
+            if frame["type"] == "agent_response":
+                if frame.get("agent") == "system":
+                    return  # the handler gave up on the turn
+                if frame.get("status") != "error":
+                    yield frame["agent"], frame["message"]
+            elif frame["type"] == "status" and frame.get("status") in ("completed", "error"):
+                return
+
+    async def close(self) -> None:
+        self.socket.inbox.put_nowait(None)
+        await self.handler
+
+
+SESSIONS = {"workflow": WorkflowSession, "simple": SimpleSession, "minimal": MinimalSession}
+
+
+async def run_turn(session, replay: TurnReplay, timeout: float) -> dict:
+    replayed_turn.set(replay)
+    started = time.perf_counter()
+    answers: Dict[str, float] = {}
+    error = None
+
+    async def consume():
+        async for agent, _ in session.turn(replay):
+            answers.setdefault(agent, time.perf_counter() - started)
+
+    try:
+        await asyncio.wait_for(consume(), timeout)
+    except asyncio.TimeoutError:
+        error = "timeout"
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    turn = replay.turn
+    same_target = ENTRY_TARGETS.get(turn["entry"]) == replay.target
+    recorded_routes = [{key: route[key] for key in ("entry", "mode", "agents")} for route in turn["routes"]]
+    return {
+        "turn": turn["turn"],
+        "session": turn["session"],
+        "target": replay.target,
+        "message": turn["request"].get("request", "")[:80],
+        # Routing is only comparable on the entry point that recorded the turn
+        "routing_changed": (replay.routes != recorded_routes) if same_target else None,
+        "recorded_routes": recorded_routes,
+        "replayed_routes": replay.routes,
+        "answers": list(answers),
+        "first": min(answers.values()) if answers else None,
+        "complete": time.perf_counter() - started,
+        "calls": len(replay.used),
+        "prompt_changed": replay.prompt_changed,
+        "unrecorded": replay.unrecorded,
+        "unused": len(turn["calls"]) - len(replay.used),
+        "error": error,
+    }
+
+
+async def replay_recording(turns: List[dict], target: Optional[str], speed: float, max_gap: float,
+                           timeout: float) -> dict:
+    scale = 1 / speed if speed else 0
+    client = ReplayClient(scale)
+    set_turn_recorder(_RouteCapture())
+    from models.groq_models import get_groq_manager
+    get_groq_manager().async_client = client
+    if "minimal" in {target or ENTRY_TARGETS[turn["entry"]] for turn in turns}:
+        import main_minimal
+        main_minimal.groq_client = client
+    from core.intent_classifier import get_intent_classifier
+    get_intent_classifier()  # trained up front, as the apps do at startup, so the first turn is not slower
+
+    offsets = schedule(turns, max_gap)
+    by_session: Dict[str, List[dict]] = defaultdict(list)
+    for turn in turns:
+        by_session[turn["session"] or turn["turn"]].append(turn)
+    started = time.perf_counter()
+
+    async def run_session(session_id: str, session_turns: List[dict]) -> List[dict]:
+        bind_session(session_id)
+        sessions = {}
+        results = []
+        try:
+            for turn in session_turns:
+                turn_target = target or ENTRY_TARGETS[turn["entry"]]
+                await asyncio.sleep(max(0.0, started + offsets[turn["turn"]] * scale - time.perf_counter()))
+                if turn_target not in sessions:
+                    sessions[turn_target] = SESSIONS[turn_target](session_id)
+                results.append(await run_turn(sessions[turn_target], TurnReplay(turn, turn_target), timeout))
+        finally:
+            for session in sessions.values():
+                await session.close()
+        return results
+
+    outcomes = await asyncio.gather(*[run_session(session_id, session_turns)
+                                      for session_id, session_turns in by_session.items()])
+    rows = sorted((row for rows in outcomes for row in rows), key=lambda row: offsets[row["turn"]])
+    wall = time.perf_counter() - started
+
+    def block(rows: List[dict]) -> dict:
+        return {
+            "turns": len(rows),
+            "errors": sum(1 for r in rows if r["error"]),
+            "routing_changed": sum(1 for r in rows if r["routing_changed"]),
+            "prompt_changed": sum(r["prompt_changed"] for r in rows),
+            "unrecorded": sum(r["unrecorded"] for r in rows),
+            "first": summarize([r["first"] for r in rows if r["first"] is not None]),
+            "complete": summarize([r["complete"] for r in rows if not r["error"]]),
+        }
+
+    return {
+        "wall_seconds": wall,
+        "overall": block(rows),
+        "targets": {name: block([r for r in rows if r["target"] == name]) for name in TARGETS
+                    if any(r["target"] == name for r in rows)},
+        "turns": rows,
+    }
+
+
+def _routes(routes: List[dict]) -> str:
+    return " → ".join(f"{r['entry']} {r['mode']} [{', '.join(r['agents'])}]" for r in routes) or "(none)"
+
+
+def print_report(path: str, speed: float, result: dict) -> None:
+    overall = result["overall"]
+    print(f"\n🔁 Replayed {overall['turns']} turns from {path} in {result['wall_seconds']:.1f}s "
+          f"(speed {speed:g}{' = no waiting' if not speed else 'x'}, {overall['errors']} errors)")
+    print(f"  {'target':<9} {'turns':>5} {'route≠':>6} {'prompt≠':>7} {'unrec':>5} "
+          f"{'first p50':>10} {'p95':>7} {'done p50':>9} {'p95':>7}")
+
+    def fmt(value):
+        return f"{value:7.2f}" if value is not None else "      -"
+
+    for name, block in list(result["targets"].items()) + [("overall", overall)]:
+        first, done = block["first"], block["complete"]
+        print(f"  {name:<9} {block['turns']:>5} {block['routing_changed']:>6} {block['prompt_changed']:>7} "
+              f"{block['unrecorded']:>5}    {fmt(first['p50'])} {fmt(first['p95'])}   {fmt(done['p50'])} {fmt(done['p95'])}")
+
+    for row in result["turns"]:
+        if row["routing_changed"] or row["error"]:
+            print(f"\n  ⚠️  turn {row['turn']} ({row['target']}): {row['message']!r}")
+            if row["error"]:
+                print(f"      error:    {row['error']}")
+            if row["routing_changed"]:
+                print(f"      recorded: {_routes(row['recorded_routes'])}")
+                print(f"      replayed: {_routes(row['replayed_routes'])}")
+
+
+def print_comparison(current: dict, baseline: dict) -> None:
+    print("\n📊 Change vs baseline (positive = slower)")
+    previous_turns = {row["turn"]: row for row in baseline.get("turns", [])}
+    for metric in ("first", "complete"):
+        for p in ("p50", "p95"):
+            now, before = current["overall"][metric][p], baseline["overall"][metric][p]
+            if now is not None and before:
+                print(f"  {metric:<9} {p}: {before:6.2f}s -> {now:6.2f}s ({(now - before) / before:+.1%})")
+    for row in current["turns"]:
+        previous = previous_turns.get(row["turn"])
+        if previous and previous["replayed_routes"] != row["replayed_routes"]:
+            print(f"  routing of turn {row['turn']} changed: {row['message']!r}")
+            print(f"      baseline: {_routes(previous['replayed_routes'])}")
+            print(f"      now:      {_routes(row['replayed_routes'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded FLUX turns offline")
+    parser.add_argument("recording", help="File written with TURN_RECORD_FILE")
+    parser.add_argument("--target", choices=TARGETS, help="Run every turn here instead of on the entry point that recorded it")
+    parser.add_argument("--speed", type=float, default=1.0, help="Pace relative to the recording; 0 = no waiting")
+    parser.add_argument("--max-gap", type=float, default=10.0, help="Longest idle time between turns kept, in recorded seconds")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-turn timeout in seconds")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--compare", help="Previous JSON results to diff against")
+    args = parser.parse_args()
+
+    turns, _ = load_recording(args.recording)
+    if not turns:
+        sys.exit(f"No turns recorded in {args.recording}")
+    result = asyncio.run(replay_recording(turns, args.target, args.speed, args.max_gap, args.timeout))
+    result["meta"] = {"timestamp": datetime.now().isoformat(), "recording": args.recording,
+                      "target": args.target, "speed": args.speed}
+    print_report(args.recording, args.speed, result)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(result, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/scenarios.py
+"""
+Turn payloads for the end-to-end benchmark.
+
+Messages route by agent name because that is what every entry point honours
+(main.py's hardcoded router ignores requested_agents), so the same payload
+exercises the same path on main.py, main_simple.py and main_minimal.py.
+"""
+import random
+from datetime import datetime
+from typing import Callable, Dict
+
+DIRECT_MESSAGES = [
+    "Hi Marc, how should we structure the API layer for the payments service?",
+    "Alex, can you sketch the data access code for the order repository?",
+    "Hey Jess, what test cases would you write for the checkout flow?",
+    "Dave, what does a zero-downtime deployment look like for this service?",
+    "Sara, can you turn these notes into user stories with acceptance criteria?",
+    "Emma, how should we plan the next two sprints?",
+    "Rob, what are the main security risks in our login flow?",
+]
+
+TEAM_MESSAGES = [
+    "Hi everyone, let's kick off the payments project.",
+    "Hello team, please give me a quick status on the mobile release.",
+    "Hi everybody, what do we need to ship the MVP by next month?",
+]
+
+PROJECT_CONTEXT = {"projectName": "BenchmarkApp", "technology": "Python/FastAPI", "phase": "planning"}
+
+
+def _uploaded_spec(size_chars: int = 20000) -> dict:
+    paragraph = (
+        "The system shall let customers place orders, pay by card, and track delivery status. "
+        "Administrators manage inventory and refunds. All actions are audited. "
+    )
+    content = (paragraph * (size_chars // len(paragraph) + 1))[:size_chars]
+    return {
+        "id": "bench-spec",
+        "name": "requirements_spec.txt",
+        "type": "text/plain",
+        "size": len(content),
+        "content": content,
+        "uploadedAt": datetime.now().isoformat(),
+    }
+
+
+def _history(turns: int = 40) -> list:
+    history = []
+    for i in range(turns):
+        history.append({
+            "type": "agent_response" if i % 2 else "user_message",
+            "agent": "Marc (Software Architect)" if i % 2 else "user",
+            "message": f"Turn {i}: discussing service boundaries, data ownership and rollout order. " * 3,
+            "timestamp": datetime.now().isoformat(),
+        })
+    return history
+
+
+def direct_call(rng: random.Random) -> dict:
+    return {"request": rng.choice(DIRECT_MESSAGES), "context": PROJECT_CONTEXT}
+
+
+def team_call(rng: random.Random) -> dict:
+    return {"request": rng.choice(TEAM_MESSAGES), "context": PROJECT_CONTEXT}
+
+
+def file_upload(rng: random.Random) -> dict:
+    return {
+        "request": "Sara, please review the attached requirements document.",
+        "context": PROJECT_CONTEXT,
+        "uploaded_files": [_uploaded_spec()],
+    }
+
+
+def long_history(rng: random.Random) -> dict:
+    return {"request": rng.choice(DIRECT_MESSAGES), "context": PROJECT_CONTEXT, "history": _history()}
+
+
+SCENARIOS: Dict[str, Callable[[random.Random], dict]] = {
+    "direct": direct_call,
+    "team": team_call,
+    "upload": file_upload,
+    "history": long_history,
+}
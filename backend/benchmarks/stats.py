@@ -0,0 +1,29 @@
+# benchmarks/stats.py
+"""Summary statistics shared by the benchmark runners"""
+import statistics
+from typing import Dict, List, Optional
+
+
+def percentile(samples: List[float], p: float) -> Optional[float]:
+    """Linear-interpolated percentile (p in 0-100)"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * p / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(samples: List[float]) -> Dict[str, Optional[float]]:
+    if not samples:
+        return {"count": 0, "mean": None, "min": None, "max": None, "p50": None, "p95": None, "p99": None}
+    return {
+        "count": len(samples),
+        "mean": statistics.fmean(samples),
+        "min": min(samples),
+        "max": max(samples),
+        "p50": percentile(samples, 50),
+        "p95": percentile(samples, 95),
+        "p99": percentile(samples, 99),
+    }
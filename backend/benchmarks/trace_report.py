@@ -0,0 +1,123 @@
+# benchmarks/trace_report.py
+"""
+Print the slowest traced turns as span trees.
+
+Reads OTLP/JSON exports written by utils.tracing (TRACE_EXPORTER=file) or
+collected by mock_llm_server.py (GET /mock/traces), one ExportTraceServiceRequest
+per line. Each span shows its offset from the start of the turn, its duration
+and its events, e.g. where the first token arrived:
+
+    python -m benchmarks.trace_report traces.jsonl --top 5
+    python -m benchmarks.trace_report --url http://127.0.0.1:9000/mock/traces --min-ms 2000
+"""
+import argparse
+import json
+import sys
+import urllib.request
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+# Attributes worth showing inline; everything else is left to the raw export
+SHOWN_ATTRIBUTES = ("turn.id", "turn.entry", "agent.role", "llm.model", "llm.hedge", "message.type",
+                    "route.mode", "llm.tokens.in", "llm.tokens.out", "cancelled")
+
+
+def _value(any_value: Dict) -> object:
+    if "arrayValue" in any_value:
+        return [_value(v) for v in any_value["arrayValue"].get("values", [])]
+    return next(iter(any_value.values()), None)
+
+
+def _attributes(items: List[Dict]) -> Dict[str, object]:
+    return {item["key"]: _value(item["value"]) for item in items or []}
+
+
+def iter_spans(payloads: Iterable[Dict]) -> Iterable[Dict]:
+    for payload in payloads:
+        for resource_spans in payload.get("resourceSpans", []):
+            for scope_spans in resource_spans.get("scopeSpans", []):
+                yield from scope_spans.get("spans", [])
+
+
+def load_file(path: str) -> List[Dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def load_url(url: str) -> List[Dict]:
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return json.load(response)["traces"]
+
+
+def group_traces(spans: Iterable[Dict]) -> Dict[str, List[Dict]]:
+    traces = defaultdict(list)
+    for span in spans:
+        traces[span["traceId"]].append(span)
+    return traces
+
+
+def _duration_ms(span: Dict) -> float:
+    return (int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1e6
+
+
+def render_trace(spans: List[Dict]) -> List[str]:
+    children = defaultdict(list)
+    roots = []
+    ids = {span["spanId"] for span in spans}
+    for span in spans:
+        parent = span.get("parentSpanId")
+        (children[parent] if parent in ids else roots).append(span)
+    origin = min(int(span["startTimeUnixNano"]) for span in spans)
+    lines = []
+
+    def walk(span: Dict, depth: int) -> None:
+        start = int(span["startTimeUnixNano"])
+        attributes = _attributes(span.get("attributes"))
+        shown = " ".join(f"{k}={attributes[k]}" for k in SHOWN_ATTRIBUTES if k in attributes)
+        error = " ERROR: " + span["status"].get("message", "") if span.get("status", {}).get("code") == 2 else ""
+        lines.append(f"{'  ' * depth}{span['name']:<{max(1, 24 - 2 * depth)}} "
+                     f"+{(start - origin) / 1e6:8.1f}ms {_duration_ms(span):9.1f}ms  {shown}{error}")
+        for event in span.get("events", []):
+            event_attributes = _attributes(event.get("attributes"))
+            detail = " ".join(f"{k}={v}" for k, v in event_attributes.items())
+            offset = (int(event["timeUnixNano"]) - origin) / 1e6
+            lines.append(f"{'  ' * (depth + 1)}· {event['name']} +{offset:.1f}ms {detail}")
+        for child in sorted(children[span["spanId"]], key=lambda s: int(s["startTimeUnixNano"])):
+            walk(child, depth + 1)
+
+    for root in sorted(roots, key=lambda s: int(s["startTimeUnixNano"])):
+        walk(root, 0)
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Show the slowest traced turns as span trees")
+    parser.add_argument("path", nargs="?", help="OTLP/JSON lines file (TRACE_FILE)")
+    parser.add_argument("--url", help="mock_llm_server /mock/traces URL instead of a file")
+    parser.add_argument("--top", type=int, default=5, help="number of turns to show")
+    parser.add_argument("--min-ms", type=float, default=0.0, help="skip turns faster than this")
+    args = parser.parse_args()
+    if not args.path and not args.url:
+        parser.error("give a trace file or --url")
+
+    payloads = load_url(args.url) if args.url else load_file(args.path)
+    traces = group_traces(iter_spans(payloads))
+    turns = []
+    for trace_id, spans in traces.items():
+        roots = [s for s in spans if not s.get("parentSpanId")]
+        if roots:
+            turns.append((_duration_ms(roots[0]), trace_id, spans))
+    turns = sorted((t for t in turns if t[0] >= args.min_ms), reverse=True)[:args.top]
+
+    if not turns:
+        print("No traced turns found", file=sys.stderr)
+        return
+    print(f"{len(traces)} traces, showing the {len(turns)} slowest\n")
+    for duration, trace_id, spans in turns:
+        print(f"trace {trace_id} ({duration:.1f}ms, {len(spans)} spans)")
+        print("\n".join(render_trace(spans)))
+        print()
+
+
+if __name__ == "__main__":
+    main()
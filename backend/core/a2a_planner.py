@@ -0,0 +1,112 @@
+# core/a2a_planner.py
+"""
+Budgeted agent-to-agent (A2A) expansion.
+
+When agents' answers name teammates, those teammates may be brought into the
+turn. Before, any name in a previous answer added that agent, and any two
+names together added all five supporting agents. Now each turn gets an
+A2ATurn, and every round of expansion goes through it:
+
+- relevance gate: a candidate scores 1 for each answer that names it, 1 more
+  when the answer hands off to it ("ask Jess", "Dave should"), plus the intent
+  classifier's probability that the user's request is for that agent. Only
+  candidates reaching A2A_MIN_SCORE are added.
+- dedup: agents already in the turn are never added again.
+- caps: at most A2A_MAX_NEW_AGENTS per round, A2A_MAX_ROUNDS rounds per turn,
+  and A2A_TOKEN_BUDGET estimated tokens per turn for the added calls.
+
+    A2A_MAX_ROUNDS=1         rounds of expansion per turn; 0 disables A2A
+    A2A_MAX_NEW_AGENTS=2     agents added per round, best scores first
+    A2A_TOKEN_BUDGET=8000    estimated tokens per turn for added agents; 0 = unlimited
+    A2A_MIN_SCORE=1.5        relevance needed to be added
+"""
+import os
+from typing import Dict, Iterable, List
+
+from core.intent_classifier import get_intent_classifier
+from core.routing_engine import ALIAS, HANDOFF_AFTER, HANDOFF_BEFORE, ROLE, get_routing_engine
+from utils.logging_config import get_logger
+from utils.metrics import A2A_DECISIONS
+
+logger = get_logger("a2a")
+
+MAX_ROUNDS = int(os.getenv("A2A_MAX_ROUNDS", 1))
+MAX_NEW_AGENTS = int(os.getenv("A2A_MAX_NEW_AGENTS", 2))
+TOKEN_BUDGET = int(os.getenv("A2A_TOKEN_BUDGET", 8000))
+MIN_SCORE = float(os.getenv("A2A_MIN_SCORE", 1.5))
+REPLY_TOKENS = 1024  # max_tokens of an agent reply, the bulk of an added call's cost
+
+
+def estimate_call_tokens(*prompt_texts: str) -> int:
+    """Rough cost of one more agent call: ~4 characters per prompt token plus a full reply"""
+    return sum(len(text) for text in prompt_texts) // 4 + REPLY_TOKENS
+
+
+class A2ATurn:
+    """One turn's A2A budget; agent keys throughout ("marc", not "software_architect")"""
+
+    def __init__(self, request: str, in_turn: Iterable[str], max_rounds: int = MAX_ROUNDS,
+                 max_new_agents: int = MAX_NEW_AGENTS, token_budget: int = TOKEN_BUDGET,
+                 min_score: float = MIN_SCORE):
+        self.request = request
+        self.in_turn = set(in_turn)
+        self.max_rounds = max_rounds
+        self.max_new_agents = max_new_agents
+        self.token_budget = token_budget
+        self.min_score = min_score
+        self.rounds = 0
+        self.tokens = 0
+        self._request_relevance = None
+
+    def scores(self, responses: Dict[str, str]) -> Dict[str, float]:
+        """Relevance of every agent named in `responses` (author key -> answer) who is not yet in the turn"""
+        engine = get_routing_engine()
+        scores: Dict[str, float] = {}
+        for author, response in responses.items():
+            scan = engine.scan(response)
+            handed_off = set()
+            for mention in scan.of(ALIAS, ROLE):
+                if scan.preceding(mention, HANDOFF_BEFORE) or scan.following(mention, HANDOFF_AFTER):
+                    handed_off.add(mention.agent)
+            for agent_key in scan.agents(ALIAS, ROLE):
+                if agent_key != author and agent_key not in self.in_turn:
+                    scores[agent_key] = scores.get(agent_key, 0.0) + 1.0 + (agent_key in handed_off)
+        if scores:
+            if self._request_relevance is None:
+                self._request_relevance = get_intent_classifier().predict(engine.scan(self.request).tokens)
+            for agent_key in scores:
+                scores[agent_key] += self._request_relevance.get(agent_key, 0.0)
+        return scores
+
+    def next_round(self, responses: Dict[str, str], cost_per_agent: int = REPLY_TOKENS) -> List[str]:
+        """Agents to add after `responses`, best first; empty once the turn's budget is spent"""
+        scores = self.scores(responses)
+        if not scores:
+            return []
+        ranked = sorted(scores, key=scores.get, reverse=True)
+        if self.rounds >= self.max_rounds:
+            self._reject(ranked, "round_limit", scores)
+            return []
+        self.rounds += 1
+
+        added = []
+        for agent_key in ranked:
+            if scores[agent_key] < self.min_score:
+                self._reject([agent_key], "low_score", scores)
+            elif len(added) >= self.max_new_agents:
+                self._reject([agent_key], "agent_cap", scores)
+            elif self.token_budget and self.tokens + cost_per_agent > self.token_budget:
+                self._reject([agent_key], "token_budget", scores)
+            else:
+                added.append(agent_key)
+                self.tokens += cost_per_agent
+                A2A_DECISIONS.inc(decision="added")
+        self.in_turn.update(added)
+        if added:
+            logger.debug("A2A round %d adds %s (scores %s)", self.rounds, added, scores)
+        return added
+
+    def _reject(self, agent_keys: List[str], reason: str, scores: Dict[str, float]) -> None:
+        for agent_key in agent_keys:
+            A2A_DECISIONS.inc(decision=reason)
+            logger.debug("A2A skips %s (%s, score %.2f)", agent_key, reason, scores[agent_key])
@@ -0,0 +1,135 @@
+# core/intent_classifier.py
+"""
+Offline intent classifier that picks agents from what a message is about.
+
+Replaces the hand-made keyword lists. A message's words (minus stop words),
+their 5-letter prefixes (so "deploying" shares evidence with "deployment")
+and its word bigrams are hashed into a fixed number of buckets. A linear
+softmax model over those buckets scores every agent plus a "none" class.
+The model is trained at startup from the bundled labeled corpus
+(intent_corpus.tsv: example requests plus single-term domain vocabulary) in
+well under a second. Scoring is one hash and one small vector add per
+feature, which takes microseconds. An agent is chosen only when its
+probability clears INTENT_THRESHOLD, so chatter and vague requests wake
+nobody instead of everybody.
+
+    INTENT_THRESHOLD=0.4     minimum probability for an agent to be chosen
+    INTENT_MAX_AGENTS=3      most agents woken by one request
+    INTENT_CORPUS=           path to a replacement corpus (same TSV format)
+"""
+import math
+import os
+from operator import add
+import random
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from core.routing_engine import get_routing_engine, tokenize
+from utils.logging_config import get_logger
+
+logger = get_logger("intent")
+
+THRESHOLD = float(os.getenv("INTENT_THRESHOLD", 0.4))
+MAX_AGENTS = int(os.getenv("INTENT_MAX_AGENTS", 3))
+CORPUS_PATH = os.getenv("INTENT_CORPUS") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "intent_corpus.tsv")
+NO_AGENT = "none"
+
+BUCKETS = 1 << 14
+PREFIX_LENGTH = 5
+EPOCHS = 30
+LEARNING_RATE = 0.5
+STOP_WORDS = frozenset(
+    "a an the to for of in on and or is are be we our you your i me my can could should would how what "
+    "do does this that it with at by from please let s us".split()
+)
+
+
+def features(tokens: Sequence[str]) -> List[int]:
+    """Hashed bucket ids for content words, their prefixes and word bigrams"""
+    words = [token for token in tokens if token not in STOP_WORDS]
+    grams = [f"w:{word}" for word in words]
+    grams += [f"p:{word[:PREFIX_LENGTH]}" for word in words if len(word) > PREFIX_LENGTH]
+    grams += [f"b:{first} {second}" for first, second in zip(tokens, tokens[1:])]
+    return sorted({zlib.crc32(gram.encode()) & (BUCKETS - 1) for gram in grams})
+
+
+def load_corpus(path: str = CORPUS_PATH) -> List[Tuple[Tuple[str, ...], str]]:
+    """(labels, text) pairs; "none" is an empty label set, lines starting with # are comments"""
+    examples = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            labels, text = line.rstrip("\n").split("\t", 1)
+            examples.append((tuple(label for label in labels.split(",") if label != NO_AGENT), text))
+    return examples
+
+
+class IntentClassifier:
+    """Softmax regression over hashed n-gram features; the last class means no agent"""
+
+    def __init__(self, agents: Sequence[str], threshold: float = THRESHOLD, max_agents: int = MAX_AGENTS):
+        self.agents = tuple(agents)
+        self.threshold = threshold
+        self.max_agents = max_agents
+        self.classes = len(self.agents) + 1
+        self.bias = [0.0] * self.classes
+        self.weights: Dict[int, List[float]] = {}  # bucket -> one weight per class; unseen buckets are zero
+
+    def fit(self, examples: List[Tuple[Tuple[str, ...], str]], epochs: int = EPOCHS, seed: int = 0) -> "IntentClassifier":
+        rows = []
+        for labels, text in examples:
+            labels = [agent for agent in labels if agent in self.agents]
+            # Requests for several agents share the probability mass between them
+            targets = [1.0 / len(labels) if agent in labels else 0.0 for agent in self.agents] + [0.0 if labels else 1.0]
+            rows.append((features(tokenize(text)), targets))
+        rng = random.Random(seed)
+        for epoch in range(epochs):
+            rng.shuffle(rows)
+            rate = LEARNING_RATE / (1 + epoch * 0.1)
+            for buckets, targets in rows:
+                gradients = [rate * (t - p) for t, p in zip(targets, self._probabilities(buckets))]
+                self.bias = [b + g for b, g in zip(self.bias, gradients)]
+                for bucket in buckets:
+                    row = self.weights.get(bucket) or [0.0] * self.classes
+                    self.weights[bucket] = [w + g for w, g in zip(row, gradients)]
+        return self
+
+    def _probabilities(self, buckets: Sequence[int]) -> List[float]:
+        scores = self.bias
+        for bucket in buckets:
+            row = self.weights.get(bucket)
+            if row is not None:
+                scores = list(map(add, scores, row))
+        top = max(scores)
+        exps = [math.exp(score - top) for score in scores]
+        total = sum(exps)
+        return [e / total for e in exps]
+
+    def predict(self, tokens: Sequence[str]) -> Dict[str, float]:
+        """Probability per agent that the request is for them (the rest is "no agent")"""
+        return dict(zip(self.agents, self._probabilities(features(tokens))))
+
+    def select(self, tokens: Sequence[str], limit: Optional[int] = None) -> List[str]:
+        """Agents over the threshold, most likely first, at most `limit` (default INTENT_MAX_AGENTS)"""
+        probabilities = self._probabilities(features(tokens))
+        chosen = sorted((p, -i) for i, p in enumerate(probabilities[:-1]) if p >= self.threshold)
+        return [self.agents[-i] for _, i in reversed(chosen)][:limit or self.max_agents]
+
+    def best(self, tokens: Sequence[str]) -> Optional[str]:
+        chosen = self.select(tokens, limit=1)
+        return chosen[0] if chosen else None
+
+
+_classifier: Optional[IntentClassifier] = None
+
+
+def get_intent_classifier() -> IntentClassifier:
+    """Process-wide classifier over the routing roster, trained from the corpus on first use"""
+    global _classifier
+    agents = tuple(spec.key for spec in get_routing_engine().roster)
+    if _classifier is None or _classifier.agents != agents:
+        examples = load_corpus()
+        _classifier = IntentClassifier(agents).fit(examples)
+        logger.info("Intent classifier trained on %d examples from %s", len(examples), CORPUS_PATH)
+    return _classifier
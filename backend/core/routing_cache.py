@@ -0,0 +1,78 @@
+# core/routing_cache.py
+"""
+LRU cache of routing decisions for repeated messages.
+
+Greetings, thanks and short direct calls ("Hi Marc", "hello everyone") make up
+much of the traffic and route the same way every time. Routing only looks at
+a message's words, so decisions are keyed by the normalized token string:
+"Hi Marc!" and "hi   marc" share an entry. Each entry point caches under its
+own namespace, since each one decides differently from the same words. When
+the routing roster changes (set_routing_roster), every entry is dropped.
+
+    ROUTING_CACHE_SIZE=1024       decisions kept; 0 disables the cache
+    ROUTING_CACHE_MAX_CHARS=200   longer messages rarely repeat and are routed uncached
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional, Tuple, TypeVar
+
+from core.routing_engine import get_routing_engine, tokenize
+from utils.metrics import CACHE_REQUESTS
+
+CACHE_SIZE = int(os.getenv("ROUTING_CACHE_SIZE", 1024))
+MAX_CHARS = int(os.getenv("ROUTING_CACHE_MAX_CHARS", 200))
+
+T = TypeVar("T")
+
+
+class RoutingCache:
+    def __init__(self, size: int = CACHE_SIZE, max_chars: int = MAX_CHARS):
+        self.size = size
+        self.max_chars = max_chars
+        self._entries: "OrderedDict[Tuple, object]" = OrderedDict()
+        self._fingerprint: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def lookup(self, namespace: str, message: str, plan: Callable[[str], T], extra: Hashable = ()) -> T:
+        """Cached plan(message); `extra` holds any other input the decision depends on.
+        Decisions are shared between callers, so plan() should return immutable values."""
+        if self.size <= 0 or len(message) > self.max_chars:
+            CACHE_REQUESTS.inc(cache="routing", result="bypass")
+            return plan(message)
+        fingerprint = get_routing_engine().fingerprint
+        key = (namespace, " ".join(tokenize(message)), extra)
+        with self._lock:
+            if fingerprint != self._fingerprint:
+                self._entries.clear()
+                self._fingerprint = fingerprint
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                decision = self._entries[key]
+                CACHE_REQUESTS.inc(cache="routing", result="hit")
+                return decision
+        CACHE_REQUESTS.inc(cache="routing", result="miss")
+        decision = plan(message)
+        with self._lock:
+            self._entries[key] = decision
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return decision
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_cache: Optional[RoutingCache] = None
+
+
+def get_routing_cache() -> RoutingCache:
+    """Process-wide cache shared by SDLCWorkflow, SimpleAgentRouter and main_minimal"""
+    global _cache
+    if _cache is None:
+        _cache = RoutingCache()
+    return _cache
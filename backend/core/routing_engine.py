@@ -0,0 +1,233 @@
+# core/routing_engine.py
+"""
+Routing vocabulary shared by every entry point, compiled into one matcher.
+
+Agent names and aliases, greetings, team calls, dismissals, continuation and
+hand-off phrases are compiled into a single trie over word tokens. A message
+is tokenized once and walked once: each token starts at most one walk, no
+longer than the longest phrase, and every phrase that
+ends on a whole word is reported with its kind and agent. SDLCWorkflow,
+SimpleAgentRouter and main_minimal all read the same scan, so an alias means
+the same agent everywhere.
+
+Matching is on whole words: "rob" no longer matches "problem", "marc" no
+longer matches "marching", and "all" only calls the team when it is greeted
+("hi all"). Vocabulary entries ending in "*" also match common inflections
+("discuss*" matches discusses, discussed, discussing, discussion). Which agent
+a request is *about* is decided by core.intent_classifier, not by keywords.
+"""
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Match kinds
+ALIAS = "alias"                    # a name for one agent ("marc", "marcus rodriguez")
+ROLE = "role"                      # a job title standing in for an agent ("architect")
+GREETING = "greeting"
+TEAM = "team"                      # addresses the whole team
+TEAM_ADDRESS = "team_address"      # addresses the team only straight after a greeting ("hi all")
+COLLABORATION = "collaboration"    # asks for group work ("brainstorm", "work together")
+DISMISSAL = "dismissal"
+CONTINUATION = "continuation"      # "talk to", "bring in": the agent named next is wanted
+EXCLUSIVE = "exclusive"            # "would like to talk to": only the agent named next is wanted
+HANDOFF_BEFORE = "handoff_before"  # "ask", "involve" + agent, in an agent's reply
+HANDOFF_AFTER = "handoff_after"    # agent + "should", "can help"
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+(?:/[^\W_]+)*")
+INFLECTIONS = ("s", "es", "ed", "d", "ing", "er", "ers", "ion", "ions", "ation", "ations",
+               "ment", "ments", "ity", "ities", "al", "ly")
+
+
+@dataclass(frozen=True)
+class AgentSpec:
+    key: str                 # short key used by main_simple and main_minimal ("marc")
+    role: str                # agent id used by the workflow ("software_architect")
+    route: str               # workflow route for a direct call ("architecture")
+    aliases: Tuple[str, ...]
+    roles: Tuple[str, ...]   # job titles that refer to this agent
+
+
+ROSTER: Tuple[AgentSpec, ...] = (
+    AgentSpec("sara", "requirements_analyst", "requirements",
+              ("sara", "sarah", "sarah chen", "sara requirements"),
+              ("requirements",)),
+    AgentSpec("marc", "software_architect", "architecture",
+              ("marc", "marcus", "marcus rodriguez", "marc architect"),
+              ("architect",)),
+    AgentSpec("alex", "developer", "development",
+              ("alex", "alexander", "alex kim", "alex developer"),
+              ("developer",)),
+    AgentSpec("jess", "qa_tester", "testing",
+              ("jess", "jessica", "jessica wu", "jess tester"),
+              ("tester", "qa")),
+    AgentSpec("dave", "devops_engineer", "deployment",
+              ("dave", "david", "david singh", "dave devops"),
+              ("devops",)),
+    AgentSpec("emma", "project_manager", "management",
+              ("emma", "emily", "emily johnson", "emma manager"),
+              ("manager",)),
+    AgentSpec("robt", "security_expert", "security",
+              ("robt", "rob", "robert", "robert chen", "robt security"),
+              ("security",)),
+)
+
+PHRASES: Dict[str, Tuple[str, ...]] = {
+    GREETING: ("hi", "hello", "hey", "greetings", "good morning", "good afternoon", "yo"),
+    TEAM: ("everyone", "everybody", "team", "all agents", "all of you", "entire team"),
+    TEAM_ADDRESS: ("all", "folks", "guys"),
+    COLLABORATION: ("collaborate", "work together", "call your team", "team members", "discuss*",
+                    "brainstorm*", "meeting*", "huddle"),
+    DISMISSAL: ("drop off", "drop out", "leave", "dismiss*", "step back", "thank you", "thanks",
+                "goodbye", "bye"),
+    CONTINUATION: ("continue", "continue with", "chat with", "work with", "speak with", "talk to", "call",
+                   "bring in", "would like to talk to", "want to talk to", "need to talk to",
+                   "like to speak to", "want to speak to"),
+    EXCLUSIVE: ("would like to talk to", "want to talk to", "need to talk to", "like to speak to",
+                "want to speak to", "would like to speak to"),
+    HANDOFF_BEFORE: ("get", "involve", "ask", "work with", "bring in", "recommend"),
+    HANDOFF_AFTER: ("should", "can help"),
+}
+
+
+class Match(NamedTuple):
+    kind: str
+    phrase: str            # vocabulary entry that matched ("deploy*")
+    agent: Optional[str]   # agent key for ALIAS and ROLE matches
+    start: int             # token span [start, end)
+    end: int
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def _forms(entry: str) -> Iterable[str]:
+    """The entry itself, plus suffixed forms of its last word when it ends in '*'"""
+    if not entry.endswith("*"):
+        return (entry,)
+    stem = entry[:-1]
+    stems = (stem, stem[:-1]) if stem.endswith("e") else (stem,)
+    return {stem} | {base + suffix for base in stems for suffix in INFLECTIONS}
+
+
+class Scan:
+    """All matches in one message, in text order"""
+
+    def __init__(self, tokens: List[str], matches: List[Match]):
+        self.tokens = tokens
+        self.matches = matches
+        self._by_kind: Dict[str, List[Match]] = {}
+        for m in matches:
+            self._by_kind.setdefault(m.kind, []).append(m)
+        self._starts: Optional[Dict[int, List[Match]]] = None
+        self._ends: Optional[Dict[int, List[Match]]] = None
+
+    def _index(self) -> None:
+        self._starts, self._ends = {}, {}
+        for m in self.matches:
+            self._starts.setdefault(m.start, []).append(m)
+            self._ends.setdefault(m.end, []).append(m)
+
+    def has(self, *kinds: str) -> bool:
+        return any(kind in self._by_kind for kind in kinds)
+
+    def of(self, *kinds: str) -> List[Match]:
+        if len(kinds) == 1:
+            return self._by_kind.get(kinds[0], [])
+        return [m for m in self.matches if m.kind in kinds]
+
+    def agents(self, *kinds: str) -> List[str]:
+        """Distinct agent keys named by matches of these kinds, in order of first mention"""
+        seen: Dict[str, None] = {}
+        for m in self.matches:
+            if m.kind in kinds and m.agent is not None:
+                seen.setdefault(m.agent)
+        return list(seen)
+
+    def following(self, match: Match, *kinds: str) -> Optional[Match]:
+        """A match of one of `kinds` starting on the word right after `match`"""
+        if self._starts is None:
+            self._index()
+        return next((m for m in self._starts.get(match.end, ()) if m.kind in kinds), None)
+
+    def preceding(self, match: Match, *kinds: str) -> Optional[Match]:
+        """A match of one of `kinds` ending on the word right before `match`"""
+        if self._ends is None:
+            self._index()
+        return next((m for m in self._ends.get(match.start, ()) if m.kind in kinds), None)
+
+
+class RoutingEngine:
+    def __init__(self, roster: Tuple[AgentSpec, ...] = ROSTER, phrases: Dict[str, Tuple[str, ...]] = PHRASES):
+        self.roster = roster
+        # Identifies this vocabulary; cached routing decisions are only valid for the same fingerprint
+        self.fingerprint = hash((roster, tuple(phrases.items())))
+        self.by_key = {spec.key: spec for spec in roster}
+        self.by_role = {spec.role: spec for spec in roster}
+        self._trie: Dict = {}
+        for spec in roster:
+            for alias in spec.aliases:
+                self._add(alias, ALIAS, spec.key)
+            for role in spec.roles:
+                self._add(role, ROLE, spec.key)
+        for kind, entries in phrases.items():
+            for entry in entries:
+                self._add(entry, kind)
+
+    def _add(self, entry: str, kind: str, agent: Optional[str] = None) -> None:
+        for form in _forms(entry):
+            node = self._trie
+            for token in tokenize(form):
+                node = node.setdefault(token, {})
+            node.setdefault(None, []).append((kind, entry, agent))
+
+    def scan(self, text: str) -> Scan:
+        tokens = tokenize(text)
+        trie, count, matches = self._trie, len(tokens), []
+        for start, token in enumerate(tokens):
+            node = trie.get(token)
+            end = start + 1
+            while node is not None:
+                payloads = node.get(None)
+                if payloads:
+                    for kind, entry, agent in payloads:
+                        matches.append(Match(kind, entry, agent, start, end))
+                if end == count:
+                    break
+                node = node.get(tokens[end])
+                end += 1
+        return Scan(tokens, matches)
+
+    # --- decisions shared by the entry points ---------------------------------
+
+    def called_agent(self, scan: Scan) -> Optional[str]:
+        """The agent greeted by name ("hi marc"), else the first agent named"""
+        for greeting in scan.of(GREETING):
+            addressee = scan.following(greeting, ALIAS)
+            if addressee is not None:
+                return addressee.agent
+        named = scan.agents(ALIAS)
+        return named[0] if named else None
+
+    def is_team_call(self, scan: Scan) -> bool:
+        if scan.has(TEAM):
+            return True
+        return any(scan.following(greeting, TEAM_ADDRESS) for greeting in scan.of(GREETING))
+
+
+_engine: Optional[RoutingEngine] = None
+
+
+def get_routing_engine() -> RoutingEngine:
+    """Process-wide engine; the vocabulary is compiled once on first use"""
+    global _engine
+    if _engine is None:
+        _engine = RoutingEngine()
+    return _engine
+
+
+def set_routing_roster(roster: Tuple[AgentSpec, ...]) -> RoutingEngine:
+    """Recompile the engine for a new roster; cached routing decisions for the old one are dropped"""
+    global _engine
+    _engine = RoutingEngine(roster)
+    return _engine
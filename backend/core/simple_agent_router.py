@@ -3,8 +3,7 @@
 Simple Agent Router - Direct agent communication without LangGraph complexity
 """
 import asyncio
-import re
-from typing import Dict, List, Optional, Tuple
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from datetime import datetime
 
 from agents.requirements_analyst import RequirementsAnalyst
@@ -14,6 +13,17 @@ from agents.qa_tester import QATester
 from agents.devops_engineer import DevOpsEngineer
 from agents.project_manager import ProjectManager
 from agents.security_expert import SecurityExpert
+from core.intent_classifier import get_intent_classifier
+from core.routing_cache import get_routing_cache
+from core.routing_engine import RoutingEngine, Scan, get_routing_engine
+from utils.llm_scheduler import priority_scope, PRIORITY_TEAM
+from utils.logging_config import get_logger
+from utils.metrics import ROUTING_SECONDS
+from utils.tracing import start_span
+from utils.turn_deadline import agent_timeout, timeout_message
+from utils.turn_recorder import record_route
+
+logger = get_logger("router")
 
 
 class SimpleAgentRouter:
@@ -23,7 +33,7 @@ class SimpleAgentRouter:
     """
     
     def __init__(self):
-        print("[ROUTER] 🚀 Initializing SimpleAgentRouter (NO LANGGRAPH)")
+        logger.debug("Initializing SimpleAgentRouter")
         
         # Initialize all agents once
         self.agents = {
@@ -36,200 +46,137 @@ class SimpleAgentRouter:
             "robt": SecurityExpert(),
         }
         
-        # Simple name mappings - no regex complexity
-        self.agent_names = {
-            # Primary names
-            "sara": "sara",
-            "marc": "marc", 
-            "alex": "alex",
-            "jess": "jess",
-            "dave": "dave",
-            "emma": "emma",
-            "robt": "robt",
-            "rob": "robt",  # Rob -> Robt
-            
-            # Full names
-            "sara requirements": "sara",
-            "marc architect": "marc",
-            "alex developer": "alex", 
-            "jess tester": "jess",
-            "dave devops": "dave",
-            "emma manager": "emma",
-            "robt security": "robt",
-            "robert": "robt",
-            
-            # Variations
-            "sarah": "sara",
-            "marcus": "marc",
-            "alexander": "alex",
-            "jessica": "jess", 
-            "david": "dave",
-            "emily": "emma",
-            "robert": "robt"
-        }
-        
-        print(f"[ROUTER] ✅ Loaded {len(self.agents)} agents: {list(self.agents.keys())}")
+        logger.debug("Loaded %s agents: %s", len(self.agents), list(self.agents.keys()))
+
+    @property
+    def engine(self) -> RoutingEngine:
+        """Names, greetings and team calls shared with the other entry points"""
+        return get_routing_engine()
     
     def detect_called_agent(self, message: str) -> Optional[str]:
         """
         Detect which agent is being called from a message.
         Returns agent key (sara, marc, etc.) or None if no direct call detected.
         """
-        message_lower = message.lower().strip()
-        
-        print(f"[ROUTER] 🔍 Detecting agent in: '{message}'")
-        
-        # Check for direct greetings first (highest priority)
-        greeting_patterns = [
-            r'\bhi\s+(\w+)',
-            r'\bhello\s+(\w+)', 
-            r'\bhey\s+(\w+)',
-            r'\bgreetings\s+(\w+)'
-        ]
-        
-        for pattern in greeting_patterns:
-            match = re.search(pattern, message_lower)
-            if match:
-                name = match.group(1)
-                if name in self.agent_names:
-                    agent_key = self.agent_names[name]
-                    print(f"[ROUTER] ✅ DIRECT GREETING: '{name}' → {agent_key}")
-                    return agent_key
-                    
-        # Check for name mentions in message
-        for name_variant, agent_key in self.agent_names.items():
-            if name_variant in message_lower:
-                # Make sure it's a word boundary to avoid false matches
-                if re.search(r'\b' + re.escape(name_variant) + r'\b', message_lower):
-                    print(f"[ROUTER] ✅ NAME MENTION: '{name_variant}' → {agent_key}")
-                    return agent_key
-        
-        print(f"[ROUTER] ❌ NO AGENT DETECTED in: '{message}'")
-        return None
+        return self._called_agent(self.engine.scan(message))
+
+    def _called_agent(self, scan: Scan) -> Optional[str]:
+        # A greeting followed by a name ("hi marc") wins, then the first name mentioned
+        agent_key = self.engine.called_agent(scan)
+        if agent_key:
+            logger.debug("NAME MENTION: → %s", agent_key)
+        return agent_key
     
     def detect_team_call(self, message: str) -> bool:
         """Check if message is calling the whole team"""
-        message_lower = message.lower().strip()
-        team_keywords = ['everyone', 'everybody', 'team', 'all agents', 'all of you', 'entire team']
-        
-        for keyword in team_keywords:
-            if keyword in message_lower:
-                print(f"[ROUTER] 👥 TEAM CALL DETECTED: '{keyword}'")
-                return True
-        return False
+        return self.engine.is_team_call(self.engine.scan(message))
     
-    async def route_message(self, message: str, context: dict = None, requested_agents: List[str] = None) -> Dict[str, str]:
+    def plan_route(self, message: str, requested_agents: List[str] = None) -> Tuple[str, List[str]]:
         """
-        Route a message to appropriate agents and return their responses.
-        This is the main entry point that replaces the entire LangGraph workflow.
+        Decide who answers without calling anyone.
+        Returns (mode, agent keys) where mode is "direct", "team", "selected" or "default".
         """
-        print(f"\n{'='*60}")
-        print(f"[ROUTER] 📨 ROUTING MESSAGE: '{message}'")
-        print(f"[ROUTER] 👥 Requested agents: {requested_agents}")
-        print(f"{'='*60}")
-        
-        responses = {}
-        context = context or {}
-        
+        requested = tuple(requested_agents or ())
+        mode, target_agents = get_routing_cache().lookup(
+            "simple", message, lambda m: self._plan_route(m, requested), extra=requested)
+        return mode, list(target_agents)
+
+    def _plan_route(self, message: str, requested_agents: Tuple[str, ...]) -> Tuple[str, Tuple[str, ...]]:
+        scan = self.engine.scan(message)
+
         # Step 1: Check for direct agent call
-        called_agent = self.detect_called_agent(message)
+        called_agent = self._called_agent(scan)
         if called_agent:
-            print(f"[ROUTER] 🎯 DIRECT CALL to {called_agent}")
-            agent = self.agents[called_agent]
-            
-            try:
-                response = await agent.process_request(message, context)
-                responses[called_agent] = response
-                print(f"[ROUTER] ✅ {called_agent} responded: {len(response)} chars")
-            except Exception as e:
-                error_msg = f"Error from {called_agent}: {str(e)}"
-                responses[called_agent] = error_msg
-                print(f"[ROUTER] ❌ {called_agent} error: {e}")
-            
-            return responses
-        
+            logger.debug("DIRECT CALL to %s", called_agent)
+            return "direct", (called_agent,)
+
         # Step 2: Check for team call
-        if self.detect_team_call(message) or (requested_agents and len(requested_agents) > 1):
-            print(f"[ROUTER] 👥 TEAM COLLABORATION MODE")
-            target_agents = requested_agents if requested_agents else list(self.agents.keys())
-            
-            # Process all agents in parallel
-            tasks = []
-            for agent_key in target_agents:
-                if agent_key in self.agents:
-                    agent = self.agents[agent_key]
-                    task = agent.process_request(message, context)
-                    tasks.append((agent_key, task))
-            
-            if tasks:
-                print(f"[ROUTER] 🚀 Running {len(tasks)} agents in parallel")
-                results = await asyncio.gather(*[task for _, task in tasks], return_exceptions=True)
-                
-                for (agent_key, _), result in zip(tasks, results):
-                    if isinstance(result, Exception):
-                        responses[agent_key] = f"Error: {str(result)}"
-                        print(f"[ROUTER] ❌ {agent_key} error: {result}")
-                    else:
-                        responses[agent_key] = result
-                        print(f"[ROUTER] ✅ {agent_key} responded: {len(result)} chars")
-            
-            return responses
-        
+        if self.engine.is_team_call(scan) or (requested_agents and len(requested_agents) > 1):
+            logger.debug("TEAM COLLABORATION MODE")
+            target_agents = requested_agents if requested_agents else tuple(self.agents.keys())
+            return "team", tuple(agent_key for agent_key in target_agents if agent_key in self.agents)
+
         # Step 3: Smart single agent selection based on message content
-        selected_agent = self._select_best_agent(message)
+        selected_agent = self._best_agent(scan)
         if selected_agent:
-            print(f"[ROUTER] 🤖 SMART SELECTION: {selected_agent}")
-            agent = self.agents[selected_agent]
-            
-            try:
-                response = await agent.process_request(message, context)
-                responses[selected_agent] = response
-                print(f"[ROUTER] ✅ {selected_agent} responded: {len(response)} chars")
-            except Exception as e:
-                error_msg = f"Error from {selected_agent}: {str(e)}"
-                responses[selected_agent] = error_msg
-                print(f"[ROUTER] ❌ {selected_agent} error: {e}")
-        else:
-            # Default to Sara only if absolutely no other option
-            print(f"[ROUTER] 🎯 DEFAULT to Sara (Requirements Analyst)")
+            logger.debug("SMART SELECTION: %s", selected_agent)
+            return "selected", (selected_agent,)
+
+        # Default to Sara only if absolutely no other option
+        logger.debug("DEFAULT to Sara (Requirements Analyst)")
+        return "default", ("sara",)
+
+    async def route_message(self, message: str, context: dict = None, requested_agents: List[str] = None) -> Dict[str, str]:
+        """
+        Route a message to appropriate agents and return their responses.
+        This is the main entry point that replaces the entire LangGraph workflow.
+        """
+        return {agent_key: response async for agent_key, response in self.stream_route(message, context, requested_agents)}
+
+    async def stream_route(self, message: str, context: dict = None,
+                           requested_agents: List[str] = None) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Like route_message, but yields (agent key, response) as each agent finishes,
+        so a team call delivers its fastest answer without waiting for the slowest.
+        """
+        logger.debug("Routing %r (requested agents: %s)", message, requested_agents)
+        context = context or {}
+
+        with ROUTING_SECONDS.time(entry="simple"), start_span("route", {"route.entry": "simple"}) as span:
+            mode, target_agents = self.plan_route(message, requested_agents)
+            span.set_attributes({"route.mode": mode, "route.agents": target_agents})
+        record_route("simple", mode, target_agents)
+
+        if mode == "team":
+            if not target_agents:
+                return
+            logger.debug("Running %s agents in parallel", len(target_agents))
+            with priority_scope(PRIORITY_TEAM):
+                tasks = [asyncio.ensure_future(self._team_reply(agent_key, message, context)) for agent_key in target_agents]
             try:
-                response = await self.agents["sara"].process_request(message, context)
-                responses["sara"] = response
-                print(f"[ROUTER] ✅ Sara responded: {len(response)} chars")
-            except Exception as e:
-                responses["sara"] = f"Error: {str(e)}"
-                print(f"[ROUTER] ❌ Sara error: {e}")
-        
-        return responses
+                for next_reply in asyncio.as_completed(tasks):
+                    yield await next_reply
+            finally:
+                # The consumer stopped early (e.g. the client went away): don't leave agents running
+                for task in tasks:
+                    task.cancel()
+            return
+
+        agent_key = target_agents[0]
+        try:
+            response = await agent_timeout(self.agents[agent_key].process_request(message, context))
+            logger.debug("%s responded: %s chars", agent_key, len(response))
+        except asyncio.TimeoutError:
+            response = timeout_message(self.agents[agent_key].name)
+            logger.warning("%s timed out", agent_key)
+        except Exception as e:
+            # The Sara fallback has always reported errors without the agent prefix
+            response = f"Error: {str(e)}" if mode == "default" else f"Error from {agent_key}: {str(e)}"
+            logger.error("%s error: %s", agent_key, e)
+        yield agent_key, response
+
+    async def _team_reply(self, agent_key: str, message: str, context: dict) -> Tuple[str, str]:
+        try:
+            response = await agent_timeout(self.agents[agent_key].process_request(message, context))
+            logger.debug("%s responded: %s chars", agent_key, len(response))
+        except asyncio.TimeoutError:
+            response = timeout_message(self.agents[agent_key].name)
+            logger.warning("%s timed out", agent_key)
+        except Exception as e:
+            response = f"Error: {str(e)}"
+            logger.error("%s error: %s", agent_key, e)
+        return agent_key, response
     
     def _select_best_agent(self, message: str) -> Optional[str]:
         """
-        Select the best agent based on message content keywords.
+        Select the best agent for what the message is about.
         This replaces complex LangGraph routing logic.
         """
-        message_lower = message.lower()
-        
-        # Keywords for each agent
-        agent_keywords = {
-            "sara": ["requirement", "requirements", "specification", "spec", "user story", "acceptance criteria", "business rule"],
-            "marc": ["architecture", "design", "system", "structure", "component", "module", "pattern", "framework"],
-            "alex": ["code", "coding", "implement", "development", "programming", "function", "class", "method", "algorithm"],
-            "jess": ["test", "testing", "quality", "bug", "issue", "validation", "verification", "qa", "quality assurance"],
-            "dave": ["deploy", "deployment", "infrastructure", "server", "cloud", "docker", "kubernetes", "devops", "ci/cd"],
-            "emma": ["project", "management", "timeline", "schedule", "milestone", "resource", "planning", "coordination"],
-            "robt": ["security", "vulnerability", "authentication", "authorization", "encryption", "protection", "secure"]
-        }
-        
-        # Score each agent based on keyword matches
-        scores = {}
-        for agent_key, keywords in agent_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in message_lower)
-            if score > 0:
-                scores[agent_key] = score
-        
-        if scores:
-            best_agent = max(scores, key=scores.get)
-            print(f"[ROUTER] 📊 Keyword scoring: {scores} → {best_agent}")
-            return best_agent
-        
-        return None
\ No newline at end of file
+        return self._best_agent(self.engine.scan(message))
+
+    def _best_agent(self, scan: Scan) -> Optional[str]:
+        # The most likely agent, if the intent classifier is confident enough about any
+        best_agent = get_intent_classifier().best(scan.tokens)
+        if best_agent:
+            logger.debug("Intent classifier → %s", best_agent)
+        return best_agent
@@ -5,13 +5,32 @@ Simple WebSocket Handler - Direct message routing without complex workflow manag
 import json
 import asyncio
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 from utils.websocket_manager import WebSocketManager
 from utils.session_manager import SessionManager
 from core.simple_agent_router import SimpleAgentRouter
+from utils.request_context import bind_session, bind_turn
+from utils.tracing import KIND_SERVER, start_span
+from utils.profiling import get_slow_turn_profiler
+from utils.logging_config import get_logger
+from utils.metrics import TURNS, record_error
+from utils.turn_deadline import TurnDeadline
+from utils.turn_recorder import record_turn
 from models.schemas import UserRequest, AgentMessage
 
+logger = get_logger("ws")
+
+
+def turn_context(user_request: UserRequest, timestamp: Optional[str] = None) -> Dict[str, Any]:
+    """The context agents answer a request in (it is part of their prompts)"""
+    return {
+        "project_context": user_request.context.dict() if user_request.context else {},
+        "conversation_history": [msg.dict() for msg in user_request.history],
+        "uploaded_files": [file.dict() for file in user_request.uploaded_files],
+        "timestamp": timestamp or datetime.now().isoformat()
+    }
+
 
 class SimpleWebSocketHandler:
     """
@@ -23,18 +42,19 @@ class SimpleWebSocketHandler:
         self.websocket_manager = websocket_manager
         self.session_manager = session_manager
         self.router = SimpleAgentRouter()
-        print("[WS-HANDLER] 🚀 SimpleWebSocketHandler initialized")
+        logger.debug("SimpleWebSocketHandler initialized")
     
     async def handle_message(self, session_id: str, message_data: dict) -> None:
         """
         Handle incoming WebSocket message with simple, direct routing.
         No complex state management or workflow orchestration.
         """
+        bind_session(session_id)
+        turn_id = bind_turn()
+        turn_span = start_span("turn", {"session.id": session_id, "turn.id": turn_id, "turn.entry": "simple"},
+                               kind=KIND_SERVER, root=True)
         try:
-            print(f"\n{'='*60}")
-            print(f"[WS-HANDLER] 📨 Message received for session: {session_id}")
-            print(f"[WS-HANDLER] 📝 Raw data: {message_data}")
-            print(f"{'='*60}")
+            logger.debug("Message received")
             
             # Parse user request
             try:
@@ -55,35 +75,46 @@ class SimpleWebSocketHandler:
             )
             
             # Extract context information
-            context = {
-                "project_context": user_request.context.dict() if user_request.context else {},
-                "conversation_history": [msg.dict() for msg in user_request.history],
-                "uploaded_files": [file.dict() for file in user_request.uploaded_files],
-                "timestamp": datetime.now().isoformat()
-            }
+            context = turn_context(user_request)
+            # Prompts include the context, so replay needs its timestamp
+            record_turn("simple", message_data, timestamp=context["timestamp"])
             
-            print(f"[WS-HANDLER] 🎯 Routing message: '{user_request.request}'")
-            print(f"[WS-HANDLER] 👥 Requested agents: {user_request.requested_agents}")
+            logger.debug("Routing %d-char message (requested agents: %s)", len(user_request.request), user_request.requested_agents)
             
             # Route message using simple router (NO LANGGRAPH)
             try:
-                responses = await self.router.route_message(
+                responses = {}
+                # Planning is cheap (and cached for short messages); it tells clients how many answers to expect
+                _, target_agents = self.router.plan_route(user_request.request, user_request.requested_agents)
+                deadline = TurnDeadline()
+                
+                async def deliver(reply):
+                    agent_key, response = reply
+                    responses[agent_key] = response
+                    await self._send_agent_response(session_id, agent_key, response, user_request)
+                    await self.websocket_manager.send_agent_status(
+                        session_id, agent_key, "completed", len(responses), len(target_agents)
+                    )
+                
+                # Send each response the moment its agent finishes, until the turn deadline
+                async for reply in deadline.stream(self.router.stream_route(
                     message=user_request.request,
                     context=context,
                     requested_agents=user_request.requested_agents
-                )
-                
-                print(f"[WS-HANDLER] ✅ Got {len(responses)} responses: {list(responses.keys())}")
+                ), on_late=deliver):
+                    await deliver(reply)
                 
-                # Send each response immediately
-                for agent_key, response in responses.items():
-                    await self._send_agent_response(session_id, agent_key, response, user_request)
+                agent_names = list(responses.keys())
+                logger.info("Got %d responses: %s", len(agent_names), agent_names)
+                late_agents = deadline.missed(a for a in target_agents if a not in responses) if deadline.expired else []
+                TURNS.inc(outcome="partial" if late_agents else "completed")
                 
                 # Send completion status
-                agent_names = list(responses.keys())
                 completion_msg = f"Completed with responses from: {', '.join(agent_names)}"
+                if late_agents:
+                    completion_msg += f" (partial: {', '.join(late_agents)} missed the {deadline.deadline:g}s turn deadline)"
                 await self.websocket_manager.send_status_update(
-                    session_id, "completed", completion_msg
+                    session_id, "completed", completion_msg, partial=bool(late_agents)
                 )
                 
                 # Update session completion
@@ -93,12 +124,19 @@ class SimpleWebSocketHandler:
                 })
                 
             except Exception as routing_error:
-                print(f"[WS-HANDLER] ❌ Routing error: {routing_error}")
+                logger.error("Routing error: %s", routing_error, exc_info=True)
+                record_error("turn", routing_error)
+                TURNS.inc(outcome="error")
+                turn_span.record_exception(routing_error)
                 await self._send_error(session_id, f"Error processing request: {routing_error}")
         
         except Exception as e:
-            print(f"[WS-HANDLER] ❌ Fatal error handling message: {e}")
+            logger.error("Fatal error handling message: %s", e, exc_info=True)
+            turn_span.record_exception(e)
             await self._send_error(session_id, f"Internal error: {e}")
+        finally:
+            turn_span.end()
+            get_slow_turn_profiler().turn_finished()
     
     async def _send_agent_response(self, session_id: str, agent_key: str, response: str, user_request: UserRequest) -> None:
         """Send agent response via WebSocket and update session history"""
@@ -116,7 +154,7 @@ class SimpleWebSocketHandler:
             
             display_name = agent_display_names.get(agent_key, agent_key)
             
-            print(f"[WS-HANDLER] 📤 Sending response from {display_name}: {len(response)} chars")
+            logger.debug("Sending response from %s: %s chars", display_name, len(response))
             
             # Send via WebSocket
             await self.websocket_manager.send_agent_response(session_id, display_name, response)
@@ -137,7 +175,7 @@ class SimpleWebSocketHandler:
                 )
                 
         except Exception as e:
-            print(f"[WS-HANDLER] ❌ Error sending agent response: {e}")
+            logger.error("Error sending agent response: %s", e)
     
     async def _send_error(self, session_id: str, error_message: str) -> None:
         """Send error message via WebSocket"""
@@ -145,4 +183,4 @@ class SimpleWebSocketHandler:
             await self.websocket_manager.send_agent_response(session_id, "system", error_message, "error")
             await self.websocket_manager.send_status_update(session_id, "error", "Please try again")
         except Exception as e:
-            print(f"[WS-HANDLER] ❌ Error sending error message: {e}")
\ No newline at end of file
+            logger.error("Error sending error message: %s", e)
\ No newline at end of file
@@ -44,12 +44,13 @@ async def debug_collaboration():
     
     # Test the entry point routing
     entry_result = workflow._route_entry_point(test_state)
-    route_decision = workflow._route_from_entry(entry_result)
+    route_decision = workflow._route_from_entry({**test_state, **entry_result})
     print(f"Route decision: {route_decision}")
     
     if route_decision == "collaboration":
         print("\n=== Testing Direct Collaboration ===")
-        result = await workflow._multi_agent_collaboration(test_state)
+        # The collaboration node only picks the agents; their turns run as parallel agent_turn nodes
+        result = await workflow.workflow.ainvoke(test_state)
         
         print(f"Collaboration result - agents who responded: {list(result['agent_outputs'].keys())}")
         print(f"Total responses: {len(result['agent_outputs'])}")
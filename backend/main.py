@@ -1,5 +1,5 @@
 # main.py
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Response
 from fastapi.middleware.cors import CORSMiddleware
 import json
 import asyncio
@@ -9,22 +9,47 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
+from utils.logging_config import setup_logging, get_logger
+setup_logging()
+
 from utils.websocket_manager import WebSocketManager
 from utils.session_manager import SessionManager
-from workflows.sdlc_workflow import SDLCWorkflow
+from utils.request_context import bind_session, bind_turn
+from utils.tracing import KIND_SERVER, start_span
+from utils.llm_scheduler import get_llm_scheduler
+from utils.usage_ledger import get_usage_ledger
+from utils.profiling import get_slow_turn_profiler
+from utils.loop_monitor import get_loop_monitor
+from utils.turn_deadline import TurnDeadline
+from utils.turn_events import AGENT_FINISHED, AGENT_STARTED, COLLABORATORS, PHASE_CHANGED, TOKEN
+from utils.turn_recorder import record_turn
+from core.intent_classifier import get_intent_classifier
+from core.routing_engine import get_routing_engine
+from utils.metrics import CONTENT_TYPE, TURNS, record_error, render_metrics
+from models.model_router import get_model_router
+from models.groq_models import get_groq_manager
+from workflows.sdlc_workflow import SDLCWorkflow, build_initial_state
 from models.schemas import UserRequest, AgentMessage
 from routes.github_routes import router as github_router
+from routes.usage_routes import router as usage_router
+from routes.admin_routes import router as admin_router
+
+logger = get_logger("main")
 
 websocket_manager = WebSocketManager()
 session_manager = SessionManager()
-sdlc_workflow = None  # Pre-initialized at startup for faster responses
+sdlc_workflow = None  # Built at startup and shared by every turn
+sdlc_workflow_roster = None  # routing fingerprint the workflow's graph was built from
 
 def get_sdlc_workflow():
-    global sdlc_workflow
-    # Force recreation to pick up latest workflow changes during development
-    print("[INIT] Creating new SDLC workflow...")
-    sdlc_workflow = SDLCWorkflow()
-    print("[INIT] SDLC workflow ready")
+    """The shared workflow; rebuilt (both compiled graphs) only when the routing roster changes"""
+    global sdlc_workflow, sdlc_workflow_roster
+    fingerprint = get_routing_engine().fingerprint
+    if sdlc_workflow is None or fingerprint != sdlc_workflow_roster:
+        logger.debug("Creating SDLC workflow")
+        sdlc_workflow = SDLCWorkflow()
+        sdlc_workflow_roster = fingerprint
+        logger.debug("SDLC workflow ready")
     return sdlc_workflow
 
 app = FastAPI(title="FLUX - Where Agents Meet Agile")
@@ -40,28 +65,39 @@ app.add_middleware(
 
 # Include GitHub API routes
 app.include_router(github_router)
+app.include_router(usage_router)
+app.include_router(admin_router)
 
 @app.on_event("startup")
 async def startup_event():
-    print("FLUX - Where Agents Meet Agile starting up...")
+    logger.info("FLUX - Where Agents Meet Agile starting up")
     # Pre-initialize workflow to avoid first-request delay
     workflow = get_sdlc_workflow()
-    print("[STARTUP] Pre-initialized workflow for faster responses")
+    logger.debug("Pre-initialized workflow for faster responses")
+
+    # Let clients know when their LLM calls are waiting on the shared scheduler
+    get_llm_scheduler().add_queue_listener(websocket_manager.send_queue_update)
+    get_usage_ledger().start_flusher()
+    get_slow_turn_profiler().start()
+    get_loop_monitor().start()
+    get_intent_classifier()  # trained from the bundled corpus here rather than on the first request
     
-    # Warm up Groq models for faster first responses
+    # Warm up every model on the shared client pool, then keep its connections alive while idle
     try:
-        from models.groq_models import GroqModelManager
-        groq_manager = GroqModelManager()
-        import asyncio
-        loop = asyncio.get_event_loop()
-        loop.run_in_executor(None, groq_manager.warm_up_models)
-        print("[STARTUP] Started model warm-up process")
+        groq_manager = get_groq_manager()
+        asyncio.create_task(groq_manager.warm_up_models())
+        groq_manager.start_keepalive()
+        logger.info("Started model warm-up process")
     except Exception as e:
-        print(f"[STARTUP] Model warm-up failed: {e}")
+        logger.error("Model warm-up failed: %s", e)
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    print("FLUX - Where Agents Meet Agile shutting down...")
+    logger.info("FLUX - Where Agents Meet Agile shutting down")
+    await get_groq_manager().stop_keepalive()
+    await get_usage_ledger().stop_flusher()
+    get_slow_turn_profiler().stop()
+    await get_loop_monitor().stop()
 
 @app.get("/")
 async def root():
@@ -69,24 +105,40 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now().isoformat(),
+        "llm_queue_depth": get_llm_scheduler().queue_depth(),
+        "models_ready": get_groq_manager().is_ready(),
+        "models": get_groq_manager().readiness
+    }
+
+@app.get("/models")
+async def model_routing():
+    """Per-role model decisions and the live latency statistics behind them"""
+    return get_model_router().snapshot()
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
 
 @app.websocket("/ws/{session_id}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
     """WebSocket endpoint with detailed logging and initial ack."""
+    bind_session(session_id)
     try:
-        print(f"[WS] Incoming connection session={session_id}")
         await websocket_manager.connect(websocket, session_id)
-        print(f"[WS] Accepted session={session_id}")
+        logger.info("Accepted session=%s", session_id)
         # Immediate ack so frontend can confirm open
         await websocket_manager.send_status_update(session_id, "connected", "WebSocket connected")
 
         session_data = session_manager.get_session(session_id)
         if not session_data:
             session_manager.create_session(session_id)
-            print(f"[WS] Created session store {session_id}")
+            logger.debug("Created session store %s", session_id)
         else:
-            print(f"[WS] Loaded existing session store {session_id}")
+            logger.debug("Loaded existing session store %s", session_id)
 
         while True:
             try:
@@ -94,10 +146,11 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
             except WebSocketDisconnect:
                 raise
             except Exception as rec_err:
-                print(f"[WS] Receive error session={session_id}: {rec_err}")
+                logger.warning("Receive error session=%s: %s", session_id, rec_err)
                 await websocket_manager.send_agent_response(session_id, "system", f"Receive error: {rec_err}", "error")
                 continue
 
+            turn_id = bind_turn()
             try:
                 message_data = json.loads(raw)
             except json.JSONDecodeError as je:
@@ -109,32 +162,25 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
             except Exception as e:
                 await websocket_manager.send_agent_response(session_id, "system", f"Invalid request format: {e}", "error")
                 continue
+            if user_request.turn_id:
+                # A retry of an earlier turn: it resumes from that turn's checkpoint
+                turn_id = bind_turn(user_request.turn_id)
+            record_turn("main", message_data)
 
             session_manager.update_session(session_id, {
                 "last_request": user_request.dict(),
                 "project_context": user_request.context.dict() if user_request.context else {}
             })
 
-            await websocket_manager.send_status_update(session_id, "processing", "Initializing agents...")
+            turn_span = start_span("turn", {"session.id": session_id, "turn.id": turn_id, "turn.entry": "main",
+                                            "turn.requested_agents": user_request.requested_agents},
+                                   kind=KIND_SERVER, root=True)
+            await websocket_manager.send_status_update(session_id, "processing", "Initializing agents...", turn_id=turn_id)
 
             try:
-                print(f"[WS] Received request: {user_request}")
-                print(f"[WS] Requested agents: {user_request.requested_agents}")
+                logger.debug("Received request (%d chars, requested agents: %s)", len(user_request.request), user_request.requested_agents)
                 
-                initial_state = {
-                    "user_request": user_request.request,
-                    "current_phase": "initial",
-                    "agent_outputs": {},
-                    "conversation_history": [msg.dict() for msg in user_request.history],
-                    "project_context": user_request.context.dict() if user_request.context else {},
-                    "uploaded_files": [file.dict() for file in user_request.uploaded_files],
-                    "next_agent": "",
-                    "final_response": "",
-                    "requested_agents": user_request.requested_agents,
-                    "called_agent": None
-                }
-                if user_request.requested_agents:
-                    initial_state["current_phase"] = "collaboration"
+                initial_state = build_initial_state(user_request)
 
                 await websocket_manager.send_status_update(session_id, "processing", "Running agent workflow...")
                 workflow = get_sdlc_workflow()
@@ -142,74 +188,98 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                 # Track response count for progress updates
                 response_count = 0
                 all_responses = {}  # Track all responses across state updates
+                active_agents = []  # Agents that answered this turn, in the order they finished
+                collaborators = []  # Agents the collaboration fanned out to; their turns arrive one by one
                 
-                print(f"[WS] Starting workflow execution with state: {list(initial_state.keys())}")
-                print(f"[WS] 🔍 CRITICAL DEBUG: user_request = '{initial_state.get('user_request')}'")
-                print(f"[WS] 🔍 CRITICAL DEBUG: requested_agents = {initial_state.get('requested_agents')}")
-                print(f"[WS] 🔍 CRITICAL DEBUG: called_agent = {initial_state.get('called_agent')}")
-                try:
-                    async for state_update in workflow.workflow.astream(initial_state):
-                        current_state = state_update
-                        print(f"[WS] State update keys: {list(current_state.keys())}")
+                current_phase = initial_state["current_phase"]
+                deadline = TurnDeadline()
+
+                async def deliver(event, late=False):
+                    nonlocal current_phase, collaborators, response_count
+                    if event.type == COLLABORATORS:
+                        collaborators = list(event.agents)
+                        if len(user_request.requested_agents) > 1:
+                            await websocket_manager.broadcast_collaboration(session_id, user_request.requested_agents, "active")
+                    elif event.type == PHASE_CHANGED:
+                        current_phase = event.phase
+                    elif event.type == AGENT_STARTED:
+                        if not late:
+                            await websocket_manager.send_agent_status(session_id, event.agent, "started")
+                    elif event.type == TOKEN:
+                        # Chunks are only a preview; past the deadline the finished answer is all that is sent
+                        if not late:
+                            await websocket_manager.send_agent_token(session_id, event.agent, event.text, event.restart)
+                    elif event.type == AGENT_FINISHED:
+                        agent_name, response = event.agent, event.text
+                        if agent_name in all_responses or not response.strip():
+                            return
+                        all_responses[agent_name] = response
+                        active_agents.append(agent_name)
+                        response_count += 1
+                        logger.debug("New response from %s: %s chars", agent_name, len(response))
+                        
+                        # Send immediate status update per agent (the turn is already over for late ones)
+                        if not late:
+                            await websocket_manager.send_status_update(session_id, "processing", f"{agent_name} is responding...")
+                        
+                        # Send the complete response
+                        await websocket_manager.send_agent_response(session_id, agent_name, response)
+                        await websocket_manager.send_agent_status(
+                            session_id, agent_name, "completed", response_count,
+                            max(len(collaborators), response_count))
+                        
+                        # Broadcast collaboration update when new agents join
+                        if len(active_agents) > len(user_request.requested_agents):
+                            logger.debug("A2A triggered - broadcasting new active agents: %s", active_agents)
+                            await websocket_manager.broadcast_collaboration(session_id, active_agents, "active")
                         
-                        # LangGraph returns node results, but we need the actual state.
-                        # Each node result should contain the updated state
-                        for node_name, node_result in current_state.items():
-                            print(f"[WS] Checking node {node_name}, result type: {type(node_result)}")
-                            
-                            # The node result IS the updated state for that node
-                            if isinstance(node_result, dict) and "agent_outputs" in node_result:
-                                current_outputs = node_result["agent_outputs"]
-                                print(f"[WS] Found agent_outputs in {node_name}: {list(current_outputs.keys())}")
-                                
-                                for agent_name, response in current_outputs.items():
-                                    if agent_name not in all_responses and response and response.strip():  # New non-empty response
-                                        all_responses[agent_name] = response
-                                        response_count += 1
-                                        print(f"[WS] New response from {agent_name}: {len(str(response))} chars")
-                                        
-                                        # Send immediate status update per agent
-                                        await websocket_manager.send_status_update(session_id, "processing", f"{agent_name} is responding...")
-                                        
-                                        # Send the complete response
-                                        response_str = str(response)
-                                        await websocket_manager.send_agent_response(session_id, agent_name, response_str)
-                                        
-                                        # Broadcast collaboration update when new agents join
-                                        current_active_agents = list(all_responses.keys())
-                                        if len(current_active_agents) > len(user_request.requested_agents):
-                                            print(f"[WS] A2A triggered - broadcasting new active agents: {current_active_agents}")
-                                            await websocket_manager.broadcast_collaboration(session_id, current_active_agents, "active")
-                                        
-                                        message = AgentMessage(
-                                            type="agent_response",
-                                            agent=agent_name,
-                                            message=response_str,
-                                            timestamp=datetime.now().isoformat()
-                                        )
-                                        session_manager.add_message_to_history(session_id, message.dict())
+                        message = AgentMessage(
+                            type="agent_response",
+                            agent=agent_name,
+                            message=response,
+                            timestamp=datetime.now().isoformat()
+                        )
+                        session_manager.add_message_to_history(session_id, message.dict())
                         
                         if len(user_request.requested_agents) > 1:
                             await websocket_manager.broadcast_collaboration(session_id, user_request.requested_agents, "active")
-                
-                except Exception as workflow_error:
-                    print(f"[WS] Workflow execution error: {workflow_error}")
-                    print(f"[WS] Workflow error type: {type(workflow_error).__name__}")
-                    raise workflow_error
 
-                await websocket_manager.send_status_update(session_id, "completed", f"Completed with {response_count} agent responses")
+                # Typed events from the workflow: each agent's answer arrives as it finishes; stop waiting at the turn deadline
+                turn_events = workflow.stream_events(initial_state, tokens=user_request.stream_tokens,
+                                                     thread_id=f"{session_id}:{turn_id}")
+                async for event in deadline.stream(turn_events, on_late=lambda event: deliver(event, late=True)):
+                    await deliver(event)
+
+                late_agents = []
+                if deadline.expired:
+                    late_agents = deadline.missed(a for a in collaborators if a not in all_responses)
+                    turn_span.set_attribute("turn.late_agents", late_agents)
+                details = f"Completed with {response_count} agent responses"
+                if deadline.expired:
+                    details += f" (partial: the {deadline.deadline:g}s turn deadline passed"
+                    details += f", still waiting on {', '.join(late_agents)})" if late_agents else ")"
+                await websocket_manager.send_status_update(session_id, "completed", details, partial=deadline.expired)
+                logger.info("Turn completed with %d agent responses", response_count)
+                TURNS.inc(outcome="partial" if deadline.expired else "completed")
+                turn_span.set_attribute("turn.responses", response_count)
+                turn_span.end()
+                get_slow_turn_profiler().turn_finished()
                 session_manager.update_session(session_id, {
                     "last_completion": datetime.now().isoformat(),
-                    "current_phase": current_state.get("current_phase", "completed")
+                    "current_phase": current_phase
                 })
             except Exception as e:
                 error_msg = f"Error processing request: {e}"
-                print(f"[WS] Processing error session={session_id}: {error_msg}")
-                print(f"[WS] Error details: {type(e).__name__}: {str(e)}")
+                logger.error("Processing error session=%s: %s", session_id, e, exc_info=True)
+                record_error("turn", e)
+                TURNS.inc(outcome="error")
+                turn_span.record_exception(e)
+                turn_span.end()
+                get_slow_turn_profiler().turn_finished()
                 
                 # Handle specific conversation management scenarios
                 if "Invalid argument" in str(e) or "Errno 22" in str(e):
-                    print(f"[WS] Detected conversation management scenario - attempting graceful handling")
+                    logger.info("Detected conversation management scenario - attempting graceful handling")
                     try:
                         # Try to send a helpful response instead of an error
                         helpful_message = "I understand you want to manage the conversation participants. Let me help coordinate that for you."
@@ -219,18 +289,15 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                     except Exception:
                         pass  # Fall through to error handling
                 
-                import traceback
-                print(f"[WS] Full traceback: {traceback.format_exc()}")
-                
                 # Send user-friendly error message
                 user_friendly_error = "I'm having trouble processing that request. Please try rephrasing or let me know specifically which agents you'd like to work with."
                 await websocket_manager.send_agent_response(session_id, "system", user_friendly_error, "error")
                 await websocket_manager.send_status_update(session_id, "error", "Please try again")
     except WebSocketDisconnect:
-        print(f"[WS] Disconnect session={session_id}")
+        logger.info("Disconnect session=%s", session_id)
         websocket_manager.disconnect(session_id)
     except Exception as fatal:
-        print(f"[WS] Fatal error session={session_id}: {fatal}")
+        logger.error("Fatal error session=%s: %s", session_id, fatal, exc_info=True)
         try:
             await websocket_manager.send_agent_response(session_id, "system", f"Fatal error: {fatal}", "error")
         except Exception:
@@ -1,15 +1,41 @@
 # main_minimal.py - Absolutely minimal multi-agent system
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Response
 from fastapi.middleware.cors import CORSMiddleware
 import json
 import asyncio
+import functools
 from datetime import datetime
 from dotenv import load_dotenv
 import os
+import time
 
 # Load environment variables
 load_dotenv()
 
+from utils.logging_config import setup_logging, get_logger
+from core.routing_cache import get_routing_cache
+from core.intent_classifier import get_intent_classifier
+from core.routing_engine import ALIAS, COLLABORATION, get_routing_engine
+from core.a2a_planner import A2ATurn, estimate_call_tokens
+from utils.request_context import agent_scope, bind_session, bind_turn
+from utils.metrics import (
+    ACTIVE_WEBSOCKETS, CONTENT_TYPE, LLM_GENERATION_SECONDS, PROMPT_BUILD_SECONDS, ROUTING_SECONDS,
+    TURNS, WS_SEND_SECONDS, record_error, render_metrics
+)
+from utils.usage_ledger import get_usage_ledger
+from routes.usage_routes import router as usage_router
+from routes.admin_routes import router as admin_router
+from utils.profiling import get_slow_turn_profiler
+from utils.loop_monitor import get_loop_monitor
+from utils.tracing import KIND_CLIENT, KIND_SERVER, NOOP_SPAN, start_span, traced
+from utils.turn_deadline import TurnDeadline, agent_timeout, timeout_message
+from utils.turn_recorder import record_route, record_turn, recorded_client
+setup_logging()
+logger = get_logger("main")
+route_logger = get_logger("route")
+collab_logger = get_logger("collab")
+agent_logger = get_logger("agent")
+
 # Get Groq API key
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 if not GROQ_API_KEY:
@@ -18,8 +44,9 @@ if not GROQ_API_KEY:
 
 # Import Groq client
 try:
-    from groq import Groq
-    groq_client = Groq(api_key=GROQ_API_KEY)
+    from groq import AsyncGroq
+    # GROQ_BASE_URL can point at mock_llm_server.py for offline benchmarks
+    groq_client = recorded_client(AsyncGroq(api_key=GROQ_API_KEY, base_url=os.getenv("GROQ_BASE_URL") or None))
     print("✅ Groq client initialized")
 except ImportError:
     print("❌ ERROR: groq library not installed. Run: pip install groq")
@@ -64,8 +91,17 @@ AGENTS = {
     }
 }
 
+# Agents answering one turn run concurrently, at most AGENT_FANOUT_CONCURRENCY at a time.
+# AGENT_DELIVERY=first sends each answer as soon as it is ready; "ordered" keeps the routing order.
+FANOUT_CONCURRENCY = max(1, int(os.getenv("AGENT_FANOUT_CONCURRENCY", 4)))
+DELIVERY = os.getenv("AGENT_DELIVERY", "first").lower()
+LEAVING_KEYWORDS = ["i'll step away", "leaving the chat", "signing off", 
+                    "catch up with you all later", "i'll be offline", 
+                    "stepping away", "going offline"]
+
 # Active WebSocket connections
 active_connections = {}
+ACTIVE_WEBSOCKETS.set_function(lambda: len(active_connections))
 
 app = FastAPI(title="FLUX - Minimal Multi-Agent System")
 
@@ -82,89 +118,63 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
+# Token usage and per-session budgets, opt-in profiling
+app.include_router(usage_router)
+app.include_router(admin_router)
+
+@traced("route", {"route.entry": "minimal"})
+@ROUTING_SECONDS.timed(entry="minimal")
 def detect_target_agents(message: str) -> list:
     """
     Detect which agents are being called directly or if collaboration is needed.
     Enhanced with multi-agent collaboration support.
     """
-    message_lower = message.lower()
-    called_agents = []
-    
-    print(f"[ROUTE] 🔍 Analyzing message: '{message}'")
-    
-    # Check for collaboration keywords
-    collaboration_keywords = [
-        "everyone", "all agents", "team", "collaborate", "work together",
-        "call your team", "team members", "all of you", "everybody",
-        "discuss", "brainstorm", "meeting", "huddle"
-    ]
-    
-    is_collaboration_request = any(keyword in message_lower for keyword in collaboration_keywords)
+    route_logger.debug("Analyzing message %r", message)
+    return list(get_routing_cache().lookup("minimal", message, _plan_target_agents))
+
+def _plan_target_agents(message: str) -> tuple:
+    engine = get_routing_engine()
+    scan = engine.scan(message)
     
-    if is_collaboration_request:
-        print(f"[COLLAB] 🤝 Collaboration request detected - involving all agents")
-        return list(AGENTS.keys())  # Return all agents for collaboration
+    # Team calls and requests for group work ("brainstorm", "work together") involve everyone
+    if engine.is_team_call(scan) or scan.has(COLLABORATION):
+        collab_logger.debug("Collaboration request detected - involving all agents")
+        return tuple(AGENTS.keys())  # Return all agents for collaboration
     
-    # Check for direct agent calls
-    for agent_key, agent_info in AGENTS.items():
-        if agent_key in message_lower or agent_info["name"].lower() in message_lower:
-            called_agents.append(agent_key)
-            print(f"[ROUTE] ✅ DIRECT: Found '{agent_key}' → {agent_info['name']}")
-    
-    # Special handling for common variations
-    if "rob" in message_lower and "robt" not in called_agents:
-        called_agents.append("robt")
-        print(f"[ROUTE] ✅ ALIAS: 'rob' → Robt (Security Expert)")
+    # Check for direct agent calls by any name or alias ("rob" → Robt)
+    named = scan.agents(ALIAS)
+    called_agents = [agent_key for agent_key in AGENTS if agent_key in named]
+    for agent_key in called_agents:
+        route_logger.debug("DIRECT: Found %s", AGENTS[agent_key]['name'])
     
     # If no specific agents called and no collaboration, use intelligent routing
     if not called_agents:
-        called_agents = determine_relevant_agents(message_lower)
+        called_agents = _relevant_agents(scan)
         if called_agents:
-            print(f"[ROUTE] 🧠 INTELLIGENT: Auto-selected agents: {', '.join(called_agents)}")
+            route_logger.debug("INTELLIGENT: Auto-selected agents: %s", ', '.join(called_agents))
         else:
-            print(f"[ROUTE] ⚠️ No agents determined - ending workflow")
+            route_logger.debug("No agents determined - ending workflow")
     
-    return called_agents
+    return tuple(called_agents)
 
 def determine_relevant_agents(message: str) -> list:
     """
     Intelligently determine which agents should handle the request based on content.
     """
-    # Keywords that indicate which agents should be involved
-    agent_keywords = {
-        "sara": ["requirements", "specification", "user story", "analyze", "document", "scope", "gather"],
-        "marc": ["architecture", "design", "system", "technical", "scalability", "structure", "framework"],
-        "alex": ["code", "implement", "develop", "programming", "bug", "feature", "coding", "build"],
-        "jess": ["test", "testing", "quality", "bug", "validation", "verify", "qa", "check"],
-        "dave": ["deploy", "deployment", "infrastructure", "server", "devops", "pipeline", "production"],
-        "emma": ["project", "manage", "timeline", "coordination", "planning", "schedule", "milestone"],
-        "robt": ["security", "secure", "vulnerability", "protect", "authentication", "authorization", "risk"]
-    }
-    
-    relevant_agents = []
-    
-    for agent_key, keywords in agent_keywords.items():
-        if any(keyword in message for keyword in keywords):
-            relevant_agents.append(agent_key)
-    
-    # If it's a complex request, involve multiple key agents
-    complex_indicators = ["project", "system", "application", "solution", "problem", "issue"]
-    if any(indicator in message for indicator in complex_indicators) and len(relevant_agents) < 2:
-        # For complex requests, ensure we have key roles
-        base_team = ["sara", "marc", "alex"]  # Requirements, Architecture, Development
-        for agent in base_team:
-            if agent not in relevant_agents:
-                relevant_agents.append(agent)
-    
-    return relevant_agents
+    return _relevant_agents(get_routing_engine().scan(message))
+
+def _relevant_agents(scan) -> list:
+    # Only the agents the intent classifier is confident about, most likely first
+    return get_intent_classifier().select(scan.tokens)
 
 async def generate_agent_response(agent_key: str, message: str, context: dict = None, collaborating_agents: list = None, is_followup: bool = False) -> str:
     """Generate response from specific agent using Groq with team awareness"""
     try:
         agent = AGENTS[agent_key]
-        print(f"[AGENT] 💭 {agent['name']} generating response...")
+        agent_logger.debug("%s generating response", agent['name'])
         
         # Build team context
+        prompt_started = time.perf_counter()
         team_info = get_team_context(agent_key, collaborating_agents)
         collaboration_context = ""
         
@@ -193,30 +203,37 @@ Instructions:
 - If asked about the team, mention your colleagues and their roles
 - Work collaboratively - build on others' ideas and expertise{collaboration_context}"""
 
+        PROMPT_BUILD_SECONDS.observe(time.perf_counter() - prompt_started, role=agent_key)
+
         # Generate response using Groq
-        response = groq_client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": message}
-            ],
-            max_tokens=1024,
-            temperature=0.7
-        )
+        model = "llama-3.1-8b-instant"
+        get_usage_ledger().check_budget()
+        with LLM_GENERATION_SECONDS.time(model=model, role=agent_key), \
+                start_span("llm.completion", {"llm.model": model, "agent.role": agent_key}, kind=KIND_CLIENT) as llm_span:
+            response = await groq_client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": message}
+                ],
+                max_tokens=1024,
+                temperature=0.7
+            )
         
         agent_response = response.choices[0].message.content
-        print(f"[AGENT] ✅ {agent['name']} response generated: {len(agent_response)} chars")
-        
-        # Check if agent wants to involve other team members
-        additional_agents = extract_agent_mentions(agent_response, agent_key)
-        if additional_agents:
-            print(f"[COLLAB] 🔗 {agent['name']} mentioned: {', '.join([AGENTS[a]['name'] for a in additional_agents])}")
-            return agent_response, additional_agents
+        usage = response.usage
+        # ~4 characters per token when the provider does not report usage
+        tokens_in = usage.prompt_tokens if usage else (len(system_prompt) + len(message)) // 4
+        tokens_out = usage.completion_tokens if usage else len(agent_response or "") // 4
+        get_usage_ledger().record(model, agent_key, tokens_in, tokens_out, estimated=usage is None)
+        llm_span.set_attributes({"llm.tokens.in": tokens_in, "llm.tokens.out": tokens_out})
+        agent_logger.debug("%s response generated: %s chars", agent['name'], len(agent_response))
         
         return agent_response
         
     except Exception as e:
-        print(f"[AGENT] ❌ Error generating response for {agent_key}: {e}")
+        agent_logger.error("Error generating response for %s: %s", agent_key, e)
+        record_error("llm", e)
         return f"Sorry, I'm having trouble responding right now. Error: {e}"
 
 def get_team_context(current_agent: str, collaborating_agents: list = None) -> str:
@@ -240,33 +257,66 @@ def get_team_context(current_agent: str, collaborating_agents: list = None) -> s
     
     return "\n".join(team_members)
 
-def extract_agent_mentions(response: str, current_agent: str) -> list:
-    """Extract mentions of other agents from a response"""
-    mentioned_agents = []
-    response_lower = response.lower()
+async def _agent_turn(agent_key: str, message: str, collaborating_agents: list, is_followup: bool,
+                      slots: asyncio.Semaphore) -> tuple:
+    """One agent's answer as (agent_key, response, error)"""
+    async with slots:
+        try:
+            with agent_scope(agent_key), start_span("agent", {"agent.role": agent_key, "agent.followup": is_followup}):
+                result = await agent_timeout(generate_agent_response(
+                    agent_key,
+                    message,
+                    collaborating_agents=collaborating_agents,
+                    is_followup=is_followup
+                ))
+        except asyncio.TimeoutError:
+            logger.warning("Agent %s timed out", agent_key)
+            return agent_key, timeout_message(AGENTS[agent_key]["name"]), None
+        except Exception as agent_error:
+            logger.error("Error with agent %s: %s", agent_key, agent_error)
+            return agent_key, None, agent_error
     
-    # Look for phrases that suggest involving other agents
-    for agent_key, agent_info in AGENTS.items():
-        if agent_key != current_agent:
-            agent_name = agent_info["name"].lower()
-            first_name = agent_name.split()[0]  # Extract first name
-            
-            # Check for direct mentions or role-based suggestions
-            mention_patterns = [
-                f"get {first_name}",
-                f"involve {first_name}",
-                f"ask {first_name}",
-                f"work with {first_name}",
-                f"bring in {first_name}",
-                f"{first_name} should",
-                f"{first_name} can help",
-                f"recommend {first_name}"
-            ]
-            
-            if any(pattern in response_lower for pattern in mention_patterns):
-                mentioned_agents.append(agent_key)
+    return agent_key, result, None
+
+async def fan_out(agent_keys: list, message: str, collaborating_agents: list, is_followup: bool = False,
+                  delivery: str = DELIVERY):
+    """
+    Run every agent concurrently (at most FANOUT_CONCURRENCY at once) and yield their
+    _agent_turn results: first-come, or in agent_keys order when delivery is "ordered".
+    """
+    slots = asyncio.Semaphore(FANOUT_CONCURRENCY)
+    tasks = [asyncio.ensure_future(_agent_turn(agent_key, message, collaborating_agents, is_followup, slots))
+             for agent_key in agent_keys]
+    try:
+        for next_turn in (tasks if delivery == "ordered" else asyncio.as_completed(tasks)):
+            yield await next_turn
+    finally:
+        # The client went away mid-turn: don't keep paying for answers nobody will read
+        for task in tasks:
+            task.cancel()
+
+async def send_agent_reply(websocket: WebSocket, agent_key: str, response: str, collaboration: bool, followup: bool = False):
+    """Send one agent's answer, and an offline status if the agent signed off in it"""
+    agent_name = AGENTS[agent_key]["name"]
+    data = {
+        "agent": agent_key,  # Use agent_key instead of agent_name for consistency
+        "message": response,
+        "status": "success",
+        "collaboration": collaboration
+    }
+    if followup:
+        data["followup"] = True
+    await send_websocket_message(websocket, "agent_response", data)
     
-    return mentioned_agents
+    # Check if agent is leaving based on response content
+    response_lower = response.lower()
+    if any(keyword in response_lower for keyword in LEAVING_KEYWORDS):
+        logger.info("%s is going offline%s", agent_name, " (follow-up)" if followup else "")
+        await send_websocket_message(websocket, "agent_status", {
+            "agent": agent_key,
+            "status": "offline",
+            "message": f"{agent_name} has gone offline"
+        })
 
 async def send_websocket_message(websocket: WebSocket, message_type: str, data: dict):
     """Send message via WebSocket"""
@@ -276,16 +326,25 @@ async def send_websocket_message(websocket: WebSocket, message_type: str, data:
             "timestamp": datetime.now().isoformat(),
             **data
         }
-        await websocket.send_text(json.dumps(message))
+        with WS_SEND_SECONDS.time(type=message_type), start_span("ws.send", {"message.type": message_type}):
+            await websocket.send_text(json.dumps(message))
     except Exception as e:
-        print(f"[WS] ❌ Error sending message: {e}")
+        logger.error("Error sending message: %s", e)
+        record_error("websocket", e)
 
 @app.on_event("startup")
 async def startup_event():
-    print("🚀 FLUX - Minimal Multi-Agent System starting up...")
-    print("✅ Direct agent routing enabled!")
-    print("✅ No LangGraph complexity!")
-    print("✅ No caching issues!")
+    logger.info("FLUX - Minimal Multi-Agent System starting up")
+    get_usage_ledger().start_flusher()
+    get_slow_turn_profiler().start()
+    get_loop_monitor().start()
+    get_intent_classifier()  # trained from the bundled corpus here rather than on the first request
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await get_usage_ledger().stop_flusher()
+    get_slow_turn_profiler().stop()
+    await get_loop_monitor().stop()
 
 @app.get("/")
 async def root():
@@ -303,14 +362,17 @@ async def health_check():
         "timestamp": datetime.now().isoformat()
     }
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
+
 @app.websocket("/ws/{session_id}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
     """Minimal WebSocket endpoint with direct agent routing"""
+    bind_session(session_id)
     try:
-        print(f"\n{'='*60}")
-        print(f"[WS] 🔌 Connection: {session_id}")
-        print(f"[WS] 🚀 MINIMAL SYSTEM - Direct routing only")
-        print(f"{'='*60}")
+        logger.info("Connection: %s", session_id)
         
         # Accept connection
         await websocket.accept()
@@ -323,11 +385,13 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
         })
         
         # Message handling loop
+        turn_span = NOOP_SPAN
         while True:
             try:
                 # Receive message
                 raw_message = await websocket.receive_text()
-                print(f"[WS] 📨 Raw message: {raw_message[:100]}...")
+                turn_id = bind_turn()
+                logger.debug("Received %d-char message", len(raw_message))
                 
                 # Parse JSON
                 try:
@@ -343,7 +407,10 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                 
                 if not user_message:
                     continue
+                record_turn("minimal", message_data)
                 
+                turn_span = start_span("turn", {"session.id": session_id, "turn.id": turn_id, "turn.entry": "minimal"},
+                                       kind=KIND_SERVER, root=True)
                 # Send processing status
                 await send_websocket_message(websocket, "status", {
                     "status": "processing",
@@ -352,9 +419,12 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                 
                 # Detect target agents (SIMPLE DETECTION)
                 target_agents = detect_target_agents(user_message)
+                record_route("minimal", "target", target_agents)
                 
                 if not target_agents:
                     # No agents detected - just acknowledge
+                    TURNS.inc(outcome="unrouted")
+                    turn_span.end()
                     await send_websocket_message(websocket, "status", {
                         "status": "completed",
                         "message": "No specific agent requested"
@@ -363,127 +433,88 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                 
                 # Generate responses from detected agents
                 is_collaboration = len(target_agents) > 1
-                print(f"[WS] 🎯 Generating responses from: {target_agents}")
+                logger.debug("Generating responses from: %s", target_agents)
                 if is_collaboration:
-                    print(f"[COLLAB] 🤝 Multi-agent collaboration mode activated")
+                    collab_logger.debug("Multi-agent collaboration mode activated")
                 
-                additional_agents_to_call = []
+                responses = {}
+                deadline = TurnDeadline()
                 
-                for agent_key in target_agents:
-                    try:
-                        result = await generate_agent_response(
-                            agent_key, 
-                            user_message, 
-                            collaborating_agents=target_agents,
-                            is_followup=False
-                        )
-                        
-                        # Handle both single response and response with additional agents
-                        if isinstance(result, tuple):
-                            response, mentioned_agents = result
-                            additional_agents_to_call.extend(mentioned_agents)
-                        else:
-                            response = result
-                        
-                        agent_name = AGENTS[agent_key]["name"]
-                        
-                        # Send agent response
-                        await send_websocket_message(websocket, "agent_response", {
-                            "agent": agent_key,  # Use agent_key instead of agent_name for consistency
-                            "message": response,
-                            "status": "success",
-                            "collaboration": is_collaboration
-                        })
-                        
-                        # Check if agent is leaving based on response content
-                        response_lower = response.lower()
-                        leaving_keywords = ["i'll step away", "leaving the chat", "signing off", 
-                                          "catch up with you all later", "i'll be offline", 
-                                          "stepping away", "going offline"]
-                        
-                        if any(keyword in response_lower for keyword in leaving_keywords):
-                            print(f"[STATUS] 👋 {agent_name} is going offline")
-                            await send_websocket_message(websocket, "agent_status", {
-                                "agent": agent_key,
-                                "status": "offline",
-                                "message": f"{agent_name} has gone offline"
-                            })
-                        
-                        print(f"[WS] ✅ Sent response from {agent_name}")
-                        
-                    except Exception as agent_error:
-                        print(f"[WS] ❌ Error with agent {agent_key}: {agent_error}")
+                async def deliver(turn, followup=False):
+                    agent_key, response, agent_error = turn
+                    if agent_error is not None:
+                        if followup:
+                            collab_logger.error("Error with follow-up agent %s: %s", agent_key, agent_error)
+                            return
                         await send_websocket_message(websocket, "agent_response", {
                             "agent": AGENTS[agent_key]["name"],
                             "message": f"Sorry, I'm having trouble responding: {agent_error}",
                             "status": "error"
                         })
+                        return
+                    responses[agent_key] = response
+                    await send_agent_reply(websocket, agent_key, response, is_collaboration or followup, followup=followup)
+                    if followup:
+                        collab_logger.debug("Sent follow-up from %s", AGENTS[agent_key]["name"])
+                    else:
+                        logger.debug("Sent response from %s", AGENTS[agent_key]["name"])
                 
-                # Handle agent-to-agent collaboration
-                if additional_agents_to_call:
-                    additional_agents_to_call = list(set(additional_agents_to_call))  # Remove duplicates
-                    additional_agents_to_call = [a for a in additional_agents_to_call if a not in target_agents]  # Don't repeat
-                    
-                    if additional_agents_to_call:
-                        print(f"[COLLAB] 🔗 Following up with mentioned agents: {', '.join([AGENTS[a]['name'] for a in additional_agents_to_call])}")
-                        
-                        followup_message = f"Following up on the previous discussion: {user_message}"
-                        for agent_key in additional_agents_to_call:
-                            try:
-                                all_involved = target_agents + additional_agents_to_call
-                                response = await generate_agent_response(
-                                    agent_key,
-                                    followup_message,
-                                    collaborating_agents=all_involved,
-                                    is_followup=True
-                                )
-                                
-                                if isinstance(response, tuple):
-                                    response = response[0]  # Just get the response text
-                                
-                                agent_name = AGENTS[agent_key]["name"]
-                                
-                                await send_websocket_message(websocket, "agent_response", {
-                                    "agent": agent_key,  # Use agent_key for consistency
-                                    "message": response,
-                                    "status": "success",
-                                    "collaboration": True,
-                                    "followup": True
-                                })
-                                
-                                # Check if follow-up agent is leaving based on response content
-                                response_lower = response.lower()
-                                leaving_keywords = ["i'll step away", "leaving the chat", "signing off", 
-                                                  "catch up with you all later", "i'll be offline", 
-                                                  "stepping away", "going offline"]
-                                
-                                if any(keyword in response_lower for keyword in leaving_keywords):
-                                    print(f"[STATUS] 👋 {agent_name} is going offline (follow-up)")
-                                    await send_websocket_message(websocket, "agent_status", {
-                                        "agent": agent_key,
-                                        "status": "offline",
-                                        "message": f"{agent_name} has gone offline"
-                                    })
-                                
-                                print(f"[COLLAB] ✅ Sent follow-up from {agent_name}")
-                                
-                            except Exception as agent_error:
-                                print(f"[COLLAB] ❌ Error with follow-up agent {agent_key}: {agent_error}")
-                        
-                        target_agents.extend(additional_agents_to_call)
+                # All target agents answer concurrently; each answer is sent as soon as it is delivered,
+                # until the turn deadline
+                async for turn in deadline.stream(fan_out(target_agents, user_message, collaborating_agents=target_agents),
+                                                  on_late=deliver):
+                    await deliver(turn)
                 
+                # Agent-to-agent collaboration: teammates the answers hand off to join in budgeted
+                # rounds (not once the turn is out of time)
+                a2a_turn = A2ATurn(user_message, target_agents)
+                followup_message = f"Following up on the previous discussion: {user_message}"
+                deliver_followup = functools.partial(deliver, followup=True)
+                round_responses = dict(responses)
+                while round_responses and not deadline.expired:
+                    added_agents = a2a_turn.next_round(round_responses, estimate_call_tokens(followup_message))
+                    if not added_agents:
+                        break
+                    collab_logger.debug("Following up with mentioned agents: %s", added_agents)
+                    record_route("minimal", "a2a", added_agents)
+                    target_agents.extend(added_agents)
+                    answered_before = set(responses)
+                    async for turn in deadline.stream(fan_out(
+                            added_agents, followup_message, collaborating_agents=list(target_agents),
+                            is_followup=True), on_late=deliver_followup):
+                        await deliver_followup(turn)
+                    round_responses = {k: v for k, v in responses.items() if k not in answered_before}
+                
+                late_agents = deadline.missed(a for a in target_agents if a not in responses) if deadline.expired else []
+                turn_span.set_attribute("turn.late_agents", late_agents)
+                
+                logger.info("Turn completed with responses from %s", target_agents)
+                TURNS.inc(outcome="partial" if deadline.expired else "completed")
+                turn_span.set_attribute("turn.agents", target_agents)
+                turn_span.end()
+                get_slow_turn_profiler().turn_finished()
+
                 # Send completion status
-                await send_websocket_message(websocket, "status", {
+                completion = {
                     "status": "completed",
-                    "message": f"Responses from: {', '.join([AGENTS[k]['name'] for k in target_agents])}"
-                })
+                    "message": f"Responses from: {', '.join([AGENTS[k]['name'] for k in target_agents if k not in late_agents])}"
+                }
+                if deadline.expired:
+                    completion["partial"] = True
+                    completion["message"] += f" (partial: the {deadline.deadline:g}s turn deadline passed)"
+                await send_websocket_message(websocket, "status", completion)
                 
             except WebSocketDisconnect:
-                print(f"[WS] 👋 Client disconnected: {session_id}")
+                logger.info("Client disconnected: %s", session_id)
                 break
                 
             except Exception as e:
-                print(f"[WS] ❌ Message processing error: {e}")
+                logger.error("Message processing error: %s", e, exc_info=True)
+                record_error("turn", e)
+                TURNS.inc(outcome="error")
+                turn_span.record_exception(e)
+                turn_span.end()
+                get_slow_turn_profiler().turn_finished()
                 try:
                     await send_websocket_message(websocket, "agent_response", {
                         "agent": "system",
@@ -491,17 +522,17 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                         "status": "error"
                     })
                 except Exception:
-                    print(f"[WS] ❌ Failed to send error message")
+                    logger.error("Failed to send error message")
                     break
     
     except Exception as e:
-        print(f"[WS] ❌ Fatal WebSocket error: {e}")
+        logger.error("Fatal WebSocket error: %s", e, exc_info=True)
     
     finally:
         # Clean up connection
         if session_id in active_connections:
             del active_connections[session_id]
-        print(f"[WS] 🧹 Cleaned up connection: {session_id}")
+        logger.debug("Cleaned up connection: %s", session_id)
 
 @app.get("/agents")
 async def list_agents():
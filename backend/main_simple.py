@@ -1,5 +1,5 @@
 # main_simple.py - Simplified main without LangGraph complexity
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Response
 from fastapi.middleware.cors import CORSMiddleware
 import json
 import asyncio
@@ -9,10 +9,26 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+from utils.logging_config import setup_logging, get_logger
+setup_logging()
+
 from utils.websocket_manager import WebSocketManager
 from utils.session_manager import SessionManager
+from utils.request_context import bind_session
+from utils.llm_scheduler import get_llm_scheduler
+from utils.usage_ledger import get_usage_ledger
+from utils.profiling import get_slow_turn_profiler
+from utils.loop_monitor import get_loop_monitor
+from core.intent_classifier import get_intent_classifier
+from utils.metrics import CONTENT_TYPE, render_metrics
+from models.model_router import get_model_router
+from models.groq_models import get_groq_manager
 from core.simple_websocket_handler import SimpleWebSocketHandler
 from routes.github_routes import router as github_router
+from routes.usage_routes import router as usage_router
+from routes.admin_routes import router as admin_router
+
+logger = get_logger("main")
 
 # Initialize managers
 websocket_manager = WebSocketManager()
@@ -32,16 +48,33 @@ app.add_middleware(
 
 # Include GitHub API routes
 app.include_router(github_router)
+app.include_router(usage_router)
+app.include_router(admin_router)
 
 @app.on_event("startup")
 async def startup_event():
-    print("🚀 FLUX - Simple Multi-Agent System starting up...")
-    print("✅ No LangGraph workflow caching issues!")
-    print("✅ Direct agent routing enabled!")
+    logger.info("FLUX - Simple Multi-Agent System starting up")
+    get_llm_scheduler().add_queue_listener(websocket_manager.send_queue_update)
+    get_usage_ledger().start_flusher()
+    get_slow_turn_profiler().start()
+    get_loop_monitor().start()
+    get_intent_classifier()  # trained from the bundled corpus here rather than on the first request
+
+    # Warm up every model on the shared client pool, then keep its connections alive while idle
+    try:
+        groq_manager = get_groq_manager()
+        asyncio.create_task(groq_manager.warm_up_models())
+        groq_manager.start_keepalive()
+    except Exception as e:
+        logger.error("Model warm-up failed: %s", e)
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    print("👋 FLUX - Simple Multi-Agent System shutting down...")
+    logger.info("FLUX - Simple Multi-Agent System shutting down")
+    await get_groq_manager().stop_keepalive()
+    await get_usage_ledger().stop_flusher()
+    get_slow_turn_profiler().stop()
+    await get_loop_monitor().stop()
 
 @app.get("/")
 async def root():
@@ -57,20 +90,31 @@ async def health_check():
     return {
         "status": "healthy", 
         "timestamp": datetime.now().isoformat(),
-        "system": "simple_multi_agent"
+        "system": "simple_multi_agent",
+        "llm_queue_depth": get_llm_scheduler().queue_depth(),
+        "models_ready": get_groq_manager().is_ready(),
+        "models": get_groq_manager().readiness
     }
 
+@app.get("/models")
+async def model_routing():
+    """Per-role model decisions and the live latency statistics behind them"""
+    return get_model_router().snapshot()
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
+
 @app.websocket("/ws/{session_id}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
     """
     Simplified WebSocket endpoint with direct agent routing.
     No complex workflow state management or LangGraph caching.
     """
+    bind_session(session_id)
     try:
-        print(f"\n{'='*60}")
-        print(f"[WS] 🔌 Connection request: {session_id}")
-        print(f"[WS] 🚀 Using SIMPLE routing (no LangGraph)")
-        print(f"{'='*60}")
+        logger.info("Connection request: %s", session_id)
         
         # Accept connection
         await websocket_manager.connect(websocket, session_id)
@@ -84,16 +128,16 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
         session_data = session_manager.get_session(session_id)
         if not session_data:
             session_manager.create_session(session_id)
-            print(f"[WS] ✅ Created new session: {session_id}")
+            logger.debug("Created new session: %s", session_id)
         else:
-            print(f"[WS] ♻️  Loaded existing session: {session_id}")
+            logger.debug("Loaded existing session: %s", session_id)
         
         # Message handling loop
         while True:
             try:
                 # Receive message
                 raw_message = await websocket.receive_text()
-                print(f"[WS] 📨 Raw message received: {raw_message[:100]}...")
+                logger.debug("Received %d-char message", len(raw_message))
                 
                 # Parse JSON
                 try:
@@ -108,27 +152,27 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                 await ws_handler.handle_message(session_id, message_data)
                 
             except WebSocketDisconnect:
-                print(f"[WS] 👋 Client disconnected: {session_id}")
+                logger.info("Client disconnected: %s", session_id)
                 break
                 
             except Exception as e:
-                print(f"[WS] ❌ Message processing error: {e}")
+                logger.error("Message processing error: %s", e, exc_info=True)
                 try:
                     await websocket_manager.send_agent_response(
                         session_id, "system", 
                         f"Error processing message: {e}", "error"
                     )
                 except Exception:
-                    print(f"[WS] ❌ Failed to send error message: {e}")
+                    logger.error("Failed to send error message: %s", e)
                     break
     
     except Exception as e:
-        print(f"[WS] ❌ Fatal WebSocket error: {e}")
+        logger.error("Fatal WebSocket error: %s", e, exc_info=True)
     
     finally:
         # Clean up connection
         websocket_manager.disconnect(session_id)
-        print(f"[WS] 🧹 Cleaned up connection: {session_id}")
+        logger.debug("Cleaned up connection: %s", session_id)
 
 # Session management endpoints
 @app.get("/sessions/{session_id}")
@@ -0,0 +1,240 @@
+# mock_llm_server.py - Local Groq/OpenAI-compatible chat-completions stub
+"""
+Offline stand-in for the Groq API, for load and latency testing without a key or network.
+
+Speaks the chat-completions protocol (streaming SSE and plain JSON) on both
+/openai/v1 (Groq SDK) and /v1 (OpenAI clients), with configurable time to
+first token, decode speed, error injection and rate limiting.
+
+Usage:
+    python mock_llm_server.py --port 9000 --ttft-ms 250 --tps 200
+    GROQ_BASE_URL=http://127.0.0.1:9000 GROQ_API_KEY=mock python main.py
+
+Settings can also be changed at runtime with POST /mock/config, and per model
+with MOCK_MODEL_PROFILES='{"llama-3.3-70b-versatile": {"ttft_ms": 800, "tps": 80}}'.
+
+Also stands in for an OTLP/HTTP trace collector: POST /v1/traces (JSON) is
+kept in memory for GET /mock/traces and appended to MOCK_TRACES_FILE if set.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+import uuid
+from collections import deque
+from typing import Any, Dict
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+WORDS = (
+    "requirements architecture service deploy pipeline test coverage security review sprint backlog "
+    "api database cache latency scale module interface contract release monitoring rollout team"
+).split()
+
+config: Dict[str, Any] = {
+    "ttft_ms": float(os.getenv("MOCK_TTFT_MS", 200)),               # delay before the first content chunk
+    "tps": float(os.getenv("MOCK_TOKENS_PER_SECOND", 150)),        # decode speed after the first token
+    "response_tokens": int(os.getenv("MOCK_RESPONSE_TOKENS", 120)),
+    "jitter": float(os.getenv("MOCK_JITTER", 0.1)),                # +/- fraction applied to TTFT
+    "error_rate": float(os.getenv("MOCK_ERROR_RATE", 0.0)),        # share of requests answered with a 500
+    "rate_limit_rate": float(os.getenv("MOCK_RATE_LIMIT_RATE", 0.0)),  # share answered with a 429
+    "tpm_limit": int(os.getenv("MOCK_TPM_LIMIT", 0)),               # per-model token bucket, 0 = unlimited
+    "retry_after_s": float(os.getenv("MOCK_RETRY_AFTER_S", 1.0)),
+    "seed": int(os.getenv("MOCK_SEED", 42)),
+    "model_profiles": json.loads(os.getenv("MOCK_MODEL_PROFILES", "{}")),
+}
+
+rng = random.Random(config["seed"])
+buckets: Dict[str, Dict[str, float]] = {}
+stats = {"requests": 0, "streams": 0, "errors": 0, "rate_limited": 0, "tokens": 0, "trace_exports": 0}
+traces: deque = deque(maxlen=int(os.getenv("MOCK_TRACES_KEPT", 500)))
+TRACES_FILE = os.getenv("MOCK_TRACES_FILE")
+
+app = FastAPI(title="FLUX - Mock LLM Server")
+
+
+def _settings(model: str) -> Dict[str, Any]:
+    settings = dict(config)
+    settings.update(config["model_profiles"].get(model, {}))
+    return settings
+
+
+def _estimate_prompt_tokens(messages) -> int:
+    return sum(len(str(m.get("content", ""))) for m in messages) // 4 + 1
+
+
+def _reply_tokens(model: str, messages, count: int):
+    """Deterministic pseudo-text derived from the prompt so repeated runs stream identical output"""
+    digest = hashlib.sha256((model + json.dumps(messages, sort_keys=True)).encode()).digest()
+    tokens = [f"[mock {model}]"]
+    for i in range(count - 1):
+        tokens.append(" " + WORDS[digest[i % len(digest)] % len(WORDS)] if i % 12 else ".")
+    return tokens
+
+
+def _rate_limit_headers(settings: Dict[str, Any], remaining: int = 0) -> Dict[str, str]:
+    reset = settings["retry_after_s"]
+    return {
+        "retry-after": f"{reset:g}",
+        "x-ratelimit-limit-tokens": str(settings["tpm_limit"] or 0),
+        "x-ratelimit-remaining-tokens": str(max(0, remaining)),
+        "x-ratelimit-reset-tokens": f"{reset:g}s",
+    }
+
+
+def _take_tokens(model: str, settings: Dict[str, Any], cost: int) -> bool:
+    limit = settings["tpm_limit"]
+    if not limit:
+        return True
+    now = time.monotonic()
+    bucket = buckets.setdefault(model, {"tokens": float(limit), "updated": now})
+    bucket["tokens"] = min(limit, bucket["tokens"] + (now - bucket["updated"]) * limit / 60.0)
+    bucket["updated"] = now
+    if bucket["tokens"] < min(cost, limit):
+        return False
+    bucket["tokens"] -= min(cost, limit)
+    return True
+
+
+def _error(status: int, message: str, error_type: str, headers: Dict[str, str] = None) -> JSONResponse:
+    return JSONResponse(status_code=status, headers=headers or {},
+                        content={"error": {"message": message, "type": error_type, "code": error_type}})
+
+
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "mock-model")
+    messages = body.get("messages", [])
+    settings = _settings(model)
+    stats["requests"] += 1
+
+    count = max(1, min(int(body.get("max_tokens") or settings["response_tokens"]), settings["response_tokens"]))
+    prompt_tokens = _estimate_prompt_tokens(messages)
+
+    roll = rng.random()
+    if roll < settings["rate_limit_rate"] or not _take_tokens(model, settings, prompt_tokens + count):
+        stats["rate_limited"] += 1
+        return _error(429, f"Rate limit reached for model `{model}`", "rate_limit_exceeded",
+                      _rate_limit_headers(settings))
+    if roll < settings["rate_limit_rate"] + settings["error_rate"]:
+        stats["errors"] += 1
+        return _error(500, "Injected upstream failure", "internal_server_error")
+
+    tokens = _reply_tokens(model, messages, count)
+    stats["tokens"] += len(tokens)
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+    created = int(time.time())
+    ttft = settings["ttft_ms"] / 1000.0 * (1 + rng.uniform(-settings["jitter"], settings["jitter"]))
+    usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(tokens),
+             "total_tokens": prompt_tokens + len(tokens)}
+
+    if not body.get("stream"):
+        await asyncio.sleep(ttft + len(tokens) / settings["tps"])
+        return {
+            "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": "".join(tokens)}}],
+            "usage": usage,
+        }
+
+    stats["streams"] += 1
+
+    def chunk(delta: Dict[str, Any], finish_reason=None, extra: Dict[str, Any] = None) -> str:
+        payload = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                   "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+        if extra:
+            payload.update(extra)
+        return f"data: {json.dumps(payload)}\n\n"
+
+    async def events():
+        yield chunk({"role": "assistant", "content": ""})
+        await asyncio.sleep(ttft)
+        interval = 1.0 / settings["tps"]
+        for token in tokens:
+            yield chunk({"content": token})
+            await asyncio.sleep(interval)
+        # Groq reports usage on the final chunk under x_groq
+        yield chunk({}, "stop", {"x_groq": {"id": completion_id, "usage": usage}})
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+async def list_models():
+    models = set(config["model_profiles"]) | set(buckets) | {
+        "llama-3.3-70b-versatile", "llama-3.1-8b-instant", "openai/gpt-oss-120b", "openai/gpt-oss-20b"
+    }
+    return {"object": "list", "data": [{"id": m, "object": "model", "owned_by": "mock"} for m in sorted(models)]}
+
+
+for prefix in ("/openai/v1", "/v1"):
+    app.add_api_route(f"{prefix}/chat/completions", chat_completions, methods=["POST"])
+    app.add_api_route(f"{prefix}/models", list_models, methods=["GET"])
+
+
+@app.post("/v1/traces")
+async def collect_traces(request: Request):
+    """OTLP/HTTP JSON trace export (ExportTraceServiceRequest)"""
+    payload = await request.json()
+    traces.append(payload)
+    stats["trace_exports"] += 1
+    if TRACES_FILE:
+        with open(TRACES_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(payload, separators=(",", ":")) + "\n")
+    return {"partialSuccess": {}}
+
+
+@app.get("/mock/traces")
+async def get_traces():
+    return {"count": len(traces), "traces": list(traces)}
+
+
+@app.get("/mock/config")
+async def get_config():
+    return {"config": config, "stats": stats}
+
+
+@app.post("/mock/config")
+async def update_config(request: Request):
+    """Change latency/error settings between benchmark phases; 'seed' also resets the RNG"""
+    global rng
+    updates = await request.json()
+    config.update({k: v for k, v in updates.items() if k in config})
+    if "seed" in updates:
+        rng = random.Random(config["seed"])
+    buckets.clear()
+    return {"config": config}
+
+
+@app.get("/health")
+async def health_check():
+    return {"status": "healthy", "system": "mock_llm", "stats": stats}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Local Groq/OpenAI-compatible mock LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--ttft-ms", type=float, default=config["ttft_ms"])
+    parser.add_argument("--tps", type=float, default=config["tps"])
+    parser.add_argument("--response-tokens", type=int, default=config["response_tokens"])
+    parser.add_argument("--error-rate", type=float, default=config["error_rate"])
+    parser.add_argument("--rate-limit-rate", type=float, default=config["rate_limit_rate"])
+    parser.add_argument("--tpm-limit", type=int, default=config["tpm_limit"])
+    parser.add_argument("--seed", type=int, default=config["seed"])
+    args = parser.parse_args()
+
+    config.update({
+        "ttft_ms": args.ttft_ms, "tps": args.tps, "response_tokens": args.response_tokens,
+        "error_rate": args.error_rate, "rate_limit_rate": args.rate_limit_rate,
+        "tpm_limit": args.tpm_limit, "seed": args.seed,
+    })
+    rng = random.Random(args.seed)
+    print(f"🧪 Mock LLM server on http://{args.host}:{args.port} (TTFT {args.ttft_ms:g}ms, {args.tps:g} tok/s)")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -1,11 +1,42 @@
 # models/groq_models.py
-from groq import Groq
+from groq import AsyncGroq
 from typing import Dict, Any, List, Optional
+import asyncio
 import os
 import time
 import json
 from functools import lru_cache
 
+from utils.llm_scheduler import get_llm_scheduler
+from models.model_router import get_model_router
+from models.resilience import (
+    CircuitBreaker, backoff_delay, error_headers, is_model_error, is_retryable, reset_hint
+)
+from utils.logging_config import get_logger
+from utils.metrics import LLM_GENERATION_SECONDS, LLM_TTFT_SECONDS, record_error
+from utils.tracing import KIND_CLIENT, start_span
+from utils.turn_events import TokenTap, token_tap
+from utils.turn_recorder import recorded_client
+from utils.usage_ledger import get_usage_ledger
+
+logger = get_logger("groq")
+
+MAX_COMPLETION_TOKENS = 1024  # Reduced from 4096 to avoid token limit errors
+
+# Resilience settings
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 2))                  # retries per model before failing over
+RETRY_MAX_WAIT = float(os.getenv("LLM_RETRY_MAX_WAIT", 20))         # longer reset hints fail over instead of sleeping
+BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", 5))      # consecutive failures that open a model's breaker
+BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", 30))     # seconds before a half-open probe
+HEDGING_ENABLED = os.getenv("LLM_HEDGING", "true").lower() == "true"
+HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", 95))     # hedge once TTFT exceeds this percentile
+HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", 20))     # TTFT samples needed before hedging kicks in
+
+# Warm-up settings
+WARMUP_CONCURRENCY = int(os.getenv("LLM_WARMUP_CONCURRENCY", 4))
+WARMUP_TIMEOUT = float(os.getenv("LLM_WARMUP_TIMEOUT", 15))
+KEEPALIVE_INTERVAL = float(os.getenv("LLM_KEEPALIVE_INTERVAL", 60))  # idle seconds before a keep-alive ping
+
 class GroqModelManager:
     def __init__(self):
         # Ensure environment variables are loaded
@@ -15,21 +46,33 @@ class GroqModelManager:
         api_key = os.getenv("GROQ_API_KEY")
         if not api_key:
             raise ValueError("GROQ_API_KEY environment variable is required")
-        self.client = Groq(api_key=api_key)
+        # GROQ_BASE_URL points the client elsewhere, e.g. mock_llm_server.py for offline benchmarks
+        base_url = os.getenv("GROQ_BASE_URL") or None
+        if base_url:
+            logger.info("Using base URL %s", base_url)
+        # Retries are handled by generate() so the SDK's own retry loop is disabled
+        self.async_client = recorded_client(AsyncGroq(api_key=api_key, base_url=base_url, max_retries=0))
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+        # Warm-up / keep-alive state reported through /health
+        self.readiness: Dict[str, Dict[str, Any]] = {}
+        self._last_activity = time.monotonic()
+        self._keepalive_task: Optional[asyncio.Task] = None
         
         # Response cache for common queries (simple in-memory cache)
         self._cache = {}
         self._cache_ttl = 300  # 5 minutes
 
-        # Different models for different SDLC roles - Using 5 unique text generation models (Whisper excluded as it's audio-only)
-        self.model_mapping = {
-            "requirements_analyst": "llama-3.3-70b-versatile",           # Advanced analysis capabilities for complex requirement gathering
-            "software_architect": "llama-3.1-8b-instant",               # Fast architectural decisions and system design  
-            "developer": "openai/gpt-oss-120b",                         # Code generation and development tasks with high context (131K tokens)
-            "qa_tester": "openai/gpt-oss-20b",                          # Thorough testing analysis and quality assurance (65K max completion)
-            "devops_engineer": "meta-llama/llama-guard-4-12b",          # Infrastructure and deployment with safety focus (20MB file support)
-            "project_manager": "llama-3.1-8b-instant",                  # Quick project decisions and coordination (reusing for speed)
-            "security_expert": "llama-3.3-70b-versatile"               # Security analysis and recommendations (reusing for expertise)
+        # Live model selection per role; model_mapping keeps each role's default for warm-up and logging
+        self.router = get_model_router()
+        self.model_mapping = {role: self.router.default_model(role) for role in self.router.role_candidates}
+
+        # Interchangeable chat models to fail over (or hedge) to, in order of preference
+        self.model_fallbacks = {
+            "llama-3.3-70b-versatile": ["openai/gpt-oss-120b", "llama-3.1-8b-instant"],
+            "openai/gpt-oss-120b": ["llama-3.3-70b-versatile", "openai/gpt-oss-20b"],
+            "openai/gpt-oss-20b": ["llama-3.1-8b-instant", "openai/gpt-oss-120b"],
+            "llama-3.1-8b-instant": ["openai/gpt-oss-20b", "llama-3.3-70b-versatile"],
         }
 
     def _get_cache_key(self, role: str, messages: List[Dict], temperature: float) -> str:
@@ -44,43 +87,257 @@ class GroqModelManager:
         """Check if cached response is still valid"""
         return time.time() - timestamp < self._cache_ttl
 
-    async def get_completion(self, role: str, messages: list, temperature: float = 0.7, use_cache: bool = False):
-        model = self.model_mapping.get(role, "llama-3.1-8b-instant")
+    async def get_completion(self, role: str, messages: list, temperature: float = 0.7, use_cache: bool = False,
+                             model: Optional[str] = None):
+        model = model or self.model_mapping.get(role, "llama-3.1-8b-instant")
         
         try:
-            print(f"[GROQ] Requesting completion for {role} using {model}")
-            completion = self.client.chat.completions.create(
+            logger.debug("Requesting completion for %s using %s", role, model)
+            completion = await self.async_client.chat.completions.create(
                 model=model,
                 messages=messages,
                 temperature=temperature,
-                max_tokens=1024,  # Reduced from 4096 to avoid token limit errors
+                max_tokens=MAX_COMPLETION_TOKENS,
                 stream=True  # Always use streaming for better perceived performance
             )
             
             return completion
         except Exception as e:
-            print(f"[GROQ] Error for {role} with {model}: {e}")
+            logger.error("Error for %s with %s: %s", role, model, e)
             raise
 
-    def warm_up_models(self):
-        """Pre-warm models with simple requests for faster first responses"""
-        print("[WARMUP] Starting model warm-up...")
+    @staticmethod
+    def estimate_tokens(messages: List[Dict]) -> int:
+        """Rough prompt size (~4 characters per token) used for admission control"""
+        return sum(len(str(m.get("content", ""))) for m in messages) // 4
+
+    def _breaker(self, model: str) -> CircuitBreaker:
+        if model not in self._breakers:
+            self._breakers[model] = CircuitBreaker(BREAKER_THRESHOLD, BREAKER_COOLDOWN)
+        return self._breakers[model]
+
+    def _candidate_models(self, role: str) -> List[str]:
+        """Router's pick, then the role's other candidates, then generic fallbacks - skipping open breakers"""
+        is_available = lambda model: self._breaker(model).state != "open"
+        primary = self.router.select(role, available=is_available)
+        ordered = [primary] + self.router.candidates(role) + self.model_fallbacks.get(primary, [])
+        return [m for m in dict.fromkeys(ordered) if is_available(m)]
+
+    async def generate(self, role: str, messages: list, temperature: float = 0.7, priority: Optional[int] = None) -> str:
+        """
+        Run a completion through the shared scheduler and return the full streamed text.
+        Transient errors are retried with backoff, persistent ones fail over to a compatible model.
+        Raises TokenBudgetExceeded without calling out if the session has used its token budget.
+        """
+        get_usage_ledger().check_budget()
+        candidates = self._candidate_models(role)
+        last_error: Optional[Exception] = None
+        tap = token_tap()  # one tap across retries and fail-over, so a client sees a single stream
+
+        for index, model in enumerate(candidates):
+            hedge_model = next(iter(candidates[index + 1:]), None) if HEDGING_ENABLED else None
+            breaker = self._breaker(model)
+            for attempt in range(MAX_RETRIES + 1):
+                probe = breaker.state == "half_open"
+                if not breaker.allow():
+                    break
+                try:
+                    return await self._generate_hedged(role, model, hedge_model, messages, temperature, priority, tap)
+                except Exception as e:
+                    last_error = e
+                    if not is_retryable(e):
+                        if is_model_error(e):
+                            logger.warning("%s rejected request for %s, failing over: %s", model, role, e)
+                            break
+                        raise
+                    hint = reset_hint(error_headers(e))
+                    if hint is not None and hint > RETRY_MAX_WAIT:
+                        logger.warning("%s rate limited for %.1fs, failing over", model, hint)
+                        break
+                    if attempt < MAX_RETRIES:
+                        delay = backoff_delay(attempt, hint, cap=RETRY_MAX_WAIT)
+                        logger.warning("Retry %s/%s for %s on %s in %.2fs: %s", attempt + 1, MAX_RETRIES, role, model, delay, e)
+                        await asyncio.sleep(delay)
+                finally:
+                    # Only retryable failures and successes settle a probe; any other exit must not wedge it
+                    if probe:
+                        breaker.release_probe()
+
+        raise last_error or RuntimeError(f"No model available for {role}: all circuit breakers are open")
+
+    async def _generate_hedged(self, role: str, model: str, hedge_model: Optional[str], messages: list,
+                               temperature: float, priority: Optional[int], tap: Optional[TokenTap] = None) -> str:
+        """Start on `model`; if no first token by its TTFT percentile, race a hedge on `hedge_model`"""
+        first_token = asyncio.Event()
+        primary = asyncio.ensure_future(self._stream_once(role, model, messages, temperature, priority, first_token, tap))
+
+        ttft = self.router.stats_for(model).ttft
+        threshold = ttft.percentile(HEDGE_PERCENTILE) if len(ttft) >= HEDGE_MIN_SAMPLES else None
+        if hedge_model is None or threshold is None or self._breaker(hedge_model).state != "closed":
+            return await primary
+
+        token_wait = asyncio.ensure_future(first_token.wait())
+        try:
+            await asyncio.wait({primary, token_wait}, timeout=threshold, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            token_wait.cancel()
+        if primary.done() or first_token.is_set():
+            return await primary
+
+        logger.info("%s TTFT over p%g (%.2fs) for %s, hedging on %s", model, HEDGE_PERCENTILE, threshold, role, hedge_model)
+        hedge = asyncio.ensure_future(self._stream_once(role, hedge_model, messages, temperature, priority, None, tap))
+        pending = {primary, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            # Both failed - surface the primary's error so retry/failover can classify it
+            return primary.result()
+        finally:
+            for task in (primary, hedge):
+                if not task.done():
+                    task.cancel()
+
+    async def _stream_once(self, role: str, model: str, messages: list, temperature: float,
+                           priority: Optional[int], first_token: Optional[asyncio.Event],
+                           tap: Optional[TokenTap] = None) -> str:
+        """Single upstream call holding a scheduler slot; updates the model's breaker and router statistics"""
+        stream = object()  # this call's identity at the token tap
+        estimated_tokens = self.estimate_tokens(messages) + MAX_COMPLETION_TOKENS
+        breaker = self._breaker(model)
+
+        with start_span("llm.stream", {"llm.model": model, "agent.role": role, "llm.hedge": first_token is None},
+                        kind=KIND_CLIENT) as span:
+            queued = time.monotonic()
+            async with get_llm_scheduler().slot(model, estimated_tokens, priority=priority):
+                started = self._last_activity = time.monotonic()
+                span.add_event("admitted", {"queue_wait_ms": round((started - queued) * 1000, 2)})
+                try:
+                    completion = await self.get_completion(role, messages, temperature, model=model)
+                    try:
+                        parts = []
+                        first_token_at = None
+                        usage = None
+                        async for chunk in completion:
+                            # Groq reports exact token counts on the final chunk (OpenAI-style `usage` on others)
+                            usage = (getattr(getattr(chunk, "x_groq", None), "usage", None)
+                                     or getattr(chunk, "usage", None) or usage)
+                            if chunk.choices and chunk.choices[0].delta.content:
+                                if first_token_at is None:
+                                    first_token_at = time.monotonic()
+                                    span.add_event("first_token", {"ttft_ms": round((first_token_at - started) * 1000, 2)})
+                                    if first_token is not None:
+                                        first_token.set()
+                                parts.append(chunk.choices[0].delta.content)
+                                if tap is not None:
+                                    tap.push(stream, chunk.choices[0].delta.content)
+                    finally:
+                        await completion.close()
+                except asyncio.CancelledError:
+                    # Lost a hedge race or the caller gave up - says nothing about the model's health
+                    if tap is not None:
+                        tap.release(stream)
+                    raise
+                except Exception as e:
+                    if tap is not None:
+                        tap.release(stream)
+                    record_error("llm", e)
+                    if is_retryable(e):
+                        breaker.record_failure()
+                    raise
+
+            finished = time.monotonic()
+            breaker.record_success()
+            LLM_GENERATION_SECONDS.observe(finished - started, model=model, role=role)
+            # One content chunk is roughly one token on Groq's stream when usage is missing
+            tokens_in = getattr(usage, "prompt_tokens", None) or self.estimate_tokens(messages)
+            tokens_out = getattr(usage, "completion_tokens", None) or len(parts)
+            get_usage_ledger().record(model, role, tokens_in, tokens_out, estimated=usage is None)
+            span.set_attributes({"llm.tokens.in": tokens_in, "llm.tokens.out": tokens_out})
+            if first_token_at is not None:
+                LLM_TTFT_SECONDS.observe(first_token_at - started, model=model, role=role)
+                self.router.stats_for(model).record(first_token_at - started, len(parts), finished - first_token_at)
+            return "".join(parts)
+
+    def all_models(self) -> List[str]:
+        """Every distinct model any role may be routed or failed over to"""
+        models = list(self.model_mapping.values())
+        for role in self.router.role_candidates:
+            models += self.router.candidates(role)
+        for fallbacks in self.model_fallbacks.values():
+            models += fallbacks
+        return list(dict.fromkeys(models))
+
+    async def warm_up_models(self):
+        """Pre-warm every configured model concurrently (bounded) on the shared client pool"""
+        logger.info("Starting model warm-up")
         warm_up_messages = [
             {"role": "system", "content": "You are a helpful assistant."},
             {"role": "user", "content": "Hello"}
         ]
-        
-        for role in ["requirements_analyst", "software_architect", "developer"]:
+        semaphore = asyncio.Semaphore(WARMUP_CONCURRENCY)
+
+        async def warm(model: str):
+            async with semaphore:
+                started = time.monotonic()
+                try:
+                    await asyncio.wait_for(self.async_client.chat.completions.create(
+                        model=model,
+                        messages=warm_up_messages,
+                        temperature=0.1,
+                        max_tokens=1,
+                        stream=False
+                    ), timeout=WARMUP_TIMEOUT)
+                    self.readiness[model] = {"ready": True, "latency": round(time.monotonic() - started, 3),
+                                             "checked_at": time.time()}
+                    logger.info("Warmed up %s in %.2fs", model, time.monotonic() - started)
+                except Exception as e:
+                    self.readiness[model] = {"ready": False, "error": str(e) or type(e).__name__,
+                                             "checked_at": time.time()}
+                    logger.warning("Failed to warm up %s: %s", model, e)
+
+        await asyncio.gather(*[warm(model) for model in self.all_models()])
+        self._last_activity = time.monotonic()
+        ready = sum(1 for state in self.readiness.values() if state["ready"])
+        logger.info("%s/%s models ready", ready, len(self.readiness))
+
+    def is_ready(self) -> bool:
+        return bool(self.readiness) and all(state["ready"] for state in self.readiness.values())
+
+    def start_keepalive(self, interval: float = None):
+        """Keep pooled connections open while idle with token-free pings (model listing)"""
+        if self._keepalive_task is None or self._keepalive_task.done():
+            self._keepalive_task = asyncio.ensure_future(self._keepalive_loop(interval or KEEPALIVE_INTERVAL))
+
+    async def stop_keepalive(self):
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            try:
+                await self._keepalive_task
+            except asyncio.CancelledError:
+                pass
+            self._keepalive_task = None
+
+    async def _keepalive_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            if time.monotonic() - self._last_activity < interval:
+                continue  # real traffic is keeping the connections warm
             try:
-                # Fire and forget warm-up requests
-                model = self.model_mapping.get(role, "llama-3.1-8b-instant")
-                self.client.chat.completions.create(
-                    model=model,
-                    messages=warm_up_messages,
-                    temperature=0.1,
-                    max_tokens=10,
-                    stream=False
-                )
-                print(f"[WARMUP] Warmed up {role}")
+                await self.async_client.models.list()
+                self._last_activity = time.monotonic()
             except Exception as e:
-                print(f"[WARMUP] Failed to warm up {role}: {e}")
\ No newline at end of file
+                logger.debug("Keep-alive ping failed: %s", e)
+
+
+_manager: Optional[GroqModelManager] = None
+
+
+def get_groq_manager() -> GroqModelManager:
+    """Process-wide manager so every agent shares one client pool, breakers and warm connections"""
+    global _manager
+    if _manager is None:
+        _manager = GroqModelManager()
+    return _manager
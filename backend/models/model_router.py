@@ -0,0 +1,150 @@
+# models/model_router.py
+"""
+Latency-aware model selection per SDLC role.
+
+Each role has a curated set of candidate models that are all acceptable for
+its work. The router keeps live TTFT and tokens-per-second statistics per
+model and, by default, picks the cheapest candidate whose p95 TTFT meets the
+latency SLO - so throughput follows provider conditions instead of a fixed
+one-model-per-role table.
+"""
+import json
+import os
+import random
+import time
+from typing import Callable, Dict, List, Optional
+
+from models.resilience import LatencyWindow
+from utils.logging_config import get_logger
+
+logger = get_logger("model_router")
+
+TTFT_SLO_SECONDS = float(os.getenv("LLM_TTFT_SLO_MS", 1500)) / 1000.0
+ROUTING_POLICY = os.getenv("LLM_ROUTING_POLICY", "cheapest_within_slo")  # or "fastest", "static"
+MIN_SAMPLES = int(os.getenv("LLM_ROUTER_MIN_SAMPLES", 5))            # samples before a model's p95 is trusted
+EXPLORE_RATE = float(os.getenv("LLM_ROUTER_EXPLORE", 0.05))          # share of calls that refresh other candidates' stats
+
+# Relative price per million output tokens (USD), used to rank candidates that meet the SLO
+MODEL_COSTS = {
+    "llama-3.1-8b-instant": 0.08,
+    "openai/gpt-oss-20b": 0.50,
+    "openai/gpt-oss-120b": 0.75,
+    "llama-3.3-70b-versatile": 0.79,
+}
+
+# Candidate models per role, in order of preference when there is no data yet
+DEFAULT_ROLE_CANDIDATES = {
+    "requirements_analyst": ["llama-3.3-70b-versatile", "openai/gpt-oss-120b"],
+    "software_architect": ["llama-3.1-8b-instant", "openai/gpt-oss-20b", "llama-3.3-70b-versatile"],
+    "developer": ["openai/gpt-oss-120b", "llama-3.3-70b-versatile"],
+    "qa_tester": ["openai/gpt-oss-20b", "llama-3.1-8b-instant"],
+    "devops_engineer": ["openai/gpt-oss-20b", "llama-3.1-8b-instant", "llama-3.3-70b-versatile"],
+    "project_manager": ["llama-3.1-8b-instant", "openai/gpt-oss-20b"],
+    "security_expert": ["llama-3.3-70b-versatile", "openai/gpt-oss-120b"],
+}
+
+
+class ModelStats:
+    """Rolling TTFT and decode throughput for one model"""
+
+    def __init__(self):
+        self.ttft = LatencyWindow()
+        self.tokens_per_second = LatencyWindow()
+        self.last_updated: Optional[float] = None
+
+    def record(self, ttft: float, completion_tokens: int, generation_seconds: float) -> None:
+        self.ttft.add(ttft)
+        if completion_tokens > 1 and generation_seconds > 0:
+            self.tokens_per_second.add(completion_tokens / generation_seconds)
+        self.last_updated = time.time()
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        return {
+            "samples": len(self.ttft),
+            "ttft_p50": self.ttft.percentile(50),
+            "ttft_p95": self.ttft.percentile(95),
+            "tokens_per_second_p50": self.tokens_per_second.percentile(50),
+        }
+
+
+class ModelRouter:
+    def __init__(self, role_candidates: Optional[Dict[str, List[str]]] = None,
+                 policy: str = ROUTING_POLICY, slo_seconds: float = TTFT_SLO_SECONDS):
+        if role_candidates is None:
+            # Override per role, e.g. LLM_ROLE_MODELS='{"developer": ["openai/gpt-oss-120b"]}'
+            role_candidates = dict(DEFAULT_ROLE_CANDIDATES)
+            try:
+                role_candidates.update(json.loads(os.getenv("LLM_ROLE_MODELS", "{}")))
+            except json.JSONDecodeError as e:
+                logger.warning("Ignoring invalid LLM_ROLE_MODELS: %s", e)
+        self.role_candidates = role_candidates
+        self.policy = policy
+        self.slo_seconds = slo_seconds
+        self.stats: Dict[str, ModelStats] = {}
+        self.last_decisions: Dict[str, Dict[str, object]] = {}
+
+    def stats_for(self, model: str) -> ModelStats:
+        if model not in self.stats:
+            self.stats[model] = ModelStats()
+        return self.stats[model]
+
+    def default_model(self, role: str) -> str:
+        return self.role_candidates.get(role, ["llama-3.1-8b-instant"])[0]
+
+    def candidates(self, role: str) -> List[str]:
+        return list(self.role_candidates.get(role, [self.default_model(role)]))
+
+    def select(self, role: str, available: Callable[[str], bool] = lambda model: True) -> str:
+        """Pick a model for this call and remember why"""
+        candidates = [m for m in self.candidates(role) if available(m)] or self.candidates(role)
+        model, reason = self._apply_policy(candidates)
+
+        decision = {
+            "model": model,
+            "reason": reason,
+            "policy": self.policy,
+            "p95_ttft": self.stats_for(model).ttft.percentile(95),
+            "at": time.time(),
+        }
+        previous = self.last_decisions.get(role, {}).get("model")
+        self.last_decisions[role] = decision
+        if previous != model:
+            logger.info("%s -> %s (%s)", role, model, reason)
+        return model
+
+    def _apply_policy(self, candidates: List[str]):
+        if self.policy == "static" or len(candidates) == 1:
+            return candidates[0], "static"
+
+        measured = [m for m in candidates if len(self.stats_for(m).ttft) >= MIN_SAMPLES]
+        unmeasured = [m for m in candidates if m not in measured]
+        if unmeasured and (not measured or random.random() < EXPLORE_RATE):
+            return unmeasured[0], "exploring"
+        if measured and random.random() < EXPLORE_RATE:
+            return random.choice(candidates), "exploring"
+
+        p95 = {m: self.stats_for(m).ttft.percentile(95) for m in measured}
+        if self.policy == "cheapest_within_slo":
+            within_slo = [m for m in measured if p95[m] <= self.slo_seconds]
+            if within_slo:
+                return min(within_slo, key=lambda m: MODEL_COSTS.get(m, float("inf"))), "cheapest within SLO"
+        return min(measured, key=lambda m: p95[m]), "fastest p95 TTFT"
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "policy": self.policy,
+            "ttft_slo_seconds": self.slo_seconds,
+            "decisions": self.last_decisions,
+            "models": {model: stats.summary() for model, stats in self.stats.items()},
+        }
+
+
+_router: Optional[ModelRouter] = None
+
+
+def get_model_router() -> ModelRouter:
+    """Process-wide router so every agent's calls feed the same statistics"""
+    global _router
+    if _router is None:
+        _router = ModelRouter()
+    return _router
@@ -0,0 +1,137 @@
+# models/resilience.py
+"""
+Retry, circuit-breaker and latency-tracking helpers for upstream LLM calls.
+
+GroqModelManager combines these into its resilience layer: retries honour
+the provider's rate-limit reset hints, a per-model breaker stops hammering a
+failing model, and observed TTFT percentiles decide when to hedge.
+"""
+import random
+import re
+import time
+from collections import deque
+from typing import Mapping, Optional
+
+import groq
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """Parse Groq reset values such as '7.66s', '2m59.56s' or '120ms' into seconds"""
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def reset_hint(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """Seconds until the provider expects capacity again, from retry-after or x-ratelimit-reset-*"""
+    if not headers:
+        return None
+    hints = [
+        parse_duration(headers.get(name, ""))
+        for name in ("retry-after", "x-ratelimit-reset-tokens", "x-ratelimit-reset-requests")
+    ]
+    hints = [h for h in hints if h is not None]
+    # retry-after is authoritative when present, otherwise wait for the earliest reset
+    if headers.get("retry-after") and hints:
+        return hints[0]
+    return min(hints) if hints else None
+
+
+def backoff_delay(attempt: int, hint: Optional[float] = None, base: float = 0.5, cap: float = 20.0) -> float:
+    """Delay before retry number `attempt` (0-based): the provider hint if any, else jittered exponential"""
+    if hint is not None:
+        return min(cap, hint + random.uniform(0, 0.25))
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def is_retryable(error: Exception) -> bool:
+    """Transient failures worth retrying on the same model"""
+    if isinstance(error, (groq.RateLimitError, groq.InternalServerError, groq.APIConnectionError)):
+        return True
+    return isinstance(error, groq.APIStatusError) and error.status_code in (408, 409, 429, 500, 502, 503, 504)
+
+
+def is_model_error(error: Exception) -> bool:
+    """Failures specific to the model (decommissioned, unsupported, too large) that another model may not hit"""
+    return isinstance(error, (groq.NotFoundError, groq.BadRequestError, groq.UnprocessableEntityError)) or (
+        isinstance(error, groq.APIStatusError) and error.status_code == 413
+    )
+
+
+def error_headers(error: Exception) -> Optional[Mapping[str, str]]:
+    response = getattr(error, "response", None)
+    return getattr(response, "headers", None)
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed -> open for `cooldown` seconds -> half-open single probe"""
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def release_probe(self) -> None:
+        """End a half-open probe without a verdict (cancelled, request rejected), so the next call probes"""
+        self.probing = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.probing or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self.probing = False
+
+
+class LatencyWindow:
+    """Rolling window of recent samples with nearest-rank percentiles"""
+
+    def __init__(self, size: int = 200):
+        self.samples = deque(maxlen=size)
+
+    def add(self, value: float) -> None:
+        self.samples.append(value)
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, int(round(p / 100.0 * len(ordered))) - 1))
+        return ordered[index]
@@ -1,5 +1,5 @@
 # models/schemas.py
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
@@ -29,6 +29,8 @@ class UserRequest(BaseModel):
     requested_agents: List[str] = []
     history: List[AgentMessage] = []
     uploaded_files: List[UploadedFile] = []
+    stream_tokens: bool = False  # main.py: also send each agent's answer as agent_token chunks
+    turn_id: Optional[str] = Field(None, max_length=64, pattern=r"^[A-Za-z0-9_-]+$")  # main.py: retry/resume this turn
 
 class SDLCState(BaseModel):
     user_request: str
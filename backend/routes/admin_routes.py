@@ -0,0 +1,101 @@
+# routes/admin_routes.py
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+import os
+
+from utils.loop_monitor import get_loop_monitor
+from utils.profiling import (
+    PROFILING_ENABLED, collapse, get_slow_turn_profiler, profile_loop, start_tracemalloc, stop_tracemalloc,
+    top_functions, tracemalloc_report
+)
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+MAX_PROFILE_SECONDS = 60
+
+
+def check_admin_token(x_admin_token: Optional[str], required: bool = False) -> None:
+    """401 unless X-Admin-Token matches ADMIN_TOKEN; with `required`, 403 while ADMIN_TOKEN is unset"""
+    if not ADMIN_TOKEN:
+        if required:
+            raise HTTPException(status_code=403, detail="Set ADMIN_TOKEN to use this endpoint")
+        return
+    if x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Profiling endpoints are hidden unless PROFILING_ENABLED=true, and token-gated if ADMIN_TOKEN is set"""
+    if not PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    check_admin_token(x_admin_token)
+
+
+async def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """Token gate for endpoints that are always mounted; refused outright while ADMIN_TOKEN is unset"""
+    check_admin_token(x_admin_token, required=True)
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/profile")
+async def sample_profile(seconds: float = Query(10, gt=0, le=MAX_PROFILE_SECONDS),
+                         interval_ms: float = Query(5, ge=1, le=1000),
+                         format: str = Query("collapsed", pattern="^(collapsed|json)$")):
+    """Sample the event-loop thread for N seconds; collapsed stacks feed flamegraph.pl / speedscope"""
+    stacks = await profile_loop(seconds, interval_ms / 1000.0)
+    if format == "json":
+        return {"seconds": seconds, "samples": len(stacks), "top_functions": top_functions(stacks)}
+    return PlainTextResponse(collapse(stacks), headers={
+        "Content-Disposition": f'attachment; filename="profile-{int(seconds)}s.folded"'
+    })
+
+
+@router.get("/profile/slow-turns")
+async def list_slow_turns():
+    profiler = get_slow_turn_profiler()
+    return {
+        "enabled": profiler.enabled,
+        "threshold_ms": profiler.threshold_ms,
+        "captures": [{k: v for k, v in c.items() if k != "collapsed"} for c in profiler.captures.values()],
+    }
+
+
+@router.get("/profile/slow-turns/{turn_id}")
+async def get_slow_turn(turn_id: str):
+    capture = get_slow_turn_profiler().captures.get(turn_id)
+    if capture is None:
+        raise HTTPException(status_code=404, detail=f"No capture for turn {turn_id}")
+    return PlainTextResponse(capture["collapsed"], headers={
+        "Content-Disposition": f'attachment; filename="turn-{turn_id}.folded"'
+    })
+
+
+@router.post("/tracemalloc/start")
+async def tracemalloc_start(frames: int = Query(1, ge=1, le=50)):
+    start_tracemalloc(frames)
+    return {"tracing": True, "frames": frames}
+
+
+@router.get("/tracemalloc/snapshot")
+async def tracemalloc_snapshot(limit: int = Query(25, ge=1, le=500),
+                               key_type: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+                               compare: bool = False):
+    """Top allocation sites, or growth since start / the previous compare=true call"""
+    try:
+        return tracemalloc_report(limit, key_type, compare)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.post("/tracemalloc/stop")
+async def tracemalloc_stop():
+    stop_tracemalloc()
+    return {"tracing": False}
+
+
+@router.get("/loop")
+async def loop_health():
+    """Event-loop lag so far and the stacks of stalls caught by the blocking detector (LOOP_BLOCK_THRESHOLD_MS)"""
+    return get_loop_monitor().snapshot()
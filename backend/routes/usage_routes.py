@@ -0,0 +1,37 @@
+# routes/usage_routes.py
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel
+from typing import Optional
+
+from routes.admin_routes import require_admin_token
+from utils.usage_ledger import KEY_FIELDS, get_usage_ledger
+
+# Usage and cost of every session, and the budgets that bound them, are for operators only
+router = APIRouter(prefix="/usage", tags=["usage"], dependencies=[Depends(require_admin_token)])
+
+
+class BudgetRequest(BaseModel):
+    tokens: Optional[int] = None  # None restores the default (USAGE_SESSION_TOKEN_BUDGET)
+
+
+def _group_by(value: str) -> list:
+    return [field.strip() for field in value.split(",") if field.strip() in KEY_FIELDS]
+
+
+@router.get("")
+async def get_usage(group_by: str = Query(",".join(KEY_FIELDS), description="Comma-separated: session,agent,role,model")):
+    """Token and cost totals since startup, broken down per session, agent, role and model"""
+    return get_usage_ledger().summary(group_by=_group_by(group_by))
+
+
+@router.get("/{session_id}")
+async def get_session_usage(session_id: str, group_by: str = Query("agent,model")):
+    """One session's usage and remaining budget"""
+    return get_usage_ledger().summary(session_id=session_id, group_by=_group_by(group_by))
+
+
+@router.put("/{session_id}/budget")
+async def set_session_budget(session_id: str, request: BudgetRequest):
+    ledger = get_usage_ledger()
+    ledger.set_budget(session_id, request.tokens)
+    return ledger.summary(session_id=session_id, group_by=[])["budget"]
@@ -0,0 +1,8 @@
+# tests/conftest.py
+import os
+
+# Importing the apps needs a key; no request ever leaves these tests
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+# Keep turn checkpoints in process memory rather than probing for Redis
+os.environ.setdefault("TURN_CHECKPOINTS", "memory")
@@ -0,0 +1,48 @@
+# tests/test_intent_classifier.py
+import pytest
+
+from core.intent_classifier import get_intent_classifier
+from core.routing_engine import get_routing_engine
+
+
+def _tokens(message: str):
+    return get_routing_engine().scan(message).tokens
+
+
+@pytest.mark.parametrize("message, agent", [
+    ("Is the system down?", "dave"),  # "system" alone used to wake the architect
+    ("The system is not responding", "dave"),
+    ("What architecture should the system have?", "marc"),
+    ("Can you fix all the tests?", "jess"),
+    ("Deploy all services to staging", "dave"),
+])
+def test_best_agent(message, agent):
+    assert get_intent_classifier().best(_tokens(message)) == agent
+
+
+@pytest.mark.parametrize("message", ["Is the system down?", "Is the system slow today?", "What system do you use?"])
+def test_system_does_not_wake_the_architect(message):
+    assert "marc" not in get_intent_classifier().select(_tokens(message))
+
+
+@pytest.mark.parametrize("message", [
+    "Can you fix all the tests?",
+    "Please review all the requirements",
+    "I read all of it",
+    "that's all for today",
+])
+def test_all_in_a_sentence_is_not_a_team_call(message):
+    engine = get_routing_engine()
+    assert not engine.is_team_call(engine.scan(message))
+    assert len(get_intent_classifier().select(_tokens(message))) <= 1
+
+
+@pytest.mark.parametrize("message", ["hi all", "Hello everyone"])
+def test_greeting_the_team_is_a_team_call(message):
+    engine = get_routing_engine()
+    assert engine.is_team_call(engine.scan(message))
+
+
+@pytest.mark.parametrize("message", ["I read all of it", "thanks", "hello", "sounds good"])
+def test_chatter_wakes_nobody(message):
+    assert get_intent_classifier().select(_tokens(message)) == []
@@ -0,0 +1,69 @@
+# tests/test_llm_scheduler.py
+import asyncio
+
+from utils.llm_scheduler import LLMScheduler
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def _scheduler(updates):
+    scheduler = LLMScheduler(default_concurrency=1, default_tpm=0, model_limits={})
+    scheduler.add_queue_listener(lambda session, model, position, depth: updates.append((session, position, depth)))
+    return scheduler
+
+
+def test_queue_updates_follow_each_waiter_until_admitted():
+    updates = []
+
+    async def scenario():
+        scheduler = _scheduler(updates)
+        release = {session: asyncio.Event() for session in "abc"}
+
+        async def call(session):
+            async with scheduler.slot("model", 10, session_id=session):
+                await release[session].wait()
+
+        tasks = []
+        for session in "abc":
+            tasks.append(asyncio.create_task(call(session)))
+            await _settle()
+        for session in "abc":
+            release[session].set()
+            await _settle()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    assert updates == [
+        ("b", 1, 1),  # a holds the only slot
+        ("c", 2, 2),
+        ("b", 0, 1),  # a done: b admitted, c moves up
+        ("c", 1, 1),
+        ("c", 0, 0),
+    ]
+
+
+def test_queue_updates_when_a_waiter_ahead_gives_up():
+    updates = []
+
+    async def scenario():
+        scheduler = _scheduler(updates)
+        release = asyncio.Event()
+
+        async def call(session):
+            async with scheduler.slot("model", 10, session_id=session):
+                await release.wait()
+
+        tasks = []
+        for session in "abc":
+            tasks.append(asyncio.create_task(call(session)))
+            await _settle()
+        tasks[1].cancel()
+        await _settle()
+        release.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run(scenario())
+    assert updates == [("b", 1, 1), ("c", 2, 2), ("c", 1, 1), ("c", 0, 0)]
@@ -0,0 +1,71 @@
+# tests/test_resilience.py
+import asyncio
+import time
+from types import SimpleNamespace
+
+import groq
+import httpx
+
+from models.groq_models import GroqModelManager
+from models.resilience import CircuitBreaker
+
+
+def _bad_request(model: str) -> groq.BadRequestError:
+    request = httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+    return groq.BadRequestError(f"{model} does not support this request",
+                                response=httpx.Response(400, request=request), body=None)
+
+
+class _Stream:
+    def __init__(self, text: str):
+        self.parts = [text]
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.parts:
+            raise StopAsyncIteration
+        content = self.parts.pop(0)
+        return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))], x_groq=None, usage=None)
+
+    async def close(self):
+        pass
+
+
+def _half_open(breaker: CircuitBreaker) -> None:
+    breaker.failures = breaker.failure_threshold
+    breaker.opened_at = time.monotonic() - breaker.cooldown - 1
+
+
+def test_breaker_probe_released_without_verdict():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=30)
+    _half_open(breaker)
+    assert breaker.allow()
+    assert not breaker.allow()  # one probe at a time
+    breaker.release_probe()
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+
+
+def test_rejected_half_open_probe_does_not_wedge_breaker():
+    manager = GroqModelManager()
+    role = "developer"
+    rejecting = manager._candidate_models(role)[0]
+    calls = []
+
+    async def create(model, messages, **kwargs):
+        calls.append(model)
+        if model == rejecting:
+            raise _bad_request(model)
+        return _Stream("ok")
+
+    manager.async_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    breaker = manager._breaker(rejecting)
+    _half_open(breaker)
+
+    messages = [{"role": "user", "content": "hello"}]
+    assert asyncio.run(manager.generate(role, messages)) == "ok"  # failed over
+    assert calls[0] == rejecting
+    assert breaker.state == "half_open"
+    assert breaker.allow()  # the next call may probe again
@@ -0,0 +1,21 @@
+# tests/test_sdlc_workflow.py
+import asyncio
+
+import pytest
+
+from models.schemas import UserRequest
+from workflows.sdlc_workflow import SDLCWorkflow, build_initial_state
+
+
+async def _events(workflow: SDLCWorkflow, message: str, thread_id=None):
+    state = build_initial_state(UserRequest(request=message))
+    return [event async for event in workflow.stream_events(state, thread_id=thread_id)]
+
+
+@pytest.mark.parametrize("thread_id", [None, "session-1:turn-1"])
+def test_team_greeting_without_matching_agents_completes(thread_id):
+    workflow = SDLCWorkflow()
+    assert workflow._plan_entry_route("Hello everyone")[0] == "collaboration"
+
+    events = asyncio.run(_events(workflow, "Hello everyone", thread_id))
+    assert not [event for event in events if event.type.startswith("agent")]
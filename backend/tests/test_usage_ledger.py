@@ -0,0 +1,28 @@
+# tests/test_usage_ledger.py
+import os
+import subprocess
+import sys
+
+from utils.usage_ledger import UsageLedger
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_idle_sessions_are_evicted():
+    ledger = UsageLedger(idle_ttl=0)
+    ledger.record("llama-3.1-8b-instant", "developer", 100, 20, session_id="old", agent="developer")
+    ledger.record("llama-3.1-8b-instant", "developer", 50, 10, session_id="new", agent="developer")
+
+    assert ledger.session_tokens("old") == 0
+    assert ledger.session_tokens("new") == 60
+    assert list(ledger.summary()["by_session"]) == ["new"]
+    assert len(ledger._pending) == 2  # evicted totals are still flushed
+
+
+def test_invalid_prices_are_ignored_at_import():
+    for prices in ("{not json", '{"llama-3.1-8b-instant": 5}', "[1, 2]"):
+        result = subprocess.run(
+            [sys.executable, "-c", "from utils.usage_ledger import MODEL_PRICES; print(MODEL_PRICES['llama-3.1-8b-instant'])"],
+            cwd=BACKEND, env={**os.environ, "LLM_PRICES": prices}, capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == "(0.05, 0.08)"
@@ -0,0 +1,36 @@
+# tests/test_usage_routes.py
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routes import admin_routes
+from routes.usage_routes import router
+from utils.usage_ledger import get_usage_ledger
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("token, headers, status", [
+    (None, {}, 403),                               # no ADMIN_TOKEN configured: refused outright
+    ("secret", {}, 401),
+    ("secret", {"X-Admin-Token": "guess"}, 401),
+])
+def test_unauthenticated_budget_change_is_rejected(client, monkeypatch, token, headers, status):
+    monkeypatch.setattr(admin_routes, "ADMIN_TOKEN", token)
+    response = client.put("/usage/s1/budget", json={"tokens": 0}, headers=headers)
+    assert response.status_code == status
+    assert get_usage_ledger().budget_for("s1") == get_usage_ledger().session_budget
+    assert client.get("/usage", headers=headers).status_code == status
+
+
+def test_admin_can_change_budget(client, monkeypatch):
+    monkeypatch.setattr(admin_routes, "ADMIN_TOKEN", "secret")
+    response = client.put("/usage/s2/budget", json={"tokens": 500}, headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert response.json()["tokens"] == 500
+    get_usage_ledger().set_budget("s2", None)
@@ -0,0 +1,263 @@
+# utils/llm_scheduler.py
+"""
+Global admission control for LLM calls.
+
+Every Groq request passes through a per-model lane that enforces a
+concurrency limit and a tokens-per-minute budget. Waiting requests are
+ordered by priority class first (direct single-agent calls before team
+fan-out) and then by start-time fair queuing across sessions, so one busy
+session cannot starve the others.
+"""
+import asyncio
+import heapq
+import inspect
+import itertools
+import json
+import os
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.logging_config import get_logger
+from utils.request_context import get_session_id
+
+logger = get_logger("scheduler")
+
+PRIORITY_DIRECT = 0  # user addressed one agent and is waiting on it
+PRIORITY_TEAM = 1    # collaboration fan-out
+
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 4))
+DEFAULT_TPM_LIMIT = int(os.getenv("LLM_TPM_LIMIT", 30000))  # 0 disables the token budget
+
+current_priority: ContextVar[int] = ContextVar("current_priority", default=PRIORITY_DIRECT)
+
+
+@contextmanager
+def priority_scope(priority: int):
+    """Run LLM calls started inside the block (including gathered tasks) at the given priority"""
+    token = current_priority.set(priority)
+    try:
+        yield
+    finally:
+        current_priority.reset(token)
+
+
+class _Waiter:
+    __slots__ = ("priority", "start_tag", "seq", "cost", "session_id", "future", "position")
+
+    def __init__(self, priority: int, start_tag: float, seq: int, cost: int, session_id: str, future: asyncio.Future):
+        self.priority = priority
+        self.start_tag = start_tag
+        self.seq = seq
+        self.cost = cost
+        self.session_id = session_id
+        self.future = future
+        self.position = 0  # last position reported to queue listeners; 0 = not reported yet
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.start_tag, self.seq) < (other.priority, other.start_tag, other.seq)
+
+
+class _ModelLane:
+    """Concurrency slots, token bucket and fair queue for a single model"""
+
+    def __init__(self, model: str, max_concurrency: int, tpm_limit: int):
+        self.model = model
+        self.max_concurrency = max(1, max_concurrency)
+        self.tpm_limit = max(0, tpm_limit)
+        self.in_flight = 0
+        self.tokens = float(self.tpm_limit)
+        self.updated = time.monotonic()
+        self.queue: List[_Waiter] = []
+        self.virtual_time = 0.0
+        self.session_finish: Dict[str, float] = {}
+        self.refill_timer: Optional[asyncio.TimerHandle] = None
+
+    def refill(self) -> None:
+        now = time.monotonic()
+        if self.tpm_limit:
+            self.tokens = min(self.tpm_limit, self.tokens + (now - self.updated) * self.tpm_limit / 60.0)
+        self.updated = now
+
+    def charge(self, cost: int) -> int:
+        # A single request larger than the whole budget would never fit; cap it at one minute's worth
+        return min(cost, self.tpm_limit) if self.tpm_limit else 0
+
+    def has_budget(self, cost: int) -> bool:
+        return not self.tpm_limit or self.tokens >= self.charge(cost)
+
+    def start_tag(self, session_id: str, cost: int, weight: float) -> float:
+        start = max(self.virtual_time, self.session_finish.get(session_id, 0.0))
+        self.session_finish[session_id] = start + cost / weight
+        return start
+
+
+class LLMScheduler:
+    def __init__(self, default_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 default_tpm: int = DEFAULT_TPM_LIMIT,
+                 model_limits: Optional[Dict[str, Dict[str, int]]] = None):
+        self.default_concurrency = default_concurrency
+        self.default_tpm = default_tpm
+        # Per-model overrides, e.g. LLM_MODEL_LIMITS='{"llama-3.3-70b-versatile": {"concurrency": 2, "tpm": 6000}}'
+        if model_limits is None:
+            try:
+                model_limits = json.loads(os.getenv("LLM_MODEL_LIMITS", "{}"))
+            except json.JSONDecodeError as e:
+                logger.warning("Ignoring invalid LLM_MODEL_LIMITS: %s", e)
+                model_limits = {}
+        self.model_limits = model_limits
+        self._lanes: Dict[str, _ModelLane] = {}
+        self._weights: Dict[str, float] = {}
+        self._seq = itertools.count()
+        self._queue_listeners: List[Callable[..., Any]] = []
+
+    def _lane(self, model: str) -> _ModelLane:
+        lane = self._lanes.get(model)
+        if lane is None:
+            limits = self.model_limits.get(model, {})
+            lane = _ModelLane(
+                model,
+                int(limits.get("concurrency", self.default_concurrency)),
+                int(limits.get("tpm", self.default_tpm)),
+            )
+            self._lanes[model] = lane
+        return lane
+
+    def set_session_weight(self, session_id: str, weight: float) -> None:
+        """Give a session a larger (or smaller) share of each model's capacity"""
+        self._weights[session_id] = max(0.01, float(weight))
+
+    def add_queue_listener(self, callback: Callable[..., Any]) -> None:
+        """callback(session_id, model, position, queue_depth) - may be sync or async
+
+        Called when a call is queued, whenever its position in the queue changes, and with
+        position 0 when it is admitted.
+        """
+        self._queue_listeners.append(callback)
+
+    @asynccontextmanager
+    async def slot(self, model: str, estimated_tokens: int, session_id: Optional[str] = None,
+                   priority: Optional[int] = None):
+        """Hold one concurrency slot (and charge the token budget) for the duration of a call"""
+        lane = self._lane(model)
+        session_id = session_id or get_session_id() or "anonymous"
+        priority = current_priority.get() if priority is None else priority
+
+        await self._acquire(lane, session_id, priority, max(1, int(estimated_tokens)))
+        try:
+            yield
+        finally:
+            lane.in_flight -= 1
+            self._dispatch(lane)
+
+    async def _acquire(self, lane: _ModelLane, session_id: str, priority: int, cost: int) -> None:
+        start_tag = lane.start_tag(session_id, cost, self._weights.get(session_id, 1.0))
+        lane.refill()
+
+        if not lane.queue and lane.in_flight < lane.max_concurrency and lane.has_budget(cost):
+            self._admit(lane, cost, start_tag)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = _Waiter(priority, start_tag, next(self._seq), cost, session_id, future)
+        heapq.heappush(lane.queue, waiter)
+        self._dispatch(lane)
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted just as the caller gave up - hand the slot back
+                lane.in_flight -= 1
+            # Either way the waiters behind it move up
+            self._dispatch(lane)
+            raise
+
+    def _admit(self, lane: _ModelLane, cost: int, start_tag: float) -> None:
+        lane.in_flight += 1
+        lane.tokens -= lane.charge(cost)
+        lane.virtual_time = max(lane.virtual_time, start_tag)
+
+    def _dispatch(self, lane: _ModelLane) -> None:
+        lane.refill()
+        admitted = []
+        while lane.queue and lane.in_flight < lane.max_concurrency:
+            waiter = lane.queue[0]
+            if waiter.future.done():  # cancelled while queued
+                heapq.heappop(lane.queue)
+                continue
+            if not lane.has_budget(waiter.cost):
+                self._schedule_refill(lane, waiter.cost)
+                break
+            heapq.heappop(lane.queue)
+            self._admit(lane, waiter.cost, waiter.start_tag)
+            waiter.future.set_result(None)
+            admitted.append(waiter)
+        self._notify_positions(lane, admitted)
+
+        if not lane.queue and lane.in_flight == 0:
+            # Idle lane: finish tags behind the virtual clock carry no information
+            lane.session_finish = {s: f for s, f in lane.session_finish.items() if f > lane.virtual_time}
+
+    def _schedule_refill(self, lane: _ModelLane, cost: int) -> None:
+        if lane.refill_timer is not None:
+            return
+        delay = max(0.01, (lane.charge(cost) - lane.tokens) * 60.0 / lane.tpm_limit)
+
+        def _on_refill():
+            lane.refill_timer = None
+            self._dispatch(lane)
+
+        lane.refill_timer = asyncio.get_running_loop().call_later(delay, _on_refill)
+
+    def _notify_positions(self, lane: _ModelLane, admitted: List[_Waiter]) -> None:
+        """Report admission of queued callers and every waiting caller whose position changed"""
+        if not self._queue_listeners:
+            return
+        waiting = sorted(w for w in lane.queue if not w.future.done())
+        depth = len(waiting)
+        for waiter in admitted:
+            if waiter.position:  # only callers that were told they were queued
+                self._notify(lane, waiter, 0, depth)
+        for position, waiter in enumerate(waiting, 1):
+            if waiter.position != position:
+                self._notify(lane, waiter, position, depth)
+
+    def _notify(self, lane: _ModelLane, waiter: _Waiter, position: int, depth: int) -> None:
+        waiter.position = position
+        logger.debug("Queue %s on %s: position %s/%s", waiter.session_id, lane.model, position, depth)
+        for callback in self._queue_listeners:
+            try:
+                result = callback(waiter.session_id, lane.model, position, depth)
+                if inspect.isawaitable(result):
+                    asyncio.ensure_future(result)
+            except Exception as e:
+                logger.error("Queue listener error: %s", e)
+
+    def queue_depth(self) -> int:
+        return sum(len(lane.queue) for lane in self._lanes.values())
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        result = {}
+        for model, lane in self._lanes.items():
+            lane.refill()
+            result[model] = {
+                "in_flight": lane.in_flight,
+                "queued": len(lane.queue),
+                "max_concurrency": lane.max_concurrency,
+                "tpm_limit": lane.tpm_limit,
+                "tokens_available": int(lane.tokens) if lane.tpm_limit else None,
+            }
+        return result
+
+
+_scheduler: Optional[LLMScheduler] = None
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """Process-wide scheduler shared by every GroqModelManager"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = LLMScheduler()
+    return _scheduler
@@ -0,0 +1,162 @@
+# utils/logging_config.py
+"""
+Structured, leveled logging for the FLUX backends.
+
+Records are put on a bounded in-memory queue by the calling coroutine and
+written by a QueueListener thread, so slow or contended stdout never blocks
+the event loop (when the queue is full, records are dropped and counted
+rather than waited on). Every record carries the session, turn and agent
+bound in utils.request_context.
+
+Hot-path detail is logged at DEBUG with %-style arguments, so at the default
+INFO level those calls return after a single level check without formatting.
+
+    LOG_LEVEL=INFO              DEBUG adds per-step routing and A2A detail
+    LOG_FORMAT=json             or "text" for local development
+    LOG_DEBUG_SAMPLE_RATE=1.0   share of DEBUG records kept when DEBUG is enabled
+    LOG_QUEUE_SIZE=10000        records buffered before new ones are dropped
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from utils.request_context import current_agent, current_session_id, current_turn_id
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", 1.0))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+
+ROOT_LOGGER = "flux"
+CONTEXT_FIELDS = ("session_id", "turn_id", "agent")
+
+# Attributes every LogRecord has; anything else was passed via `extra=` and is emitted as a field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+_RECORD_ATTRIBUTES.update(CONTEXT_FIELDS)
+
+
+class ContextFilter(logging.Filter):
+    """Stamp session/turn/agent on the record while still on the caller's task, where the ContextVars live"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.session_id = current_session_id.get()
+        record.turn_id = current_turn_id.get()
+        record.agent = current_agent.get()
+        return True
+
+
+class DebugSampler(logging.Filter):
+    """Keep only a share of DEBUG records so DEBUG can be left on under load"""
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or self.rate >= 1.0 or random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        context = " ".join(f"{f}={getattr(record, f)}" for f in CONTEXT_FIELDS if getattr(record, f, None))
+        return f"{line} [{context}]" if context else line
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that never waits on a full queue and keeps exceptions structured"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render args and traceback now (they may not survive the hop to the listener thread),
+        # but leave JSON encoding to the listener
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_handler: Optional[NonBlockingQueueHandler] = None
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging(level: Optional[str] = None, fmt: Optional[str] = None) -> logging.Logger:
+    """Install the queue-backed handler on the `flux` logger; safe to call more than once"""
+    global _handler, _listener
+    logger = logging.getLogger(ROOT_LOGGER)
+    logger.setLevel(level or LOG_LEVEL)
+    if _handler is not None:
+        return logger
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(TextFormatter() if (fmt or LOG_FORMAT) == "text" else JsonFormatter())
+
+    _handler = NonBlockingQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+    _handler.addFilter(DebugSampler(DEBUG_SAMPLE_RATE))
+    _handler.addFilter(ContextFilter())
+    logger.addHandler(_handler)
+    logger.propagate = False
+
+    _listener = QueueListener(_handler.queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return logger
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def dropped_records() -> int:
+    return _handler.dropped if _handler else 0
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Component logger under the `flux` hierarchy, e.g. get_logger("route") -> flux.route"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
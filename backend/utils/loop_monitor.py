@@ -0,0 +1,148 @@
+# utils/loop_monitor.py
+"""
+Event-loop lag monitor and blocking-call detector.
+
+A monitor coroutine asks to wake up every LOOP_MONITOR_INTERVAL_MS and records
+how late it actually ran; that scheduling delay is what every other coroutine
+on the loop is paying at the same moment (flux_loop_lag_seconds).
+
+With LOOP_BLOCK_THRESHOLD_MS set, a watchdog thread also checks whether the
+monitor has stopped ticking. If the loop has been held longer than the
+threshold, it grabs the loop thread's stack while the blocking call is still on
+it. These are sync I/O in async handlers: subprocess.run, requests, sync Redis,
+the sync Groq client. Each stall is counted in flux_loop_blocks_total by
+blocking site, logged, and kept for GET /admin/loop.
+
+    LOOP_MONITOR_INTERVAL_MS=100   0 disables the monitor
+    LOOP_BLOCK_THRESHOLD_MS=0      debug mode: capture stacks of stalls longer than this
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from utils.logging_config import get_logger
+from utils.metrics import LOOP_BLOCKS, LOOP_LAG_SECONDS, LOOP_MAX_LAG_SECONDS
+from utils.profiling import frame_label, stack_labels
+
+logger = get_logger("loop")
+
+MONITOR_INTERVAL = float(os.getenv("LOOP_MONITOR_INTERVAL_MS", 100)) / 1000.0
+BLOCK_THRESHOLD = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", 0)) / 1000.0
+MAX_BLOCK_EVENTS = int(os.getenv("LOOP_MAX_BLOCK_EVENTS", 100))
+
+BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _blocking_site(frame) -> str:
+    """Innermost frame in our own code, so the metric label names the caller rather than e.g. socket.recv"""
+    innermost = frame
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(BACKEND_ROOT) and "site-packages" not in filename:
+            return frame_label(frame)
+        frame = frame.f_back
+    return frame_label(innermost) if innermost is not None else "unknown"
+
+
+class LoopMonitor:
+    def __init__(self, interval: float = MONITOR_INTERVAL, block_threshold: float = BLOCK_THRESHOLD):
+        # Tick at least twice per threshold so a stall is seen within half a threshold of starting
+        self.interval = min(interval, block_threshold / 2) if block_threshold > 0 and interval > 0 else interval
+        self.block_threshold = block_threshold
+        self.blocks: Deque[Dict] = deque(maxlen=MAX_BLOCK_EVENTS)
+        self.max_lag = 0.0
+        self._last_tick = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._window_max = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start monitoring the running loop; call from a coroutine on it (e.g. a startup hook)"""
+        if self.interval <= 0 or self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.ensure_future(self._tick_loop())
+        LOOP_MAX_LAG_SECONDS.set_function(self._take_window_max)
+        if self.block_threshold > 0:
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+            logger.info("Blocking-call detector on: stalls over %.0fms are captured", self.block_threshold * 1000)
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _take_window_max(self) -> float:
+        """Worst lag since the previous scrape"""
+        value, self._window_max = self._window_max, 0.0
+        return value
+
+    async def _tick_loop(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self._last_tick = now
+            LOOP_LAG_SECONDS.observe(lag)
+            self._window_max = max(self._window_max, lag)
+            self.max_lag = max(self.max_lag, lag)
+
+    def _watch(self) -> None:
+        """Runs on its own thread: notices when the loop stops ticking and records what is holding it"""
+        poll = max(0.005, self.block_threshold / 4)
+        stalled_since: Optional[float] = None
+        event: Optional[Dict] = None
+        while not self._stop.wait(poll):
+            last_tick = self._last_tick
+            held = time.monotonic() - last_tick - self.interval
+            if event is not None and last_tick != stalled_since:
+                # Loop is running again; the gap between ticks bounds how long it was held
+                event["duration_ms"] = round((last_tick - stalled_since - self.interval) * 1000, 1)
+                logger.warning("Event loop blocked for %.0fms at %s", event["duration_ms"], event["site"])
+                event = stalled_since = None
+            if event is None and held > self.block_threshold:
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is None:
+                    continue
+                site = _blocking_site(frame)
+                stalled_since = last_tick
+                event = {"detected_at": time.time(), "site": site, "duration_ms": None, "stack": list(stack_labels(frame))}
+                self.blocks.append(event)
+                LOOP_BLOCKS.inc(site=site)
+
+    def snapshot(self) -> Dict:
+        return {
+            "interval_ms": self.interval * 1000,
+            "block_threshold_ms": self.block_threshold * 1000 or None,
+            "max_lag_ms": round(self.max_lag * 1000, 2),
+            "blocks": list(self.blocks),
+        }
+
+
+_monitor: Optional[LoopMonitor] = None
+
+
+def get_loop_monitor() -> LoopMonitor:
+    global _monitor
+    if _monitor is None:
+        _monitor = LoopMonitor()
+    return _monitor
@@ -0,0 +1,244 @@
+# utils/metrics.py
+"""
+Minimal Prometheus-compatible metrics registry.
+
+Counters, gauges and histograms with labels, rendered in the Prometheus text
+exposition format (0.0.4) by each app's GET /metrics. Kept dependency-free
+so main_minimal.py can expose the same metrics without the full stack.
+
+    with ROUTING_SECONDS.time(entry="workflow"):
+        route = ...
+    LLM_TOKENS.inc(usage.prompt_tokens, model=model, role=role, direction="in")
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers sub-millisecond routing up to multi-second LLM generations
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+FAST_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._functions: Dict[Tuple[str, ...], Callable[[], float]] = {}
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float], **labels) -> None:
+        """Sample `function` at scrape time instead of tracking the value"""
+        self._functions[self._key(labels)] = function
+
+    def value(self, **labels) -> float:
+        key = self._key(labels)
+        if key in self._functions:
+            return float(self._functions[key]())
+        return self._values.get(key, 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        for key, function in self._functions.items():
+            try:
+                values[key] = float(function())
+            except Exception:
+                continue
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in sorted(values.items())]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry=None):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def timed(self, **labels):
+        """Decorator form of time() for sync functions"""
+        def decorator(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.time(**labels):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._values.items())
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, (("le", _format_value(bound)),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
+
+
+# Per-stage latency
+ROUTING_SECONDS = Histogram(
+    "flux_routing_seconds", "Time to decide which agents handle a message", ["entry"], buckets=FAST_BUCKETS)
+PROMPT_BUILD_SECONDS = Histogram(
+    "flux_prompt_build_seconds", "Time to assemble an agent's prompt messages", ["role"], buckets=FAST_BUCKETS)
+LLM_TTFT_SECONDS = Histogram(
+    "flux_llm_ttft_seconds", "Time from request to first streamed token", ["model", "role"])
+LLM_GENERATION_SECONDS = Histogram(
+    "flux_llm_generation_seconds", "Total upstream generation time per call", ["model", "role"])
+WS_SEND_SECONDS = Histogram(
+    "flux_ws_send_seconds", "Time to write one WebSocket frame", ["type"], buckets=FAST_BUCKETS)
+SESSION_STORE_SECONDS = Histogram(
+    "flux_session_store_seconds", "Session store operation latency", ["operation", "backend"], buckets=FAST_BUCKETS)
+LOOP_LAG_SECONDS = Histogram(
+    "flux_loop_lag_seconds", "How late the event loop ran a timer that was due",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+
+# Counters and gauges
+LLM_TOKENS = Counter("flux_llm_tokens_total", "Tokens sent to and received from the LLM", ["model", "role", "direction"])
+CACHE_REQUESTS = Counter(
+    "flux_cache_requests_total", "Cache lookups by cache and result (hit, miss or bypass)", ["cache", "result"])
+ERRORS = Counter("flux_errors_total", "Errors by component and exception type", ["component", "type"])
+ACTIVE_WEBSOCKETS = Gauge("flux_active_websockets", "Currently open WebSocket connections")
+TURNS = Counter("flux_turns_total", "Chat turns processed by outcome", ["outcome"])
+LOOP_MAX_LAG_SECONDS = Gauge("flux_loop_max_lag_seconds", "Worst event-loop lag since the previous scrape")
+LOOP_BLOCKS = Counter("flux_loop_blocks_total", "Event-loop stalls over LOOP_BLOCK_THRESHOLD_MS by blocking site", ["site"])
+A2A_DECISIONS = Counter("flux_a2a_decisions_total", "Agents considered for A2A expansion by decision", ["decision"])
+LATE_AGENTS = Counter("flux_late_agents_total", "Agents that missed their timeout or the turn deadline", ["deadline", "outcome"])
+TURN_RESUMES = Counter("flux_turn_resumes_total", "Turns retried with a checkpointed turn ID, resumed mid-turn or replayed", ["mode"])
+
+
+def record_error(component: str, error: BaseException) -> None:
+    ERRORS.inc(component=component, type=type(error).__name__)
@@ -0,0 +1,232 @@
+# utils/profiling.py
+"""
+Opt-in, in-process profiling for a live worker.
+
+A StackSampler thread periodically snapshots the event-loop thread's Python
+stack (sys._current_frames), so it shows where the loop actually spends its
+time - sync Groq iteration, session JSON encoding, regex routing - without
+instrumenting any of them. Samples are emitted as collapsed stacks
+("frame;frame;frame count"), which flamegraph.pl, inferno and speedscope
+render directly.
+
+Slow-turn capture keeps a low-rate sampler running into a ring buffer; when
+a turn ends slower than PROFILE_SLOW_TURN_MS, the samples taken during that
+turn are saved (in memory and under PROFILE_DIR). Samples cover the whole
+loop thread for that window, so concurrent turns show up too.
+
+    PROFILING_ENABLED=false        exposes /admin/profile* and /admin/tracemalloc*
+    ADMIN_TOKEN=                   if set, required in the X-Admin-Token header
+    PROFILE_SLOW_TURN_MS=0         capture turns slower than this; 0 = off
+    PROFILE_SAMPLE_INTERVAL_MS=10  ring-buffer sampling interval for slow-turn capture
+    PROFILE_RING_SECONDS=120       history kept in the ring buffer
+    PROFILE_DIR=profiles           where slow-turn captures are written; empty = memory only
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from utils.logging_config import get_logger
+from utils.request_context import get_turn_id, get_turn_started
+
+logger = get_logger("profiling")
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+SLOW_TURN_MS = float(os.getenv("PROFILE_SLOW_TURN_MS", 0))
+SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", 10)) / 1000.0
+RING_SECONDS = float(os.getenv("PROFILE_RING_SECONDS", 120))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+MAX_CAPTURES = int(os.getenv("PROFILE_MAX_CAPTURES", 50))
+MAX_DEPTH = 64
+
+Stack = Tuple[str, ...]
+
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def stack_labels(frame) -> Stack:
+    labels = []
+    while frame is not None and len(labels) < MAX_DEPTH:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    return tuple(reversed(labels))
+
+
+def collapse(stacks: List[Stack]) -> str:
+    """Collapsed-stack text, heaviest stacks first"""
+    counts = Counter(stacks)
+    return "\n".join(f"{';'.join(stack)} {count}" for stack, count in counts.most_common()) + "\n"
+
+
+def top_functions(stacks: List[Stack], limit: int = 20) -> List[Dict]:
+    """Self time per leaf frame, as a share of samples"""
+    total = len(stacks) or 1
+    leaves = Counter(stack[-1] for stack in stacks if stack)
+    return [{"frame": frame, "samples": count, "share": round(count / total, 4)}
+            for frame, count in leaves.most_common(limit)]
+
+
+class StackSampler:
+    """Samples one thread's stack every `interval` seconds on a daemon thread"""
+
+    def __init__(self, thread_id: int, interval: float, max_samples: Optional[int] = None):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Deque[Tuple[float, Stack]] = deque(maxlen=max_samples)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "StackSampler":
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.samples.append((time.monotonic(), stack_labels(frame)))
+
+    def between(self, started: float, finished: float) -> List[Stack]:
+        return [stack for ts, stack in list(self.samples) if started <= ts <= finished]
+
+
+async def profile_loop(seconds: float, interval: float) -> List[Stack]:
+    """Sample the calling event loop's thread for `seconds`; call from a coroutine on that loop"""
+    sampler = StackSampler(threading.get_ident(), interval).start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        sampler.stop()
+    return [stack for _, stack in sampler.samples]
+
+
+class SlowTurnProfiler:
+    """Ring-buffer sampler plus the captures of turns that went over the threshold"""
+
+    def __init__(self, threshold_ms: float = SLOW_TURN_MS, interval: float = SAMPLE_INTERVAL,
+                 directory: str = PROFILE_DIR):
+        self.threshold_ms = threshold_ms
+        self.interval = interval
+        self.directory = directory
+        self.sampler: Optional[StackSampler] = None
+        self.captures: "Dict[str, Dict]" = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms > 0
+
+    def start(self) -> None:
+        """Start sampling the current thread; call from the event loop (e.g. a startup hook)"""
+        if not self.enabled or (self.sampler is not None and self.sampler.running):
+            return
+        max_samples = int(RING_SECONDS / self.interval)
+        self.sampler = StackSampler(threading.get_ident(), self.interval, max_samples).start()
+        logger.info("Slow-turn profiling on: turns over %.0fms are captured", self.threshold_ms)
+
+    def stop(self) -> None:
+        if self.sampler is not None:
+            self.sampler.stop()
+            self.sampler = None
+
+    def turn_finished(self) -> None:
+        """Capture the current turn's samples if it ran over the threshold"""
+        started = get_turn_started()
+        if self.sampler is None or started is None:
+            return
+        finished = time.monotonic()
+        duration_ms = (finished - started) * 1000
+        if duration_ms < self.threshold_ms:
+            return
+        turn_id = get_turn_id() or f"turn-{int(finished)}"
+        stacks = self.sampler.between(started, finished)
+        capture = {
+            "turn_id": turn_id,
+            "duration_ms": round(duration_ms, 1),
+            "samples": len(stacks),
+            "captured_at": time.time(),
+            "top_functions": top_functions(stacks, 10),
+            "collapsed": collapse(stacks),
+        }
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            capture["traced_memory"] = {"current": current, "peak": peak}
+        self.captures[turn_id] = capture
+        while len(self.captures) > MAX_CAPTURES:
+            self.captures.pop(next(iter(self.captures)))
+        logger.warning("Slow turn %s took %.0fms, captured %d samples", turn_id, duration_ms, len(stacks))
+        if self.directory:
+            asyncio.get_running_loop().run_in_executor(None, self._write, turn_id, capture["collapsed"])
+
+    def _write(self, turn_id: str, collapsed: str) -> None:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, f"turn-{turn_id}.folded"), "w", encoding="utf-8") as f:
+                f.write(collapsed)
+        except OSError as e:
+            logger.warning("Could not write profile for %s: %s", turn_id, e)
+
+
+_slow_turns: Optional[SlowTurnProfiler] = None
+
+
+def get_slow_turn_profiler() -> SlowTurnProfiler:
+    global _slow_turns
+    if _slow_turns is None:
+        _slow_turns = SlowTurnProfiler()
+    return _slow_turns
+
+
+# --- tracemalloc --------------------------------------------------------------
+
+_baseline: Optional[tracemalloc.Snapshot] = None
+
+
+def start_tracemalloc(frames: int = 1) -> None:
+    global _baseline
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+    _baseline = tracemalloc.take_snapshot()
+
+
+def stop_tracemalloc() -> None:
+    global _baseline
+    tracemalloc.stop()
+    _baseline = None
+
+
+def tracemalloc_report(limit: int = 25, key_type: str = "lineno", compare: bool = False) -> Dict:
+    """Top allocation sites now, or growth since start/last compare when compare=True"""
+    global _baseline
+    if not tracemalloc.is_tracing():
+        raise RuntimeError("tracemalloc is not running")
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    if compare and _baseline is not None:
+        stats = snapshot.compare_to(_baseline, key_type)[:limit]
+        entries = [{"site": str(s.traceback), "size": s.size, "size_diff": s.size_diff,
+                    "count": s.count, "count_diff": s.count_diff} for s in stats]
+        _baseline = snapshot
+    else:
+        entries = [{"site": str(s.traceback), "size": s.size, "count": s.count}
+                   for s in snapshot.statistics(key_type)[:limit]]
+    current, peak = tracemalloc.get_traced_memory()
+    return {"traced_memory": {"current": current, "peak": peak}, "compare": compare, "top": entries}
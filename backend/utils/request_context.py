@@ -0,0 +1,56 @@
+# utils/request_context.py
+"""
+Per-connection request context shared across async tasks.
+
+Values live in ContextVars so they follow a turn through asyncio.gather and
+create_task without being threaded through every agent signature (agent
+context dicts are rendered into prompts, so they are not a good carrier).
+"""
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+current_session_id: ContextVar[Optional[str]] = ContextVar("current_session_id", default=None)
+
+
+def bind_session(session_id: Optional[str]) -> None:
+    """Bind the session for the current task (each WebSocket connection runs in its own task)"""
+    current_session_id.set(session_id)
+
+
+def get_session_id() -> Optional[str]:
+    return current_session_id.get()
+
+
+current_turn_id: ContextVar[Optional[str]] = ContextVar("current_turn_id", default=None)
+current_turn_started: ContextVar[Optional[float]] = ContextVar("current_turn_started", default=None)
+current_agent: ContextVar[Optional[str]] = ContextVar("current_agent", default=None)
+
+
+def bind_turn(turn_id: Optional[str] = None) -> str:
+    """Start a new turn in the current task; log records and spans carry its ID"""
+    turn_id = turn_id or uuid.uuid4().hex[:12]
+    current_turn_id.set(turn_id)
+    current_turn_started.set(time.monotonic())
+    return turn_id
+
+
+def get_turn_id() -> Optional[str]:
+    return current_turn_id.get()
+
+
+def get_turn_started() -> Optional[float]:
+    """time.monotonic() at bind_turn for the current turn"""
+    return current_turn_started.get()
+
+
+@contextmanager
+def agent_scope(agent: Optional[str]):
+    """Attribute work inside the block to `agent`, restoring the previous value on exit"""
+    token = current_agent.set(agent)
+    try:
+        yield
+    finally:
+        current_agent.reset(token)
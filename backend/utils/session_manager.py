@@ -4,6 +4,24 @@ import json
 from typing import Dict, Any, Optional, List
 import os
 from datetime import datetime, timedelta
+from functools import wraps
+
+from utils.logging_config import get_logger
+from utils.metrics import SESSION_STORE_SECONDS, record_error
+
+logger = get_logger("session")
+
+
+def _timed(operation: str):
+    """Record the store latency of a SessionManager method, labelled by backend"""
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            backend = "redis" if self.redis_available else "memory"
+            with SESSION_STORE_SECONDS.time(operation=operation, backend=backend):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
 
 class SessionManager:
     def __init__(self):
@@ -19,12 +37,13 @@ class SessionManager:
             # Test the connection
             self.redis_client.ping()
             self.redis_available = True
-            print("Redis connection established")
+            logger.info("Redis connection established")
         except (redis.ConnectionError, redis.TimeoutError, Exception):
-            print("Redis not available, using in-memory storage")
+            logger.info("Redis not available, using in-memory storage")
             self.redis_available = False
             self.memory_storage = {}
 
+    @_timed("create")
     def create_session(self, session_id: str, initial_data: Dict[str, Any] = None) -> bool:
         """Create a new session with optional initial data"""
         try:
@@ -50,9 +69,11 @@ class SessionManager:
                 self.memory_storage[session_id] = session_data
             return True
         except Exception as e:
-            print(f"Error creating session: {e}")
+            logger.error("Error creating session: %s", e)
+            record_error("session", e)
             return False
 
+    @_timed("get")
     def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve session data"""
         try:
@@ -76,9 +97,11 @@ class SessionManager:
                     return session_data
             return None
         except Exception as e:
-            print(f"Error retrieving session: {e}")
+            logger.error("Error retrieving session: %s", e)
+            record_error("session", e)
             return None
 
+    @_timed("update")
     def update_session(self, session_id: str, updates: Dict[str, Any]) -> bool:
         """Update session data"""
         try:
@@ -98,9 +121,11 @@ class SessionManager:
                 return True
             return False
         except Exception as e:
-            print(f"Error updating session: {e}")
+            logger.error("Error updating session: %s", e)
+            record_error("session", e)
             return False
 
+    @_timed("append_history")
     def add_message_to_history(self, session_id: str, message: Dict[str, Any]) -> bool:
         """Add a message to the conversation history"""
         try:
@@ -118,9 +143,11 @@ class SessionManager:
                 return self.update_session(session_id, session_data)
             return False
         except Exception as e:
-            print(f"Error adding message to history: {e}")
+            logger.error("Error adding message to history: %s", e)
+            record_error("session", e)
             return False
 
+    @_timed("delete")
     def delete_session(self, session_id: str) -> bool:
         """Delete a session"""
         try:
@@ -132,9 +159,11 @@ class SessionManager:
                     return True
                 return False
         except Exception as e:
-            print(f"Error deleting session: {e}")
+            logger.error("Error deleting session: %s", e)
+            record_error("session", e)
             return False
 
+    @_timed("list")
     def get_active_sessions(self) -> List[str]:
         """Get list of active session IDs"""
         try:
@@ -144,5 +173,6 @@ class SessionManager:
             else:
                 return list(self.memory_storage.keys())
         except Exception as e:
-            print(f"Error getting active sessions: {e}")
+            logger.error("Error getting active sessions: %s", e)
+            record_error("session", e)
             return []
\ No newline at end of file
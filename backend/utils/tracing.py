@@ -0,0 +1,331 @@
+# utils/tracing.py
+"""
+Lightweight tracing with OpenTelemetry-compatible output.
+
+One trace per chat turn: a root "turn" span, with child spans for routing,
+collaboration, each agent, each upstream LLM call (queue admission and first
+token recorded as span events) and each WebSocket send. The current span lives
+in a ContextVar, so children are parented correctly across asyncio.gather and
+create_task without threading span objects through agent signatures.
+
+Finished traces are encoded as OTLP/JSON (ExportTraceServiceRequest) and
+written by a background thread, either as one line per trace to a local file
+or POSTed to an OTLP/HTTP collector (mock_llm_server.py accepts them on
+/v1/traces as a stand-in). Kept dependency-free like utils.metrics.
+
+    TRACE_EXPORTER=none         "file" or "otlp"; "none" makes every span a no-op
+    TRACE_FILE=traces.jsonl     output for the file exporter
+    TRACE_OTLP_ENDPOINT=http://127.0.0.1:4318/v1/traces
+    TRACE_SAMPLE_RATE=1.0       share of turns traced
+    TRACE_SLOW_MS=0             only export turns at least this slow (tail sampling)
+
+    with start_span("agent", attributes={"agent.role": role}) as span:
+        span.add_event("first_token", {"ttft_ms": 412.0})
+"""
+import atexit
+import inspect
+import json
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Dict, List, Optional
+
+from utils.logging_config import get_logger
+
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none").lower()
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://127.0.0.1:4318/v1/traces")
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", 1.0))
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", 0))
+TRACE_QUEUE_SIZE = int(os.getenv("TRACE_QUEUE_SIZE", 1000))
+SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "flux-backend")
+
+# OTLP enum values
+KIND_INTERNAL, KIND_SERVER, KIND_CLIENT = 1, 2, 3
+STATUS_UNSET, STATUS_OK, STATUS_ERROR = 0, 1, 2
+
+logger = get_logger("tracing")
+
+current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class _TraceBuffer:
+    """Finished spans of one trace, held until the root ends so the whole turn is exported (or not) together"""
+    __slots__ = ("spans", "flushed")
+
+    def __init__(self):
+        self.spans: List["Span"] = []
+        self.flushed = False
+
+
+class Span:
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "start_ns", "end_ns",
+                 "attributes", "events", "status", "status_message", "_buffer", "_token")
+
+    def __init__(self, name: str, parent: Optional["Span"], kind: int, attributes: Optional[Dict[str, Any]]):
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes) if attributes else {}
+        self.events: List[tuple] = []
+        self.status = STATUS_UNSET
+        self.status_message = ""
+        self._buffer = parent._buffer if parent else _TraceBuffer()
+        self._token = None
+
+    @property
+    def is_root(self) -> bool:
+        return self.parent_id is None
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        self.attributes.update(attributes)
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+        self.events.append((time.time_ns(), name, attributes or {}))
+
+    def record_exception(self, error: BaseException) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = str(error)
+        self.add_event("exception", {"exception.type": type(error).__name__, "exception.message": str(error)})
+
+    def end(self) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if self._token is not None:
+            try:
+                current_span.reset(self._token)
+            except ValueError:
+                # Ended from a different context than it was started in; leave that context alone
+                pass
+            self._token = None
+        buffer = self._buffer
+        if buffer.flushed:
+            # Straggler that outlived its turn (e.g. a cancelled hedge); ship it on its own
+            _export([self])
+            return
+        buffer.spans.append(self)
+        if self.is_root:
+            buffer.flushed = True
+            if self.duration_ms >= TRACE_SLOW_MS:
+                _export(buffer.spans)
+
+    def __enter__(self) -> "Span":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc is not None:
+            if isinstance(exc, GeneratorExit) or exc_type.__name__ == "CancelledError":
+                self.set_attribute("cancelled", True)
+            else:
+                self.record_exception(exc)
+        self.end()
+
+
+class _NoopSpan:
+    """Returned when tracing is off or the turn was not sampled; every call is free"""
+    __slots__ = ()
+    trace_id = span_id = parent_id = None
+    is_root = False
+    duration_ms = 0.0
+
+    def set_attribute(self, key, value): pass
+    def set_attributes(self, attributes): pass
+    def add_event(self, name, attributes=None): pass
+    def record_exception(self, error): pass
+    def end(self): pass
+    def __enter__(self): return self
+    def __exit__(self, exc_type, exc, tb): pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def start_span(name: str, attributes: Optional[Dict[str, Any]] = None, kind: int = KIND_INTERNAL,
+               root: bool = False):
+    """
+    Start a span under the current one and make it current until it ends.
+
+    Use as a context manager, or call .end() explicitly where a block would
+    force a large reindent. With root=True a new trace is started (subject to
+    TRACE_SAMPLE_RATE); without a current span nothing is recorded, so code
+    outside a turn (warm-up, keep-alive) stays untraced.
+    """
+    if _exporter is None:
+        return NOOP_SPAN
+    parent = None if root else current_span.get()
+    if parent is None and (not root or random.random() >= TRACE_SAMPLE_RATE):
+        return NOOP_SPAN
+    span = Span(name, parent, kind, attributes)
+    span._token = current_span.set(span)
+    return span
+
+
+def get_current_span():
+    return current_span.get() or NOOP_SPAN
+
+
+def traced(name: str, attributes: Optional[Dict[str, Any]] = None):
+    """Decorator form of start_span for sync and async functions"""
+    def decorator(function):
+        if inspect.iscoroutinefunction(function):
+            @wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                with start_span(name, attributes):
+                    return await function(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with start_span(name, attributes):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# --- OTLP/JSON encoding -------------------------------------------------------
+
+def _any_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_any_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+def _key_values(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _any_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def _encode_span(span: Span) -> Dict[str, Any]:
+    encoded = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": span.kind,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": _key_values(span.attributes),
+        "events": [
+            {"timeUnixNano": str(ts), "name": name, "attributes": _key_values(attrs)}
+            for ts, name, attrs in span.events
+        ],
+        "status": {"code": span.status, **({"message": span.status_message} if span.status_message else {})},
+    }
+    if span.parent_id:
+        encoded["parentSpanId"] = span.parent_id
+    return encoded
+
+
+def encode_spans(spans: List[Span]) -> Dict[str, Any]:
+    """OTLP ExportTraceServiceRequest for `spans`"""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": _key_values({"service.name": SERVICE_NAME})},
+            "scopeSpans": [{"scope": {"name": "flux"}, "spans": [_encode_span(s) for s in spans]}],
+        }]
+    }
+
+
+# --- Export -------------------------------------------------------------------
+
+class FileExporter:
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, payload: Dict[str, Any]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(payload, separators=(",", ":")) + "\n")
+
+
+class OTLPHttpExporter:
+    def __init__(self, endpoint: str, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def export(self, payload: Dict[str, Any]) -> None:
+        request = urllib.request.Request(
+            self.endpoint, data=json.dumps(payload).encode(), headers={"Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+class _ExportWorker:
+    """Encodes and writes traces off the event loop; drops traces rather than blocking when behind"""
+
+    def __init__(self, exporter):
+        self.exporter = exporter
+        self.queue: "queue.Queue[Optional[List[Span]]]" = queue.Queue(maxsize=TRACE_QUEUE_SIZE)
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="trace-export", daemon=True)
+        self._thread.start()
+
+    def submit(self, spans: List[Span]) -> None:
+        try:
+            self.queue.put_nowait(list(spans))
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            spans = self.queue.get()
+            if spans is None:
+                return
+            try:
+                self.exporter.export(encode_spans(spans))
+            except Exception as e:
+                logger.warning("Trace export failed: %s", e)
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        try:
+            self.queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+
+def _build_exporter():
+    if TRACE_EXPORTER == "file":
+        return FileExporter(TRACE_FILE)
+    if TRACE_EXPORTER == "otlp":
+        return OTLPHttpExporter(TRACE_OTLP_ENDPOINT)
+    if TRACE_EXPORTER not in ("", "none"):
+        logger.warning("Unknown TRACE_EXPORTER=%s, tracing disabled", TRACE_EXPORTER)
+    return None
+
+
+_exporter = _build_exporter()
+_worker: Optional[_ExportWorker] = None
+
+
+def _export(spans: List[Span]) -> None:
+    global _worker
+    if _worker is None:
+        _worker = _ExportWorker(_exporter)
+        atexit.register(_worker.shutdown)
+    _worker.submit(spans)
+
+
+def tracing_enabled() -> bool:
+    return _exporter is not None
@@ -0,0 +1,126 @@
+# utils/turn_deadline.py
+"""
+Per-turn deadline and per-agent timeouts for multi-agent turns.
+
+A team turn used to wait for its slowest agent, however long that took. Now
+each agent call is bounded by AGENT_TIMEOUT_SECONDS (agent_timeout), and
+each turn's deliveries are bounded by TURN_DEADLINE_SECONDS, counted from
+bind_turn (TurnDeadline.stream). When the deadline passes, the turn completes
+with whatever has arrived and is marked partial. Agents still running are
+then either cancelled, or kept running with their answers sent when they
+arrive (TURN_LATE_AGENTS=background).
+
+    TURN_DEADLINE_SECONDS=60     0 disables the turn deadline
+    AGENT_TIMEOUT_SECONDS=45     0 disables per-agent timeouts
+    TURN_LATE_AGENTS=background  or "cancel"
+"""
+import asyncio
+import os
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+from utils.logging_config import get_logger
+from utils.metrics import LATE_AGENTS, record_error
+from utils.request_context import get_turn_started
+
+logger = get_logger("deadline")
+
+TURN_DEADLINE = float(os.getenv("TURN_DEADLINE_SECONDS", 60))
+AGENT_TIMEOUT = float(os.getenv("AGENT_TIMEOUT_SECONDS", 45))
+LATE_POLICY = os.getenv("TURN_LATE_AGENTS", "background").lower()
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+async def agent_timeout(call: Awaitable, timeout: float = AGENT_TIMEOUT):
+    """Await one agent call, raising asyncio.TimeoutError (and cancelling it) after `timeout` seconds"""
+    if timeout <= 0:
+        return await call
+    try:
+        return await asyncio.wait_for(call, timeout)
+    except asyncio.TimeoutError:
+        LATE_AGENTS.inc(deadline="agent", outcome="cancelled")
+        raise
+
+
+def timeout_message(agent_name: str, timeout: float = AGENT_TIMEOUT) -> str:
+    return f"{agent_name} did not answer within {timeout:g}s and was skipped for this turn."
+
+
+class TurnDeadline:
+    """Bounds how long one turn waits for its deliveries; create one per turn"""
+
+    def __init__(self, deadline: float = TURN_DEADLINE, late_policy: str = LATE_POLICY):
+        self.deadline = deadline
+        self.late_policy = late_policy
+        self.started = get_turn_started() or time.monotonic()
+        self.expired = False
+        self._background = False
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline, or None without one"""
+        if self.deadline <= 0:
+            return None
+        return max(0.0, self.started + self.deadline - time.monotonic())
+
+    async def stream(self, source: AsyncIterator,
+                     on_late: Optional[Callable[[Any], Awaitable]] = None) -> AsyncIterator:
+        """
+        Yield items from `source` until it ends or the deadline passes, then set
+        `expired`. After the deadline, the rest of `source` keeps running and
+        each late item goes to on_late when the policy is "background" and
+        on_late is given. Otherwise the rest of `source` is cancelled.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        self._background = self.late_policy == "background" and on_late is not None
+
+        # The source runs in one task of its own, so it can outlive the turn when demoted to background
+        async def pump():
+            try:
+                async for item in source:
+                    if not self.expired:
+                        queue.put_nowait(item)
+                        continue
+                    try:
+                        await on_late(item)
+                    except Exception as e:
+                        record_error("late_delivery", e)
+                        logger.warning("Late delivery failed: %s", e)
+            except Exception as e:
+                if not self.expired:
+                    queue.put_nowait(_Failure(e))
+                else:
+                    logger.warning("Background agents failed after the deadline: %s", e)
+            finally:
+                queue.put_nowait(_DONE)
+
+        task = asyncio.ensure_future(pump())
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), self.remaining())
+                except asyncio.TimeoutError:
+                    self.expired = True
+                    return
+                if item is _DONE:
+                    return
+                if isinstance(item, _Failure):
+                    raise item.error
+                yield item
+        finally:
+            if not (self.expired and self._background) and not task.done():
+                task.cancel()
+
+    def missed(self, agents) -> list:
+        """Record the agents still unanswered at the deadline; returns them as a list"""
+        agents = list(agents)
+        if agents:
+            outcome = "background" if self._background else "cancelled"
+            LATE_AGENTS.inc(len(agents), deadline="turn", outcome=outcome)
+            logger.info("Past the turn deadline: %s %s", outcome, agents)
+        return agents
@@ -0,0 +1,99 @@
+# utils/turn_events.py
+"""
+Typed events for one workflow turn, delivered as they happen.
+
+LangGraph 0.2 has no custom stream mode, so SDLCWorkflow.stream_events merges the
+graph's own "updates" stream (node deltas) with events published while nodes run.
+Publishers find the turn's sink in a ContextVar, which follows the turn into the
+parallel agent tasks; outside stream_events publishing is a no-op.
+
+    agent_started    agent          an agent began working on the request
+    token            agent, text    a streamed chunk of its answer (only when the turn asked for tokens);
+                                    restart=True means discard that agent's chunks so far (a retry or
+                                    fail-over started the answer again)
+    agent_finished   agent, text    its complete answer, authoritative over the chunks
+    agent_dropped    agent          its earlier answer left the conversation (dismissals)
+    collaborators    agents         the agents a collaboration fans out to
+    phase_changed    phase          the SDLC phase a node completed
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, NamedTuple, Optional, Tuple
+
+from utils.request_context import current_agent
+
+AGENT_STARTED = "agent_started"
+TOKEN = "token"
+AGENT_FINISHED = "agent_finished"
+AGENT_DROPPED = "agent_dropped"
+COLLABORATORS = "collaborators"
+PHASE_CHANGED = "phase_changed"
+
+
+class TurnEvent(NamedTuple):
+    type: str
+    agent: Optional[str] = None
+    text: str = ""
+    agents: Tuple[str, ...] = ()
+    phase: Optional[str] = None
+    restart: bool = False
+
+
+class EventSink(NamedTuple):
+    put: Callable[[TurnEvent], None]
+    tokens: bool  # whether the consumer wants token events
+
+
+current_event_sink: ContextVar[Optional[EventSink]] = ContextVar("current_event_sink", default=None)
+
+
+@contextmanager
+def bind_event_sink(sink: EventSink) -> Iterator[None]:
+    """Route events published inside the block (and tasks started in it) to `sink`"""
+    token = current_event_sink.set(sink)
+    try:
+        yield
+    finally:
+        current_event_sink.reset(token)
+
+
+def publish(event_type: str, **fields) -> None:
+    """Hand an event to the current turn's sink, if it has one"""
+    sink = current_event_sink.get()
+    if sink is not None:
+        sink.put(TurnEvent(event_type, **fields))
+
+
+class TokenTap:
+    """
+    Forwards the chunks of one generate() call as token events for the current agent.
+    Hedging and retries can run several upstream streams for one answer; only the stream
+    that produced text first is forwarded, until it fails and another takes over.
+    """
+
+    def __init__(self, sink: EventSink, agent: Optional[str]):
+        self.sink = sink
+        self.agent = agent
+        self.owner: Optional[object] = None
+        self.forwarded = False
+
+    def push(self, stream: object, text: str) -> None:
+        restart = False
+        if self.owner is None:
+            self.owner = stream
+            restart, self.forwarded = self.forwarded, True
+        if self.owner is stream:
+            self.sink.put(TurnEvent(TOKEN, agent=self.agent, text=text, restart=restart))
+
+    def release(self, stream: object) -> None:
+        """`stream` failed or was cancelled; the next stream to produce text takes over"""
+        if self.owner is stream:
+            self.owner = None
+
+
+def token_tap() -> Optional[TokenTap]:
+    """A tap for the current agent's LLM stream, or None when nobody is listening for tokens"""
+    sink = current_event_sink.get()
+    if sink is None or not sink.tokens:
+        return None
+    return TokenTap(sink, current_agent.get())
@@ -0,0 +1,272 @@
+# utils/turn_recorder.py
+"""
+Records turns so they can be replayed offline (benchmarks/replay.py): each turn's inbound
+message, the routing decisions made for it, and every upstream LLM call with its prompt and
+the chunks it returned, timed from the moment the call was made.
+
+One compact JSON object per line, appended by a background thread:
+
+    {"k":"turn","turn":"3fa9c1.3","entry":"main","session":"s1","at":1792396012.481,"request":{...}}
+    {"k":"route","turn":"3fa9c1.3","entry":"workflow","mode":"collaboration","agents":["developer","qa_tester"]}
+    {"k":"text","id":"9c1f0e...","text":"You are Marc..."}
+    {"k":"llm","turn":"3fa9c1.3","agent":"developer","model":"llama-3.3-70b-versatile","stream":true,"at":0.021,
+     "prompt":[["system","9c1f0e..."],["user","07ab3d..."]],"chunks":[[212.4,"Sure"],[219.1,", here"]],
+     "usage":[812,240],"ms":1630.2}
+
+Turns are numbered per process, after a run ID, so several runs can append to one file.
+Prompt messages are stored once as "text" records and referenced by ID. "at" is the Unix time
+a turn started, and seconds since its turn started for a call; chunk offsets and "ms" are
+milliseconds since the call was made. A failed call carries "error" (the HTTP status and
+rate-limit headers, or the kind of connection failure), one the caller gave up on (lost hedge,
+agent timeout) "cancelled". Calls outside a turn (warm-up, keep-alive) are not recorded.
+
+    TURN_RECORD_FILE=           file to append recorded turns to; unset disables recording
+"""
+import asyncio
+import atexit
+import hashlib
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+import groq
+
+from utils.logging_config import get_logger
+from utils.request_context import current_agent, get_session_id
+
+logger = get_logger("recorder")
+
+RECORD_FILE = os.getenv("TURN_RECORD_FILE", "")
+
+
+def text_id(text: str) -> str:
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+def _ms(started: float) -> float:
+    return round((time.monotonic() - started) * 1000, 1)
+
+
+def _usage(usage) -> Optional[List[int]]:
+    return [usage.prompt_tokens, usage.completion_tokens] if usage else None
+
+
+def describe_error(error: BaseException) -> Dict[str, Any]:
+    """What replay needs to raise an equivalent error"""
+    if isinstance(error, groq.APIStatusError):
+        headers = {name: value for name, value in error.response.headers.items()
+                   if name == "retry-after" or name.startswith("x-ratelimit")}
+        return {"status": error.status_code, "message": error.message, "headers": headers}
+    if isinstance(error, groq.APITimeoutError):
+        return {"type": "timeout"}
+    if isinstance(error, groq.APIConnectionError):
+        return {"type": "connection", "message": str(error)}
+    return {"type": type(error).__name__, "message": str(error)}
+
+
+class _RecordedTurn(NamedTuple):
+    key: str
+    started: float  # time.monotonic()
+
+
+current_recorded_turn: ContextVar[Optional[_RecordedTurn]] = ContextVar("current_recorded_turn", default=None)
+
+
+class _RecordWriter:
+    """Appends records from a background thread, so recording adds no file I/O to a turn"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.queue: "queue.Queue[Optional[dict]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="turn-record", daemon=True)
+        self._thread.start()
+        atexit.register(self.shutdown)
+
+    def submit(self, record: dict) -> None:
+        self.queue.put_nowait(record)
+
+    def _run(self) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                record = self.queue.get()
+                if record is None:
+                    return
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+                if self.queue.empty():
+                    f.flush()
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        self.queue.put(None)
+        self._thread.join(timeout)
+
+
+class TurnRecorder:
+    """Turns, routing decisions and LLM calls as records handed to `emit`"""
+
+    def __init__(self, emit: Callable[[dict], None]):
+        self.emit = emit
+        self.run = uuid.uuid4().hex[:6]
+        self._turns = itertools.count(1)
+        self._texts = set()  # IDs of prompt texts already emitted
+        self._lock = threading.Lock()  # sync graph nodes record from executor threads
+
+    def turn(self, entry: str, request: dict, **extra) -> None:
+        """Start recording a turn in the current task; later records in it (and its tasks) belong to it"""
+        turn = _RecordedTurn(f"{self.run}.{next(self._turns)}", time.monotonic())
+        current_recorded_turn.set(turn)
+        self.emit({"k": "turn", "turn": turn.key, "entry": entry, "session": get_session_id(),
+                   "at": round(time.time(), 3), "request": request, **extra})
+
+    def route(self, entry: str, mode: Optional[str], agents: Iterable[str]) -> None:
+        turn = current_recorded_turn.get()
+        if turn is not None:
+            self.emit({"k": "route", "turn": turn.key, "entry": entry, "mode": mode, "agents": list(agents)})
+
+    def prompt(self, messages: List[Dict[str, Any]]) -> List[List[str]]:
+        """[role, text ID] per message, emitting texts not seen before"""
+        refs = []
+        for message in messages:
+            text = str(message.get("content", ""))
+            ref = text_id(text)
+            with self._lock:
+                new = ref not in self._texts
+                self._texts.add(ref)
+            if new:
+                self.emit({"k": "text", "id": ref, "text": text})
+            refs.append([message.get("role"), ref])
+        return refs
+
+    async def completion(self, create: Callable, kwargs: Dict[str, Any]):
+        """Make a chat completion with `create`, recording it if it belongs to a turn"""
+        turn = current_recorded_turn.get()
+        if turn is None:
+            return await create(**kwargs)
+        call = {"k": "llm", "turn": turn.key, "agent": current_agent.get(), "model": kwargs.get("model"),
+                "stream": bool(kwargs.get("stream")), "at": round(time.monotonic() - turn.started, 3),
+                "prompt": self.prompt(kwargs.get("messages", [])), "chunks": []}
+        started = time.monotonic()
+        try:
+            response = await create(**kwargs)
+        except BaseException as e:
+            self.finish(call, started, e)
+            raise
+        if call["stream"]:
+            return _RecordingStream(self, call, started, response)
+        call["chunks"].append([_ms(started), response.choices[0].message.content or ""])
+        call["usage"] = _usage(response.usage)
+        self.finish(call, started)
+        return response
+
+    def finish(self, call: dict, started: float, error: Optional[BaseException] = None) -> None:
+        call["ms"] = _ms(started)
+        if isinstance(error, asyncio.CancelledError):
+            call["cancelled"] = True
+        elif error is not None:
+            call["error"] = describe_error(error)
+        self.emit(call)
+
+
+class _RecordingStream:
+    """Passes an upstream stream through, noting when each content chunk arrived"""
+
+    def __init__(self, recorder: TurnRecorder, call: dict, started: float, stream):
+        self.recorder = recorder
+        self.call = call
+        self.started = started
+        self.stream = stream
+        self.finished = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            chunk = await self.stream.__anext__()
+        except StopAsyncIteration:
+            self._finish()
+            raise
+        except BaseException as e:
+            self._finish(e)
+            raise
+        usage = getattr(getattr(chunk, "x_groq", None), "usage", None) or getattr(chunk, "usage", None)
+        if usage:
+            self.call["usage"] = _usage(usage)
+        if chunk.choices and chunk.choices[0].delta.content:
+            self.call["chunks"].append([_ms(self.started), chunk.choices[0].delta.content])
+        return chunk
+
+    async def close(self) -> None:
+        # Closed before the end of the stream: the caller stopped reading
+        self._finish(asyncio.CancelledError())
+        await self.stream.close()
+
+    def _finish(self, error: Optional[BaseException] = None) -> None:
+        if not self.finished:
+            self.finished = True
+            self.recorder.finish(self.call, self.started, error)
+
+
+class _RecordingCompletions:
+    def __init__(self, recorder: TurnRecorder, completions):
+        self.recorder = recorder
+        self.completions = completions
+
+    async def create(self, **kwargs):
+        return await self.recorder.completion(self.completions.create, kwargs)
+
+
+class RecordingClient:
+    """An AsyncGroq client whose chat completions are recorded; everything else passes through"""
+
+    def __init__(self, client, recorder: TurnRecorder):
+        self._client = client
+        self.chat = SimpleNamespace(completions=_RecordingCompletions(recorder, client.chat.completions))
+
+    def __getattr__(self, name: str):
+        return getattr(self._client, name)
+
+
+_recorder: Optional[TurnRecorder] = None
+_resolved = False
+
+
+def get_turn_recorder() -> Optional[TurnRecorder]:
+    """The process-wide recorder, or None when TURN_RECORD_FILE is not set"""
+    global _recorder, _resolved
+    if not _resolved:
+        _resolved = True
+        if RECORD_FILE:
+            _recorder = TurnRecorder(_RecordWriter(RECORD_FILE).submit)
+            logger.info("Recording turns to %s", RECORD_FILE)
+    return _recorder
+
+
+def set_turn_recorder(recorder: Optional[TurnRecorder]) -> None:
+    """Replace the process-wide recorder (replay captures routing decisions this way)"""
+    global _recorder, _resolved
+    _recorder, _resolved = recorder, True
+
+
+def record_turn(entry: str, request: dict, **extra) -> None:
+    recorder = get_turn_recorder()
+    if recorder is not None:
+        recorder.turn(entry, request, **extra)
+
+
+def record_route(entry: str, mode: Optional[str], agents: Iterable[str]) -> None:
+    recorder = get_turn_recorder()
+    if recorder is not None:
+        recorder.route(entry, mode, agents)
+
+
+def recorded_client(client):
+    """`client` itself, or a recording wrapper around it when turns are being recorded"""
+    recorder = get_turn_recorder()
+    return client if recorder is None else RecordingClient(client, recorder)
@@ -0,0 +1,334 @@
+# utils/usage_ledger.py
+"""
+Token usage and cost accounting for LLM calls.
+
+Every completed call is recorded once, with the provider's token counts when
+the response carries them (x_groq.usage on the last stream chunk, `usage` on
+plain completions) and a local estimate otherwise. Totals are kept in memory
+per (session, agent, role, model); deltas are flushed to Redis or SQLite by a
+background task, off the event loop, so several workers can share one store.
+Sessions idle for USAGE_SESSION_IDLE_TTL drop out of the in-memory totals (and
+their budget count); the store keeps their history.
+
+    USAGE_STORE=memory              "redis" or "sqlite" to persist totals
+    USAGE_SQLITE_PATH=usage.db
+    USAGE_FLUSH_INTERVAL=30         seconds between flushes
+    USAGE_SESSION_TOKEN_BUDGET=0    tokens a session may use before LLM calls are refused; 0 = unlimited
+    USAGE_PROMPT_WARN_TOKENS=6000   warn when a single prompt is larger than this
+    USAGE_SESSION_IDLE_TTL=86400    seconds without calls before a session's in-memory totals are dropped
+    LLM_PRICES='{"llama-3.1-8b-instant": [0.05, 0.08]}'   USD per million input/output tokens
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from utils.logging_config import get_logger
+from utils.metrics import LLM_TOKENS, record_error
+from utils.request_context import current_agent, get_session_id
+
+logger = get_logger("usage")
+
+USAGE_STORE = os.getenv("USAGE_STORE", "memory").lower()
+USAGE_SQLITE_PATH = os.getenv("USAGE_SQLITE_PATH", "usage.db")
+FLUSH_INTERVAL = float(os.getenv("USAGE_FLUSH_INTERVAL", 30))
+SESSION_TOKEN_BUDGET = int(os.getenv("USAGE_SESSION_TOKEN_BUDGET", 0))
+PROMPT_WARN_TOKENS = int(os.getenv("USAGE_PROMPT_WARN_TOKENS", 6000))
+SESSION_IDLE_TTL = float(os.getenv("USAGE_SESSION_IDLE_TTL", 86400))  # sessions themselves expire after 24h
+
+# USD per million (input, output) tokens; output prices match model_router.MODEL_COSTS
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "llama-3.1-8b-instant": (0.05, 0.08),
+    "openai/gpt-oss-20b": (0.10, 0.50),
+    "openai/gpt-oss-120b": (0.15, 0.75),
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+}
+try:
+    MODEL_PRICES.update({model: (float(input_price), float(output_price))
+                         for model, (input_price, output_price) in json.loads(os.getenv("LLM_PRICES", "{}")).items()})
+except (ValueError, TypeError, AttributeError) as e:
+    logger.warning("Ignoring invalid LLM_PRICES: %s", e)
+
+UsageKey = Tuple[str, str, str, str]  # session, agent, role, model
+KEY_FIELDS = ("session", "agent", "role", "model")
+UNKNOWN = "-"
+
+
+class TokenBudgetExceeded(RuntimeError):
+    """The session has used its token budget; raised before the LLM call is made"""
+
+    def __init__(self, session_id: str, used: int, budget: int):
+        super().__init__(f"Session token budget exhausted ({used}/{budget} tokens)")
+        self.session_id = session_id
+        self.used = used
+        self.budget = budget
+
+
+@dataclass
+class UsageTotals:
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    estimated_calls: int = 0      # calls whose counts were estimated locally
+    max_prompt_tokens: int = 0
+    cost_usd: float = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(self, other: "UsageTotals") -> None:
+        self.calls += other.calls
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.estimated_calls += other.estimated_calls
+        self.max_prompt_tokens = max(self.max_prompt_tokens, other.max_prompt_tokens)
+        self.cost_usd += other.cost_usd
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data["total_tokens"] = self.total_tokens
+        data["cost_usd"] = round(self.cost_usd, 6)
+        return data
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    input_price, output_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+# HSET field to ARGV[2] if that is larger than its current value; hashes have no atomic max
+_HASH_MAX = """
+local current = tonumber(redis.call('HGET', KEYS[1], ARGV[1]) or '0')
+if tonumber(ARGV[2]) > current then redis.call('HSET', KEYS[1], ARGV[1], ARGV[2]) end
+"""
+
+
+class RedisUsageStore:
+    """One hash per (session, agent, role, model), incremented by each flush"""
+
+    def __init__(self):
+        import redis
+        self.client = redis.Redis(
+            host=os.getenv("REDIS_HOST", "localhost"),
+            port=int(os.getenv("REDIS_PORT", 6379)),
+            db=int(os.getenv("REDIS_DB", 0)),
+            decode_responses=True,
+            socket_connect_timeout=1,
+            socket_timeout=1
+        )
+        self.hash_max = self.client.register_script(_HASH_MAX)
+
+    def write(self, deltas: List[Tuple[UsageKey, UsageTotals]]) -> None:
+        pipeline = self.client.pipeline(transaction=False)
+        for key, delta in deltas:
+            name = "usage:" + "|".join(key)
+            pipeline.sadd("usage:keys", name)
+            pipeline.hincrby(name, "calls", delta.calls)
+            pipeline.hincrby(name, "prompt_tokens", delta.prompt_tokens)
+            pipeline.hincrby(name, "completion_tokens", delta.completion_tokens)
+            pipeline.hincrby(name, "estimated_calls", delta.estimated_calls)
+            pipeline.hincrbyfloat(name, "cost_usd", delta.cost_usd)
+            self.hash_max(keys=[name], args=["max_prompt_tokens", delta.max_prompt_tokens], client=pipeline)
+        pipeline.execute()
+
+
+class SQLiteUsageStore:
+    def __init__(self, path: str):
+        self.path = path
+        with self._connect() as connection:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS usage (
+                    session TEXT, agent TEXT, role TEXT, model TEXT,
+                    calls INTEGER, prompt_tokens INTEGER, completion_tokens INTEGER,
+                    estimated_calls INTEGER, max_prompt_tokens INTEGER, cost_usd REAL,
+                    PRIMARY KEY (session, agent, role, model)
+                )""")
+
+    def _connect(self) -> sqlite3.Connection:
+        # Flushes run on a worker thread, so each one opens its own connection
+        return sqlite3.connect(self.path, timeout=5)
+
+    def write(self, deltas: List[Tuple[UsageKey, UsageTotals]]) -> None:
+        with self._connect() as connection:
+            connection.executemany("""
+                INSERT INTO usage VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (session, agent, role, model) DO UPDATE SET
+                    calls = calls + excluded.calls,
+                    prompt_tokens = prompt_tokens + excluded.prompt_tokens,
+                    completion_tokens = completion_tokens + excluded.completion_tokens,
+                    estimated_calls = estimated_calls + excluded.estimated_calls,
+                    max_prompt_tokens = MAX(max_prompt_tokens, excluded.max_prompt_tokens),
+                    cost_usd = cost_usd + excluded.cost_usd
+                """, [(*key, d.calls, d.prompt_tokens, d.completion_tokens, d.estimated_calls,
+                       d.max_prompt_tokens, d.cost_usd) for key, d in deltas])
+
+
+def _build_store():
+    try:
+        if USAGE_STORE == "redis":
+            return RedisUsageStore()
+        if USAGE_STORE == "sqlite":
+            return SQLiteUsageStore(USAGE_SQLITE_PATH)
+    except Exception as e:
+        logger.warning("Usage store %s unavailable, keeping usage in memory only: %s", USAGE_STORE, e)
+        return None
+    if USAGE_STORE not in ("", "memory"):
+        logger.warning("Unknown USAGE_STORE=%s, keeping usage in memory only", USAGE_STORE)
+    return None
+
+
+class UsageLedger:
+    def __init__(self, store=None, session_budget: int = SESSION_TOKEN_BUDGET, idle_ttl: float = SESSION_IDLE_TTL):
+        self.store = store
+        self.session_budget = session_budget
+        self.idle_ttl = idle_ttl
+        self._totals: Dict[UsageKey, UsageTotals] = {}
+        self._pending: Dict[UsageKey, UsageTotals] = {}
+        self._session_tokens: Dict[str, int] = {}
+        self._session_keys: Dict[str, Set[UsageKey]] = {}
+        self._last_seen: "OrderedDict[str, float]" = OrderedDict()  # session -> monotonic time, oldest first
+        self._budgets: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def record(self, model: str, role: str, prompt_tokens: int, completion_tokens: int,
+               estimated: bool = False, session_id: Optional[str] = None, agent: Optional[str] = None) -> UsageTotals:
+        """Account one finished call; session and agent default to the current request context"""
+        session_id = session_id or get_session_id() or UNKNOWN
+        agent = agent or current_agent.get() or role
+        call = UsageTotals(1, prompt_tokens, completion_tokens, int(estimated), prompt_tokens,
+                           estimate_cost(model, prompt_tokens, completion_tokens))
+        key = (session_id, agent, role, model)
+        with self._lock:
+            self._evict_idle()
+            self._touch(session_id)
+            self._totals.setdefault(key, UsageTotals()).add(call)
+            self._pending.setdefault(key, UsageTotals()).add(call)
+            self._session_keys.setdefault(session_id, set()).add(key)
+            self._session_tokens[session_id] = self._session_tokens.get(session_id, 0) + call.total_tokens
+
+        LLM_TOKENS.inc(prompt_tokens, model=model, role=role, direction="in")
+        LLM_TOKENS.inc(completion_tokens, model=model, role=role, direction="out")
+        if PROMPT_WARN_TOKENS and prompt_tokens > PROMPT_WARN_TOKENS:
+            logger.warning("Large prompt: %d tokens for %s on %s", prompt_tokens, agent, model)
+        return call
+
+    def budget_for(self, session_id: str) -> int:
+        return self._budgets.get(session_id, self.session_budget)
+
+    def set_budget(self, session_id: str, tokens: Optional[int]) -> None:
+        """Override the default budget for one session; None restores the default"""
+        with self._lock:
+            if tokens is None:
+                self._budgets.pop(session_id, None)
+            else:
+                self._budgets[session_id] = tokens
+                self._touch(session_id)
+
+    def _touch(self, session_id: str) -> None:
+        self._last_seen[session_id] = time.monotonic()
+        self._last_seen.move_to_end(session_id)
+
+    def _evict_idle(self) -> None:
+        """Forget sessions without calls for `idle_ttl` seconds; their unflushed deltas are still flushed"""
+        cutoff = time.monotonic() - self.idle_ttl
+        while self._last_seen:
+            session_id, seen = next(iter(self._last_seen.items()))
+            if seen > cutoff:
+                break
+            del self._last_seen[session_id]
+            for key in self._session_keys.pop(session_id, ()):
+                del self._totals[key]
+            self._session_tokens.pop(session_id, None)
+            self._budgets.pop(session_id, None)
+
+    def session_tokens(self, session_id: str) -> int:
+        return self._session_tokens.get(session_id, 0)
+
+    def check_budget(self, session_id: Optional[str] = None) -> None:
+        """Raise TokenBudgetExceeded if the (current) session has no budget left"""
+        session_id = session_id or get_session_id()
+        if session_id is None:
+            return
+        budget = self.budget_for(session_id)
+        used = self._session_tokens.get(session_id, 0)
+        if budget and used >= budget:
+            raise TokenBudgetExceeded(session_id, used, budget)
+
+    def summary(self, session_id: Optional[str] = None,
+                group_by: Iterable[str] = ("session", "agent", "role", "model")) -> Dict:
+        """Totals plus one breakdown per requested dimension, optionally for a single session"""
+        with self._lock:
+            rows = [(key, UsageTotals(**asdict(t))) for key, t in self._totals.items()
+                    if session_id is None or key[0] == session_id]
+        total = UsageTotals()
+        breakdowns: Dict[str, Dict[str, UsageTotals]] = {field: {} for field in group_by if field in KEY_FIELDS}
+        for key, totals in rows:
+            total.add(totals)
+            for field, groups in breakdowns.items():
+                groups.setdefault(key[KEY_FIELDS.index(field)], UsageTotals()).add(totals)
+
+        result = {"totals": total.to_dict()}
+        for field, groups in breakdowns.items():
+            result[f"by_{field}"] = {name: t.to_dict() for name, t in sorted(groups.items())}
+        if session_id is not None:
+            budget = self.budget_for(session_id)
+            result["budget"] = {
+                "tokens": budget or None,
+                "used": self.session_tokens(session_id),
+                "remaining": max(0, budget - self.session_tokens(session_id)) if budget else None,
+            }
+        return result
+
+    async def flush(self) -> None:
+        """Write accumulated deltas to the store on a worker thread; failed deltas are kept for the next flush"""
+        if self.store is None:
+            return
+        with self._lock:
+            deltas, self._pending = list(self._pending.items()), {}
+        if not deltas:
+            return
+        try:
+            await asyncio.to_thread(self.store.write, deltas)
+        except Exception as e:
+            logger.warning("Usage flush failed, retrying next interval: %s", e)
+            record_error("usage", e)
+            with self._lock:
+                for key, delta in deltas:
+                    self._pending.setdefault(key, UsageTotals()).add(delta)
+
+    def start_flusher(self, interval: float = None) -> None:
+        if self.store is not None and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.ensure_future(self._flush_loop(interval or FLUSH_INTERVAL))
+
+    async def stop_flusher(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+    async def _flush_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.flush()
+
+
+_ledger: Optional[UsageLedger] = None
+
+
+def get_usage_ledger() -> UsageLedger:
+    """Process-wide ledger shared by every entry point"""
+    global _ledger
+    if _ledger is None:
+        _ledger = UsageLedger(_build_store())
+    return _ledger
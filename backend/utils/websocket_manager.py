@@ -1,14 +1,21 @@
 # utils/websocket_manager.py
 from fastapi import WebSocket
-from typing import Dict, List
+from typing import Dict, List, Optional
 import json
 import asyncio
 from datetime import datetime
 
+from utils.logging_config import get_logger
+from utils.metrics import ACTIVE_WEBSOCKETS, WS_SEND_SECONDS, record_error
+from utils.tracing import start_span
+
+logger = get_logger("ws")
+
 class WebSocketManager:
     def __init__(self):
         self.active_connections: Dict[str, WebSocket] = {}
         self.session_agents: Dict[str, List[str]] = {}
+        ACTIVE_WEBSOCKETS.set_function(lambda: len(self.active_connections))
 
     async def connect(self, websocket: WebSocket, session_id: str):
         await websocket.accept()
@@ -21,6 +28,10 @@ class WebSocketManager:
         if session_id in self.session_agents:
             del self.session_agents[session_id]
 
+    async def _send_json(self, session_id: str, data: dict):
+        with WS_SEND_SECONDS.time(type=data["type"]), start_span("ws.send", {"message.type": data["type"]}):
+            await self.active_connections[session_id].send_text(json.dumps(data))
+
     async def send_agent_response(self, session_id: str, agent_name: str, message: str, message_type: str = "agent_response"):
         if session_id in self.active_connections:
             try:
@@ -30,12 +41,46 @@ class WebSocketManager:
                     "message": message,
                     "timestamp": datetime.now().isoformat()
                 }
-                await self.active_connections[session_id].send_text(json.dumps(data))
+                await self._send_json(session_id, data)
             except Exception as e:
-                print(f"[WS_MGR] Error sending agent response to {session_id}: {e}")
+                record_error("websocket", e)
+                logger.warning("Error sending agent response to %s: %s", session_id, e)
                 # Remove broken connection
                 self.disconnect(session_id)
 
+    async def send_agent_status(self, session_id: str, agent_name: str, status: str,
+                                completed: Optional[int] = None, total: Optional[int] = None):
+        """Per-agent progress, e.g. "completed" as each collaborator finishes (completed of total so far)"""
+        if session_id in self.active_connections:
+            try:
+                data = {
+                    "type": "agent_status",
+                    "agent": agent_name,
+                    "status": status,
+                    "timestamp": datetime.now().isoformat()
+                }
+                if total is not None:
+                    data["completed"] = completed
+                    data["total"] = total
+                await self._send_json(session_id, data)
+            except Exception as e:
+                record_error("websocket", e)
+                logger.warning("Error sending agent status to %s: %s", session_id, e)
+                self.disconnect(session_id)
+
+    async def send_agent_token(self, session_id: str, agent_name: str, text: str, restart: bool = False):
+        """A chunk of an agent's answer as it streams; `restart` discards the agent's chunks so far"""
+        if session_id in self.active_connections:
+            try:
+                data = {"type": "agent_token", "agent": agent_name, "text": text}
+                if restart:
+                    data["restart"] = True
+                await self._send_json(session_id, data)
+            except Exception as e:
+                record_error("websocket", e)
+                logger.warning("Error sending agent token to %s: %s", session_id, e)
+                self.disconnect(session_id)
+
     async def broadcast_collaboration(self, session_id: str, agents: List[str], status: str):
         if session_id in self.active_connections:
             data = {
@@ -44,9 +89,12 @@ class WebSocketManager:
                 "status": status,
                 "timestamp": datetime.now().isoformat()
             }
-            await self.active_connections[session_id].send_text(json.dumps(data))
+            await self._send_json(session_id, data)
 
-    async def send_status_update(self, session_id: str, status: str, details: str = ""):
+    async def send_status_update(self, session_id: str, status: str, details: str = "", partial: bool = False,
+                                 turn_id: Optional[str] = None):
+        """`partial` marks a turn completed at its deadline with some agents still missing;
+        `turn_id` tells the client which ID resumes the turn if it has to retry"""
         if session_id in self.active_connections:
             try:
                 data = {
@@ -55,7 +103,29 @@ class WebSocketManager:
                     "details": details,
                     "timestamp": datetime.now().isoformat()
                 }
-                await self.active_connections[session_id].send_text(json.dumps(data))
+                if partial:
+                    data["partial"] = True
+                if turn_id:
+                    data["turn_id"] = turn_id
+                await self._send_json(session_id, data)
+            except Exception as e:
+                record_error("websocket", e)
+                logger.warning("Error sending status update to %s: %s", session_id, e)
+                self.disconnect(session_id)
+
+    async def send_queue_update(self, session_id: str, model: str, position: int, queue_depth: int):
+        """Tell the client where its LLM call is in the queue for capacity (position 0: admitted)"""
+        if session_id in self.active_connections:
+            try:
+                data = {
+                    "type": "queue_update",
+                    "model": model,
+                    "position": position,
+                    "queue_depth": queue_depth,
+                    "timestamp": datetime.now().isoformat()
+                }
+                await self._send_json(session_id, data)
             except Exception as e:
-                print(f"[WS_MGR] Error sending status update to {session_id}: {e}")
+                record_error("websocket", e)
+                logger.warning("Error sending queue update to %s: %s", session_id, e)
                 self.disconnect(session_id)
\ No newline at end of file
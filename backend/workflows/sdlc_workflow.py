@@ -1,8 +1,10 @@
 # workflows/sdlc_workflow.py
 from langgraph.graph import StateGraph, END
-from typing import TypedDict, List, Optional
+from langgraph.constants import Send
+from typing import Annotated, AsyncIterator, Iterator, NamedTuple, TypedDict, Optional, Tuple
+from collections import ChainMap
 import asyncio
-import re
+import uuid
 
 from agents.requirements_analyst import RequirementsAnalyst
 from agents.software_architect import SoftwareArchitect
@@ -11,11 +13,75 @@ from agents.qa_tester import QATester
 from agents.devops_engineer import DevOpsEngineer
 from agents.project_manager import ProjectManager
 from agents.security_expert import SecurityExpert
+from core.a2a_planner import A2ATurn, estimate_call_tokens
+from core.intent_classifier import get_intent_classifier
+from core.routing_cache import get_routing_cache
+from core.routing_engine import (
+    ALIAS, CONTINUATION, DISMISSAL, EXCLUSIVE, ROLE, get_routing_engine
+)
+from models.schemas import UserRequest
+from utils.llm_scheduler import priority_scope, PRIORITY_DIRECT, PRIORITY_TEAM
+from utils.logging_config import get_logger
+from utils.metrics import ROUTING_SECONDS, TURN_RESUMES
+from utils.tracing import traced
+from utils.turn_deadline import agent_timeout, timeout_message
+from utils.turn_events import (
+    AGENT_DROPPED, AGENT_FINISHED, COLLABORATORS, PHASE_CHANGED, EventSink, TurnEvent, bind_event_sink
+)
+from utils.turn_recorder import record_route
+from workflows.turn_checkpointer import get_turn_checkpointer
+
+logger = get_logger("workflow")
+route_logger = get_logger("route")
+a2a_logger = get_logger("a2a")
+
+def merge_agent_outputs(current: dict, update: dict) -> dict:
+    """
+    Reducer for agent_outputs: parallel agent turns each add their own entry, and a None entry
+    drops that agent's output (dismissals). Always builds a new dict, so an agent_outputs value
+    handed to a node never changes under it and can be shared without copying.
+    """
+    merged = {**current, **update}
+    for agent_name, output in update.items():
+        if output is None:
+            del merged[agent_name]
+    return merged
+
+class ContextView(ChainMap):
+    """
+    An agent's context: per-call entries layered over the shared project_context, which is
+    read through rather than copied. Writes land in the per-call layer (copy-on-write), and it
+    prints like the dict it stands for, so prompts are unchanged.
+    """
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+DIRECT_CALL_NOTE = "You were directly addressed by the user. Respond as if you are having a direct conversation with them."
+
+class PhaseNode(NamedTuple):
+    """One SDLC phase: its graph node, the agent answering it and where the turn goes afterwards"""
+    node: str                  # graph node name
+    role: str                  # agent id, as in the routing engine's ROSTER and agent_outputs
+    agent_class: type
+    phase: str                 # current_phase once the node has run
+    next_step: bool = False    # continue via _route_next_step instead of ending the turn
+
+# The graph is built from this table: one node per phase, reached from route_entry by its
+# agent's route in the routing engine (a direct call to that agent)
+PHASES: Tuple[PhaseNode, ...] = (
+    PhaseNode("analyze_requirements", "requirements_analyst", RequirementsAnalyst, "requirements_analysis", next_step=True),
+    PhaseNode("design_architecture", "software_architect", SoftwareArchitect, "architecture_design"),
+    PhaseNode("develop_solution", "developer", DeveloperAgent, "development"),
+    PhaseNode("test_solution", "qa_tester", QATester, "testing"),
+    PhaseNode("plan_deployment", "devops_engineer", DevOpsEngineer, "deployment_planning"),
+    PhaseNode("manage_project", "project_manager", ProjectManager, "project_management"),
+    PhaseNode("security_review", "security_expert", SecurityExpert, "security_review"),
+)
 
 class SDLCState(TypedDict):
     user_request: str
     current_phase: str
-    agent_outputs: dict
+    agent_outputs: Annotated[dict, merge_agent_outputs]
     conversation_history: list
     project_context: dict
     uploaded_files: list  # Add support for uploaded files
@@ -23,691 +89,394 @@ class SDLCState(TypedDict):
     final_response: str
     requested_agents: list  # Agents requested by user
     called_agent: Optional[str]  # Specific agent directly called by user
+    route: str  # Where route_entry sends this turn
+    collaborators: list  # Agents the collaboration fans out to, one agent_turn each
+
+def build_initial_state(user_request: UserRequest) -> SDLCState:
+    """The state a turn starts from for a WebSocket request"""
+    return {
+        "user_request": user_request.request,
+        # Requested agents go straight to collaboration
+        "current_phase": "collaboration" if user_request.requested_agents else "initial",
+        "agent_outputs": {},
+        "conversation_history": [msg.dict() for msg in user_request.history],
+        "project_context": user_request.context.dict() if user_request.context else {},
+        "uploaded_files": [file.dict() for file in user_request.uploaded_files],
+        "next_agent": "",
+        "final_response": "",
+        "requested_agents": user_request.requested_agents,
+        "called_agent": None,
+        "collaborators": []
+    }
 
 class SDLCWorkflow:
     def __init__(self):
-        self.agents = {
-            "requirements_analyst": RequirementsAnalyst(),
-            "software_architect": SoftwareArchitect(),
-            "developer": DeveloperAgent(),
-            "qa_tester": QATester(),
-            "devops_engineer": DevOpsEngineer(),
-            "project_manager": ProjectManager(),
-            "security_expert": SecurityExpert()
-        }
+        self.agents = {phase.role: phase.agent_class() for phase in PHASES}
 
         self.workflow = self._create_workflow()
+        # stream_events runs turns on a checkpointed copy; self.workflow stays usable without a thread ID
+        self.checkpointer = get_turn_checkpointer()
+        self.resumable_workflow = (self.workflow.builder.compile(checkpointer=self.checkpointer)
+                                   if self.checkpointer is not None else self.workflow)
 
     def _create_workflow(self) -> StateGraph:
         workflow = StateGraph(SDLCState)
+        engine = get_routing_engine()
+        phase_routes = {engine.by_role[phase.role].route: phase.node for phase in PHASES}
 
-        # 🚨 NUCLEAR FIX: FORCE NEW WORKFLOW WITH HARDCODED ROUTING
-        print("[WORKFLOW] 🔥 CREATING NUCLEAR WORKFLOW WITH HARDCODED ROUTING")
-        
-        # Add nodes for each SDLC phase
         workflow.add_node("route_entry", self._route_entry_point)  # New entry routing node
-        workflow.add_node("analyze_requirements", self._analyze_requirements)
-        workflow.add_node("design_architecture", self._design_architecture)
-        workflow.add_node("develop_solution", self._develop_solution)
-        workflow.add_node("test_solution", self._test_solution)
-        workflow.add_node("plan_deployment", self._plan_deployment)
-        workflow.add_node("manage_project", self._manage_project)
-        workflow.add_node("security_review", self._security_review)
+        for phase in PHASES:
+            workflow.add_node(phase.node, self._phase_node(phase))
         workflow.add_node("collaborate", self._multi_agent_collaboration)
+        workflow.add_node("agent_turn", self._collaborator_turn)
 
-        # Define workflow edges with conditional routing - Simplified for performance
         workflow.set_entry_point("route_entry")
-        print("[WORKFLOW] 🎯 Entry point set to: route_entry (HARDCODED ROUTING)")
-        
-        # Add entry routing node
         workflow.add_conditional_edges(
-            "route_entry",
-            self._route_from_entry,
-            {
-                "requirements": "analyze_requirements",
-                "architecture": "design_architecture", 
-                "development": "develop_solution",
-                "testing": "test_solution",
-                "deployment": "plan_deployment",
-                "management": "manage_project",
-                "security": "security_review",
-                "collaboration": "collaborate",
-                "end": END
-            }
+            "route_entry", self._route_from_entry,
+            {**phase_routes, "collaboration": "collaborate", "end": END}
         )
 
-        workflow.add_conditional_edges(
-            "analyze_requirements",
-            self._route_next_step,
-            {
-                "architecture": "design_architecture",
-                "development": "develop_solution", 
-                "testing": "test_solution",
-                "deployment": "plan_deployment",
-                "management": "manage_project",
-                "security": "security_review",
-                "collaboration": "collaborate",
-                "end": END
-            }
-        )
-
-        # All other nodes route to collaboration or end
-        for node in ["design_architecture", "develop_solution", "test_solution", "plan_deployment", "manage_project", "security_review"]:
-            workflow.add_edge(node, END)
+        # A phase either hands on to the next phase or collaboration, or ends the turn
+        for phase in PHASES:
+            if phase.next_step:
+                onward = {route: node for route, node in phase_routes.items() if node != phase.node}
+                workflow.add_conditional_edges(
+                    phase.node, self._route_next_step, {**onward, "collaboration": "collaborate", "end": END}
+                )
+            else:
+                workflow.add_edge(phase.node, END)
 
-        workflow.add_edge("collaborate", END)
+        # One agent_turn per collaborator, run in parallel; astream yields each as soon as it finishes
+        workflow.add_conditional_edges("collaborate", self._fan_out_collaboration, ["agent_turn", END])
+        workflow.add_edge("agent_turn", END)
 
-        print("[WORKFLOW] Created new workflow graph with route_entry as entry point")
+        logger.debug("Created workflow graph with route_entry as entry point")
         return workflow.compile()
 
-    async def _analyze_requirements(self, state: SDLCState) -> SDLCState:
-        agent = self.agents["requirements_analyst"]
-        context = state["project_context"].copy()
-        context["uploaded_files"] = state.get("uploaded_files", [])
-        
-        # Add context about being directly called
-        if state.get("called_agent") == "requirements_analyst":
-            context["direct_call"] = True
-            context["interaction_type"] = "You were directly addressed by the user. Respond as if you are having a direct conversation with them."
-        
-        response = await agent.process_request(state["user_request"], context)
-        state["agent_outputs"]["requirements_analyst"] = response
-        state["current_phase"] = "requirements_analysis"
-        return state
-
-    async def _design_architecture(self, state: SDLCState) -> SDLCState:
-        agent = self.agents["software_architect"]
-        context = state["project_context"].copy()
-        context["uploaded_files"] = state.get("uploaded_files", [])
-        
-        if state.get("called_agent") == "software_architect":
-            context["direct_call"] = True
-            context["interaction_type"] = "You were directly addressed by the user. Respond as if you are having a direct conversation with them."
-        
-        response = await agent.process_request(state["user_request"], context)
-        state["agent_outputs"]["software_architect"] = response
-        state["current_phase"] = "architecture_design"
-        return state
-
-    async def _develop_solution(self, state: SDLCState) -> SDLCState:
-        agent = self.agents["developer"]
-        context = state["project_context"].copy()
-        context["uploaded_files"] = state.get("uploaded_files", [])
-        
-        if state.get("called_agent") == "developer":
-            context["direct_call"] = True
-            context["interaction_type"] = "You were directly addressed by the user. Respond as if you are having a direct conversation with them."
-        
-        response = await agent.process_request(state["user_request"], context)
-        state["agent_outputs"]["developer"] = response
-        state["current_phase"] = "development"
-        return state
-
-    async def _test_solution(self, state: SDLCState) -> SDLCState:
-        agent = self.agents["qa_tester"]
-        context = state["project_context"].copy()
-        context["uploaded_files"] = state.get("uploaded_files", [])
-        
-        if state.get("called_agent") == "qa_tester":
-            context["direct_call"] = True
-            context["interaction_type"] = "You were directly addressed by the user. Respond as if you are having a direct conversation with them."
-        
-        response = await agent.process_request(state["user_request"], context)
-        state["agent_outputs"]["qa_tester"] = response
-        state["current_phase"] = "testing"
-        return state
-
-    async def _plan_deployment(self, state: SDLCState) -> SDLCState:
-        agent = self.agents["devops_engineer"]
-        context = state["project_context"].copy()
-        context["uploaded_files"] = state.get("uploaded_files", [])
-        
-        if state.get("called_agent") == "devops_engineer":
-            context["direct_call"] = True
-            context["interaction_type"] = "You were directly addressed by the user. Respond as if you are having a direct conversation with them."
-        
-        response = await agent.process_request(state["user_request"], context)
-        state["agent_outputs"]["devops_engineer"] = response
-        state["current_phase"] = "deployment_planning"
-        return state
-
-    async def _manage_project(self, state: SDLCState) -> SDLCState:
-        agent = self.agents["project_manager"]
-        context = state["project_context"].copy()
-        context["uploaded_files"] = state.get("uploaded_files", [])
-        
-        if state.get("called_agent") == "project_manager":
-            context["direct_call"] = True
-            context["interaction_type"] = "You were directly addressed by the user. Respond as if you are having a direct conversation with them."
-        
-        response = await agent.process_request(state["user_request"], context)
-        state["agent_outputs"]["project_manager"] = response
-        state["current_phase"] = "project_management"
-        return state
-
-    async def _security_review(self, state: SDLCState) -> SDLCState:
-        agent = self.agents["security_expert"]
-        context = state["project_context"].copy()
-        context["uploaded_files"] = state.get("uploaded_files", [])
-        
-        if state.get("called_agent") == "security_expert":
-            context["direct_call"] = True
-            context["interaction_type"] = "You were directly addressed by the user. Respond as if you are having a direct conversation with them."
-        
-        response = await agent.process_request(state["user_request"], context)
-        state["agent_outputs"]["security_expert"] = response
-        state["current_phase"] = "security_review"
-        return state
-
+    async def stream_events(self, initial_state: SDLCState, tokens: bool = False,
+                            thread_id: Optional[str] = None) -> AsyncIterator[TurnEvent]:
+        """
+        Run one turn and yield its typed events (utils/turn_events.py) as they happen: agents
+        starting, their tokens when `tokens` is set, finished answers and phase changes.
+        With checkpoints on, a `thread_id` seen before resumes that turn: answers already given
+        are sent again and only the agents that had not finished run. A finished turn is replayed.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        async def run():
+            try:
+                with bind_event_sink(EventSink(queue.put_nowait, tokens)):
+                    graph_input, config = initial_state, None
+                    if self.checkpointer is not None:
+                        config = {"configurable": {"thread_id": thread_id or uuid.uuid4().hex}}
+                        if thread_id:
+                            graph_input, config = await self._resume_point(initial_state, config, queue.put_nowait)
+                            if config is None:
+                                return  # a finished turn, replayed from its checkpoint
+                    graph = self.resumable_workflow if config is not None else self.workflow
+                    async for update in graph.astream(graph_input, config, stream_mode="updates"):
+                        for event in self._update_events(update):
+                            queue.put_nowait(event)
+            finally:
+                queue.put_nowait(done)
+
+        turn = asyncio.ensure_future(run())
+        try:
+            while True:
+                event = await queue.get()
+                if event is done:
+                    break
+                yield event
+            await turn  # surfaces the workflow's error, if it failed
+        finally:
+            turn.cancel()
+
+    async def _resume_point(self, initial_state: SDLCState, config: dict, put) -> Tuple[Optional[SDLCState], Optional[dict]]:
+        """
+        (graph input, config) for a turn that may have run before: the initial state for a new turn,
+        None to resume from the checkpoint, or (None, None) once a finished turn has been replayed.
+        """
+        snapshot = await self.resumable_workflow.aget_state(config)
+        if not snapshot.values:
+            return initial_state, config
+        if snapshot.values.get("user_request") != initial_state["user_request"]:
+            logger.warning("Turn %s was retried with a different request; running it as a new turn",
+                           config["configurable"]["thread_id"])
+            return initial_state, {"configurable": {"thread_id": uuid.uuid4().hex}}
+
+        # Answers from finished steps are not streamed again by LangGraph, so send them from the checkpoint
+        if snapshot.values.get("collaborators"):
+            put(TurnEvent(COLLABORATORS, agents=tuple(snapshot.values["collaborators"])))
+        for agent_name, output in snapshot.values.get("agent_outputs", {}).items():
+            put(TurnEvent(AGENT_FINISHED, agent=agent_name, text=output))
+        if not snapshot.next:
+            logger.info("Replaying finished turn %s", config["configurable"]["thread_id"])
+            TURN_RESUMES.inc(mode="replay")
+            if snapshot.values.get("current_phase"):
+                put(TurnEvent(PHASE_CHANGED, phase=snapshot.values["current_phase"]))
+            return None, None
+        logger.info("Resuming turn %s at %s", config["configurable"]["thread_id"], list(snapshot.next))
+        TURN_RESUMES.inc(mode="resume")
+        return None, config
+
+    @staticmethod
+    def _update_events(update: dict) -> Iterator[TurnEvent]:
+        """Events for one "updates" chunk; node results are deltas, so nothing is compared with earlier state"""
+        for node_name, delta in update.items():
+            # Resumed turns mark the updates of agents that had already finished as "cached"
+            if node_name == "__metadata__" or not isinstance(delta, dict):
+                continue
+            if delta.get("collaborators"):
+                yield TurnEvent(COLLABORATORS, agents=tuple(delta["collaborators"]))
+            for agent_name, output in (delta.get("agent_outputs") or {}).items():
+                if output is None:
+                    yield TurnEvent(AGENT_DROPPED, agent=agent_name)
+                else:
+                    yield TurnEvent(AGENT_FINISHED, agent=agent_name, text=output)
+            if delta.get("current_phase"):
+                yield TurnEvent(PHASE_CHANGED, phase=delta["current_phase"])
+
+    def _phase_node(self, phase: PhaseNode):
+        """The graph node for one phase; it returns only its own output and phase for LangGraph to merge"""
+        agent = self.agents[phase.role]
+
+        async def run_phase(state: SDLCState) -> dict:
+            overlay = {"uploaded_files": state.get("uploaded_files", [])}
+            if state.get("called_agent") == phase.role:
+                overlay["direct_call"] = True
+                overlay["interaction_type"] = DIRECT_CALL_NOTE
+            response = await agent.process_request(state["user_request"], ContextView(overlay, state["project_context"]))
+            return {"agent_outputs": {phase.role: response}, "current_phase": phase.phase}
+
+        run_phase.__name__ = phase.node
+        return run_phase
+
+    @traced("collaboration")
     async def _multi_agent_collaboration(self, state: SDLCState) -> SDLCState:
         """Handle multi-agent collaboration with automatic agent-to-agent communication"""
         
         # CRITICAL: If called_agent is set, this is a DIRECT CALL - skip collaboration!
         called_agent = state.get("called_agent")
         if called_agent:
-            print(f"[COLLAB] Direct call to {called_agent} detected - executing ONLY that agent, no collaboration")
+            logger.debug("Direct call to %s detected - executing ONLY that agent, no collaboration", called_agent)
             # Execute only the called agent
             agent = self.agents.get(called_agent)
             if agent:
-                context = state["project_context"].copy()
-                context["uploaded_files"] = state.get("uploaded_files", [])
-                context["direct_call"] = True
-                context["interaction_type"] = "You were directly addressed by the user. Respond naturally as if having a one-on-one conversation."
+                context = ContextView({
+                    "uploaded_files": state.get("uploaded_files", []),
+                    "direct_call": True,
+                    "interaction_type": "You were directly addressed by the user. Respond naturally as if having a one-on-one conversation."
+                }, state["project_context"])
                 
-                response = await agent.process_request(state["user_request"], context)
-                state["agent_outputs"][called_agent] = response
-                print(f"[COLLAB] Executed direct call to {called_agent}, response length: {len(response)}")
-            else:
-                print(f"[COLLAB] ERROR: Called agent {called_agent} not found!")
-            return state
+                try:
+                    response = await agent_timeout(agent.process_request(state["user_request"], context))
+                except asyncio.TimeoutError:
+                    response = timeout_message(agent.name)
+                logger.debug("Executed direct call to %s, response length: %s", called_agent, len(response))
+                return {"agent_outputs": {called_agent: response}}
+            logger.error("Called agent %s not found!", called_agent)
+            # A node must write at least one channel
+            return {"collaborators": []}
         
         requested_agents = state.get("requested_agents", [])
         
-        print(f"[COLLAB] Requested agents: {requested_agents}")
-        print(f"[COLLAB] This should NOT run for direct calls - called_agent was: {state.get('called_agent')}")
+        logger.debug("Requested agents: %s", requested_agents)
         
         if not requested_agents:
             # Only fall back to content-based routing if no agents specified AND no direct call
-            request = state["user_request"].lower()
-            if any(word in request for word in ["requirements", "requirement", "spec", "user story"]):
-                requested_agents = ["requirements_analyst"]
-            elif any(word in request for word in ["architecture", "design", "system"]):
-                requested_agents = ["software_architect"]
-            elif any(word in request for word in ["code", "implement", "develop", "build"]):
-                requested_agents = ["developer"]
-            elif any(word in request for word in ["test", "testing", "quality", "qa"]):
-                requested_agents = ["qa_tester"]
-            elif any(word in request for word in ["deploy", "deployment", "infrastructure"]):
-                requested_agents = ["devops_engineer"]
-            elif any(word in request for word in ["project", "planning", "manage"]):
-                requested_agents = ["project_manager"]
-            elif any(word in request for word in ["security", "secure", "vulnerability"]):
-                requested_agents = ["security_expert"]
+            engine = get_routing_engine()
+            best_agent = get_intent_classifier().best(engine.scan(state["user_request"]).tokens)
+            if best_agent:
+                requested_agents = [engine.by_key[best_agent].role]
             else:
                 # NO DEFAULT - let the user choose
-                print(f"[COLLAB] No specific domain detected, no agents to activate")
-                return state
+                logger.debug("No specific domain detected, no agents to activate")
+                return {"collaborators": []}
         
-        print(f"[COLLAB] Final collaboration list: {requested_agents}")
+        logger.debug("Final collaboration list: %s", requested_agents)
         
+        all_agents, dropped = self._resolve_collaboration_agents(state, requested_agents, called_agent)
+        collaborators = [agent_name for agent_name in all_agents if agent_name in self.agents]
+        for agent_name in all_agents:
+            if agent_name not in self.agents:
+                logger.warning("Agent %s not found in available agents", agent_name)
+        if not collaborators:
+            logger.debug("No collaboration tasks to execute")
+        record_route("workflow", "collaborators", collaborators)
+        update = {"collaborators": collaborators}
+        if dropped:
+            update["agent_outputs"] = dict.fromkeys(dropped)
+        return update
+
+    def _fan_out_collaboration(self, state: SDLCState):
+        """Send each collaborator to its own agent_turn, or end when the collaboration node answered itself"""
+        collaborators = state.get("collaborators") or []
+        if state.get("called_agent") or not collaborators:
+            return END
+        logger.debug("Executing %s agent tasks", len(collaborators))
+        return [Send("agent_turn", {**state, "next_agent": agent_name}) for agent_name in collaborators]
+
+    async def _collaborator_turn(self, state: SDLCState) -> dict:
+        """One collaborator's answer; returns only its own agent_outputs entry so parallel turns merge"""
+        agent_name = state["next_agent"]
+        agent = self.agents[agent_name]
+        previous_responses = state.get("agent_outputs", {})
+
+        # Build context from previous agent responses
+        collaboration_context = ContextView({"uploaded_files": state.get("uploaded_files", [])}, state["project_context"])
+        if previous_responses:
+            collaboration_context["previous_responses"] = previous_responses
+            collaboration_context["conversation_flow"] = "This is part of an ongoing multi-agent collaboration. Please respond to the user's request and any relevant points raised by other team members."
+
+        # Team fan-out yields to direct single-agent calls in the LLM scheduler
+        with priority_scope(PRIORITY_TEAM if len(state["collaborators"]) > 1 else PRIORITY_DIRECT):
+            try:
+                result = await agent_timeout(agent.process_request(state["user_request"], collaboration_context))
+            except asyncio.TimeoutError:
+                result = timeout_message(agent.name)
+        logger.debug("Got result from %s: %s chars", agent_name, len(result))
+        return {"agent_outputs": {agent_name: result}}
+
+    def _resolve_collaboration_agents(self, state: SDLCState, requested_agents: list,
+                                      called_agent: Optional[str]) -> Tuple[list, set]:
+        """
+        Apply A2A mentions, dismissals and exclusive requests to the collaboration list.
+        Returns the agents to run and the agents whose earlier outputs leave the conversation.
+        """
+        dropped = set()
         # Skip A2A detection if this is a direct single-agent call
         if called_agent and len(requested_agents) == 1:
-            print(f"[COLLAB] Direct single-agent call - skipping A2A mention detection")
+            logger.debug("Direct single-agent call - skipping A2A mention detection")
             all_agents = requested_agents
             is_exclusive_request = False
         else:
             # Check if any previous agent responses mention other agents by name
             previous_responses = state.get("agent_outputs", {})
             mentioned_agents = set()
-            is_exclusive_request = False
-            
-            # Agent name mappings for A2A communication - Enhanced with more variations
-            agent_name_mapping = {
-                "sarah": "requirements_analyst",
-                "sarah chen": "requirements_analyst", 
-                "alex": "developer",
-                "alex kim": "developer",
-                "marcus": "software_architect", 
-                "marcus rodriguez": "software_architect",
-                "jessica": "qa_tester",
-                "jessica wu": "qa_tester",
-                "david": "devops_engineer",
-                "david singh": "devops_engineer", 
-                "emily": "project_manager",
-                "emily johnson": "project_manager",
-                "robert": "security_expert",
-                "robert chen": "security_expert",
-                # Additional patterns for better detection
-                "requirements": "requirements_analyst",
-                "architect": "software_architect",
-                "developer": "developer",
-                "tester": "qa_tester", 
-                "qa": "qa_tester",
-                "devops": "devops_engineer",
-                "manager": "project_manager",
-                "security": "security_expert"
-            }
-            
-            # Check for agent mentions in previous responses AND user request
-            user_request_lower = state["user_request"].lower()
-            print(f"[A2A] Checking user request for direct agent mentions and dismissals...")
-            
-            # Detect agent dismissals/drop-offs
-            dismissal_patterns = ["drop off", "drop out", "leave", "dismiss", "step back", "thank you", "thanks", "goodbye", "bye"]
-            agent_dismissals = set()
-            
-            for name, agent_key in agent_name_mapping.items():
-                # Check if agent is being dismissed
-                for dismissal in dismissal_patterns:
-                    if f"{name}" in user_request_lower and dismissal in user_request_lower:
-                        agent_dismissals.add(agent_key)
-                        print(f"[A2A] User dismissing '{name}' -> removing {agent_key}")
-            
+            engine = get_routing_engine()
+
+            # Names, aliases and job titles ("architect", "qa") all resolve through the routing engine
+            request_scan = engine.scan(state["user_request"])
+            named = [engine.by_key[key].role for key in request_scan.agents(ALIAS, ROLE)]
+            a2a_logger.debug("Checking user request for direct agent mentions and dismissals")
+
+            # Detect agent dismissals/drop-offs: any agent named alongside a dismissal is dismissed
+            agent_dismissals = set(named) if request_scan.has(DISMISSAL) else set()
+            if agent_dismissals:
+                a2a_logger.debug("User dismissing %s", agent_dismissals)
+
             # Detect agent mentions (excluding dismissed ones)
-            for name, agent_key in agent_name_mapping.items():
-                if name in user_request_lower and agent_key not in requested_agents and agent_key not in agent_dismissals:
+            for agent_key in named:
+                if agent_key not in requested_agents and agent_key not in agent_dismissals:
                     mentioned_agents.add(agent_key)
-                    print(f"[A2A] User mentioned '{name}' -> adding {agent_key}")
-            
-            # Handle continuation patterns ("continue with", "chat with", "work with")
-            continuation_patterns = [
-                "continue", "chat with", "work with", "speak with", "talk to", 
-                "call", "bring in", "would like to talk to", "want to talk to",
-                "need to talk to", "like to speak to", "want to speak to"
-            ]
-            if any(pattern in user_request_lower for pattern in continuation_patterns):
-                print(f"[A2A] Continuation pattern detected - focusing on specific agents")
-                # If user says "I would like to talk to Marc", only include Marc
-                for name, agent_key in agent_name_mapping.items():
-                    if any(f"{pattern} {name}" in user_request_lower for pattern in continuation_patterns):
-                        # This is an EXCLUSIVE request - clear other agents
-                        mentioned_agents = {agent_key}
-                        requested_agents = [agent_key]
-                        print(f"[A2A] Exclusive request to talk to {name} -> using ONLY {agent_key}")
-                        break
-            
-            # Apply dismissals - remove dismissed agents from previous responses tracking
-            if agent_dismissals and "agent_outputs" in state:
-                print(f"[A2A] Removing dismissed agents from active conversation: {agent_dismissals}")
-                for dismissed_agent in agent_dismissals:
-                    if dismissed_agent in state["agent_outputs"]:
-                        del state["agent_outputs"][dismissed_agent]
-            
-            # Handle exclusive talk-to requests - remove all other agents
-            exclusive_patterns = ["would like to talk to", "want to talk to", "need to talk to", 
-                                 "like to speak to", "want to speak to", "would like to speak to"]
-            is_exclusive_request = False
-            for pattern in exclusive_patterns:
-                if pattern in user_request_lower:
-                    is_exclusive_request = True
-                    print(f"[A2A] Exclusive request detected: '{pattern}'")
-                    # Clear all previous agent outputs except the requested one
-                    if mentioned_agents and "agent_outputs" in state:
-                        agents_to_remove = [a for a in state["agent_outputs"].keys() if a not in mentioned_agents]
-                        for agent_to_remove in agents_to_remove:
-                            del state["agent_outputs"][agent_to_remove]
-                            print(f"[A2A] Removed {agent_to_remove} from conversation (exclusive request)")
+                    a2a_logger.debug("User mentioned %s", agent_key)
+
+            # Handle continuation patterns ("chat with", "work with"): the agent named next is the only one wanted
+            for continuation in request_scan.of(CONTINUATION):
+                target = request_scan.following(continuation, ALIAS, ROLE)
+                if target is not None:
+                    agent_key = engine.by_key[target.agent].role
+                    mentioned_agents = {agent_key}
+                    requested_agents = [agent_key]
+                    a2a_logger.debug("Exclusive request to talk to %s -> using ONLY %s", target.phrase, agent_key)
                     break
-            
-            # SECOND: Check previous agent responses for mentions (only if not a direct call)
+
+            # Apply dismissals - dismissed agents' earlier outputs leave the conversation
+            dropped.update(agent_id for agent_id in agent_dismissals if agent_id in previous_responses)
+            if dropped:
+                a2a_logger.debug("Removing dismissed agents from active conversation: %s", dropped)
+
+            # Handle exclusive talk-to requests - remove all other agents
+            is_exclusive_request = request_scan.has(EXCLUSIVE)
+            if is_exclusive_request:
+                a2a_logger.debug("Exclusive request detected")
+                # Clear all previous agent outputs except the requested one
+                if mentioned_agents:
+                    for agent_to_remove in previous_responses:
+                        if agent_to_remove not in mentioned_agents:
+                            dropped.add(agent_to_remove)
+                            a2a_logger.debug("Removed %s from conversation (exclusive request)", agent_to_remove)
+
+            # SECOND: Let agents named in previous responses join, within the turn's A2A budget (only if not a direct call)
             if not called_agent:
+                responses = {}
                 for agent_id, response in previous_responses.items():
-                    if isinstance(response, str):
-                        response_lower = response.lower()
-                        print(f"[A2A] Checking {agent_id} response for mentions...")
-                        
-                        for name, agent_key in agent_name_mapping.items():
-                            if name in response_lower and agent_key not in requested_agents:
-                                mentioned_agents.add(agent_key)
-                                print(f"[A2A] {agent_id} mentioned '{name}' -> adding {agent_key}")
-                                
-                        # Additional check for names mentioned together (e.g., "Alex, Jessica, David, Emily, and Robert")
-                        if len(mentioned_agents) < 3:  # If we haven't found many mentions, try a broader search
-                            all_names = ["alex", "jessica", "david", "emily", "robert", "kim", "wu", "singh", "johnson", "chen"]
-                            found_names = [name for name in all_names if name in response_lower]
-                            if len(found_names) >= 2:  # Multiple names mentioned together
-                                print(f"[A2A] Multiple names detected in {agent_id} response: {found_names}")
-                                # Add all remaining agents when multiple names are mentioned
-                                for agent_key in ["developer", "qa_tester", "devops_engineer", "project_manager", "security_expert"]:
-                                    if agent_key not in requested_agents:
-                                        mentioned_agents.add(agent_key)
-                                        print(f"[A2A] Multi-name trigger -> adding {agent_key}")
-                    else:
-                        print(f"[A2A] Warning: Response from {agent_id} is not a string: {type(response)}")
+                    if agent_id in dropped:
+                        continue
+                    if isinstance(response, str) and agent_id in engine.by_role:
+                        responses[engine.by_role[agent_id].key] = response
+                    elif not isinstance(response, str):
+                        a2a_logger.warning("Response from %s is not a string: %s", agent_id, type(response))
+                in_turn = [engine.by_role[a].key for a in [*requested_agents, *mentioned_agents, *previous_responses]
+                           if a in engine.by_role]
+                a2a_turn = A2ATurn(state["user_request"], in_turn)
+                cost = estimate_call_tokens(state["user_request"], *responses.values())
+                for agent_key in a2a_turn.next_round(responses, cost):
+                    mentioned_agents.add(engine.by_key[agent_key].role)
+                    a2a_logger.debug("A2A adds %s", agent_key)
             
             # Add mentioned agents to the collaboration
             # For exclusive requests, use ONLY the mentioned agents
             if is_exclusive_request and mentioned_agents:
                 all_agents = list(mentioned_agents)
-                print(f"[WORKFLOW] Exclusive request - using ONLY: {all_agents}")
+                logger.debug("Exclusive request - using ONLY: %s", all_agents)
             else:
                 all_agents = list(set(requested_agents + list(mentioned_agents)))
-                print(f"[WORKFLOW] Final agent list (including A2A): {all_agents}")
-        
-        collaboration_tasks = []
-        for agent_name in all_agents:
-            if agent_name in self.agents:
-                print(f"[WORKFLOW] Adding task for {agent_name}")
-                try:
-                    agent = self.agents[agent_name]
-                    
-                    # Build context from previous agent responses
-                    collaboration_context = state["project_context"].copy()
-                    collaboration_context["uploaded_files"] = state.get("uploaded_files", [])
-                    if previous_responses:
-                        collaboration_context["previous_responses"] = previous_responses
-                        collaboration_context["conversation_flow"] = "This is part of an ongoing multi-agent collaboration. Please respond to the user's request and any relevant points raised by other team members."
-                    
-                    task = agent.process_request(state["user_request"], collaboration_context)
-                    collaboration_tasks.append((agent_name, task))
-                except Exception as agent_error:
-                    print(f"[WORKFLOW] Error creating task for {agent_name}: {agent_error}")
-            else:
-                print(f"[WORKFLOW] Warning: Agent {agent_name} not found in available agents")
-
-        # Execute agents in parallel
-        if collaboration_tasks:
-            print(f"[WORKFLOW] Executing {len(collaboration_tasks)} agent tasks")
-            results = await asyncio.gather(*[task for _, task in collaboration_tasks])
-            for (agent_name, _), result in zip(collaboration_tasks, results):
-                print(f"[WORKFLOW] Got result from {agent_name}: {len(result)} chars")
-                state["agent_outputs"][agent_name] = result
-        else:
-            print("[WORKFLOW] No collaboration tasks to execute")
-
-        return state
-
-    def _route_entry_point(self, state: SDLCState) -> SDLCState:
-        """Entry point that just passes through state for routing"""
-        print("="*80)
-        print("[WORKFLOW] 🔥 NUCLEAR ENTRY POINT ACTIVATED!")
-        print(f"[WORKFLOW] 📝 Message: '{state.get('user_request')}'")
-        print(f"[WORKFLOW] 👥 Requested agents: {state.get('requested_agents', [])}")
-        print(f"[WORKFLOW] 🎯 This is the HARDCODED routing version!")
-        print("="*80)
-        return state
-    
-    def _route_from_entry(self, state: SDLCState) -> str:
-        """Route from entry point based on requested agents or request content"""
-        requested_agents = state.get("requested_agents", [])
-        raw_request = state["user_request"]
-        if isinstance(raw_request, str):
-            user_request_lower = raw_request.strip().lower()
-        else:
-            user_request_lower = str(raw_request).strip().lower()
+                logger.debug("Final agent list (including A2A): %s", all_agents)
 
-        # Always clear any previous direct-call marker before evaluating this turn
-        state["called_agent"] = None
+        return all_agents, dropped
 
-        print(f"\n" + "="*80)
-        print(f"[ROUTE] 🔍 NEW REQUEST RECEIVED")
-        print(f"[ROUTE] 📝 Message: '{state['user_request']}'")
-        print(f"[ROUTE] 👥 Requested agents from UI: {requested_agents}")
-        print(f"[ROUTE] 🎯 called_agent (before routing): {state.get('called_agent')}")
-        print("="*80)
-        
-        # COMPLETE HARDCODED AGENT ROUTING - REPLACES ALL COMPLEX LOGIC
-        print(f"[ROUTE] 🧪 HARDCODED ROUTING: Checking for agent names...")
-        
-        # Check all agent names with proper logging
-        agent_mappings = {
-            "dave": ("deployment", "devops_engineer", "Dave (DevOps Engineer)"),
-            "marc": ("architecture", "software_architect", "Marc (Software Architect)"), 
-            "alex": ("development", "developer", "Alex (Developer)"),
-            "jess": ("testing", "qa_tester", "Jess (QA Tester)"),
-            "emma": ("management", "project_manager", "Emma (Project Manager)"),
-            "robt": ("security", "security_expert", "Robt (Security Expert)"),
-            "rob": ("security", "security_expert", "Rob (Security Expert)"),
-            "sara": ("requirements", "requirements_analyst", "Sara (Requirements Analyst)")
-        }
-        
-        # Check each agent name
-        for name, (route, agent_id, display_name) in agent_mappings.items():
-            if name in user_request_lower:
-                print(f"[ROUTE] ✅ HARDCODED: Found '{name}' → routing to {route}")
-                print(f"[ROUTE] 🎯 Setting called_agent to: {agent_id}")
-                print(f"[ROUTE] 👤 Agent: {display_name}")
-                state["called_agent"] = agent_id
-                return route
-        
-        # Check for team greetings
-        if any(word in user_request_lower for word in ["everyone", "everybody", "team", "all"]):
-            print("[ROUTE] 👥 TEAM GREETING DETECTED: Activating collaboration mode")
-            return "collaboration"
-        
-        # No match found - end workflow (DO NOT default to Sara!)
-        print(f"[ROUTE] ⚠️  NO AGENT DETECTED in: '{user_request_lower}'")
-        print("[ROUTE] Available: dave, marc, alex, jess, emma, robt, sara")
-        print("[ROUTE] 🛑 ENDING WORKFLOW - No default to Sara!")
-        return "end"
-
-        # Enhanced agent name detection patterns
-        agent_patterns = {
-            "sarah": ("requirements", "requirements_analyst"),
-            "sara": ("requirements", "requirements_analyst"),
-            "marcus": ("architecture", "software_architect"),
-            "marc": ("architecture", "software_architect"),
-            "alex": ("development", "developer"),
-            "alexander": ("development", "developer"),
-            "jessica": ("testing", "qa_tester"),
-            "jess": ("testing", "qa_tester"),
-            "david": ("deployment", "devops_engineer"),
-            "dave": ("deployment", "devops_engineer"),
-            "emily": ("management", "project_manager"),
-            "emma": ("management", "project_manager"),
-            "robert": ("security", "security_expert"),
-            "robt": ("security", "security_expert"),
-            "rob": ("security", "security_expert")
-        }
-
-        def _activate_agent(name_key: str) -> Optional[str]:
-            if name_key in agent_patterns:
-                route, agent_id = agent_patterns[name_key]
-                print(f"[ROUTE] Direct reference to {name_key} detected, routing to {route}")
-                state["called_agent"] = agent_id
-                # Ensure the directly addressed agent is treated as the requested target
-                if not requested_agents:
-                    state["requested_agents"] = [agent_id]
-                elif agent_id not in state["requested_agents"]:
-                    state["requested_agents"].insert(0, agent_id)
-                return route
-            return None
-
-        # PRIORITY 1: Team greetings ("Hi Everyone", "Hello Team", "Hi All", etc.)
-        team_greeting_patterns = [
-            r"^(hi|hello|hey|greetings|good morning|good afternoon)\s+(everyone|everybody|team|all|all agents|folks|guys)",
-            r"^(hi|hello|hey|greetings)\s+there\s+(everyone|team|all)"
-        ]
-        for pattern in team_greeting_patterns:
-            if re.search(pattern, user_request_lower):
-                print("[ROUTE] 👥 TEAM GREETING DETECTED: Activating collaboration mode")
-                print("[ROUTE] All agents will be available to respond")
-                print("[ROUTE] 🚀 RETURNING ROUTE: 'collaboration'")
-                print("="*80 + "\n")
-                return "collaboration"
-
-        # PRIORITY 2: Direct agent greetings ("Hi Marc", "Hello Jess!", etc.)
-        greeting_match = re.match(
-            r"^(hi|hello|hey|greetings|good morning|good afternoon|yo)[\s,@]+([a-z .'-]+)",
-            user_request_lower
-        )
-        if greeting_match:
-            raw_name = greeting_match.group(2).strip()
-            cleaned_name = re.split(r"[\s,!.?:;]+", raw_name)[0].strip("'\"-_")
-            
-            # Check if it's a team reference that slipped through
-            if cleaned_name in ['everyone', 'everybody', 'team', 'all', 'folks', 'guys']:
-                print("[ROUTE] 👥 TEAM REFERENCE DETECTED: Activating collaboration mode")
-                print("[ROUTE] 🚀 RETURNING ROUTE: 'collaboration'")
-                print("="*80 + "\n")
-                return "collaboration"
-            
-            route = _activate_agent(cleaned_name)
-            if route:
-                print(f"[ROUTE] ✅ DIRECT GREETING DETECTED: '{greeting_match.group(0)}' → {cleaned_name} → {route}")
-                print(f"[ROUTE] 🎯 called_agent set to: {state.get('called_agent')}")
-                print(f"[ROUTE] 📋 This is a DIRECT CALL - only this agent will respond")
-                print(f"[ROUTE] 🚀 RETURNING ROUTE: '{route}'")
-                print("="*80 + "\n")
-                return route
-            else:
-                print(f"[ROUTE] ⚠️  Greeting detected but agent name '{cleaned_name}' not recognized")
-                print(f"[ROUTE] Available agents: {list(agent_patterns.keys())}")
-
-        # PRIORITY 2: Direct single-word agent calls ("Marc", "@alex", "marcus:")
-        direct_name_match = re.match(r"^@?([a-z]+)[\s,!.?:;-]*$", user_request_lower)
-        if direct_name_match:
-            name_key = direct_name_match.group(1)
-            route = _activate_agent(name_key)
-            if route:
-                return route
+    @traced("route", {"route.entry": "workflow"})
+    @ROUTING_SECONDS.timed(entry="workflow")
+    def _route_entry_point(self, state: SDLCState) -> dict:
+        """Plan the turn once: a directly addressed agent goes to its node, a team call to collaboration, anything else to END"""
+        route_logger.debug("Routing %r (requested agents: %s)", state['user_request'], state.get("requested_agents", []))
 
-        # PRIORITY 3: Agent name appears at the start followed by punctuation ("Alex, can you...")
-        words = user_request_lower.split()
-        if words:
-            first_token = re.sub(r"[^a-z]", "", words[0])
-            route = _activate_agent(first_token)
-            if route:
-                return route
+        # Sets called_agent every turn, clearing any previous direct-call marker
+        route, called_agent = get_routing_cache().lookup("workflow", str(state["user_request"]), self._plan_entry_route)
+        record_route("workflow", route, [called_agent] if called_agent else [])
+        return {"route": route, "called_agent": called_agent}
 
-        # PRIORITY 4: Check for multiple agent mentions throughout the text
-        mentioned_agents = []
-        for name, (route, agent_id) in agent_patterns.items():
-            pattern = rf"\b{name}\b"
-            if re.search(pattern, user_request_lower):
-                mentioned_agents.append((name, route, agent_id))
+    def _route_from_entry(self, state: SDLCState) -> str:
+        """Follow the route route_entry planned"""
+        return state["route"]
 
-        print(f"[ROUTE] Mentioned agents: {[name for name, _, _ in mentioned_agents]}")
+    @staticmethod
+    def _plan_entry_route(message: str) -> Tuple[str, Optional[str]]:
+        """(route, directly called agent id) for a message; depends on nothing but its words"""
+        engine = get_routing_engine()
+        scan = engine.scan(message)
 
-        if len(mentioned_agents) > 1:
-            print("[ROUTE] Multiple agent mentions detected, routing to collaboration")
-            return "collaboration"
-        elif len(mentioned_agents) == 1:
-            name, route, agent_id = mentioned_agents[0]
-            # Direct agent mention - route to that agent only
-            # NOTE: Collaboration keywords are ONLY checked in team greetings (PRIORITY 1)
-            # Don't check for "team" or "everyone" here - user might be asking ABOUT the team
-            print(f"[ROUTE] Single agent mention '{name}' in context, routing to {route}")
-            state["called_agent"] = agent_id
-            return route
-
-        # Priority 5: If multiple agents are explicitly requested via UI, go to collaboration
-        if len(requested_agents) > 1:
-            print(f"[ROUTE] Multiple agents requested via UI ({len(requested_agents)}), routing to collaboration")
-            return "collaboration"
-        elif len(requested_agents) == 1:
-            # Single agent request - route directly to that agent
-            # User explicitly selected ONE agent, don't override with collaboration
-            agent = requested_agents[0]
-            print(f"[ROUTE] Single agent requested via UI: {agent}")
-            state["called_agent"] = agent
-            if agent == "requirements_analyst":
-                return "requirements"
-            elif agent == "software_architect":
-                return "architecture"
-            elif agent == "developer":
-                return "development"
-            elif agent == "qa_tester":
-                return "testing"
-            elif agent == "devops_engineer":
-                return "deployment"
-            elif agent == "project_manager":
-                return "management"
-            elif agent == "security_expert":
-                return "security"
-
-        # Priority 6: Route based on request content (fallback - only when no agents mentioned)
-        request = state["user_request"].lower()
-        if any(word in request for word in ["architecture", "design", "system", "structure"]):
-            return "architecture"
-        elif any(word in request for word in ["code", "implement", "develop", "build"]):
-            return "development"
-        elif any(word in request for word in ["test", "testing", "quality", "qa"]):
-            return "testing"
-        elif any(word in request for word in ["deploy", "deployment", "infrastructure", "devops"]):
-            return "deployment"
-        elif any(word in request for word in ["project", "planning", "manage", "timeline"]):
-            return "management"
-        elif any(word in request for word in ["security", "secure", "vulnerability"]):
-            return "security"
-        else:
-            # NO DEFAULT - if greeting detection failed, don't activate any agent
-            print("[ROUTE] ⚠️  No agent or domain detected - ending workflow")
-            print("[ROUTE] Message was:", state["user_request"])
-            return "end"
+        called = engine.called_agent(scan)
+        if called:
+            spec = engine.by_key[called]
+            route_logger.debug("Direct call to %s → routing to %s", spec.role, spec.route)
+            return spec.route, spec.role
+
+        if engine.is_team_call(scan):
+            route_logger.debug("TEAM GREETING DETECTED: Activating collaboration mode")
+            return "collaboration", None
+
+        # No match found - end workflow (DO NOT default to Sara!)
+        route_logger.debug("No agent detected in %r", message)
+        return "end", None
 
     def _route_next_step(self, state: SDLCState) -> str:
+        # A directly called agent has answered; collaboration would only call it again
+        if state.get("called_agent"):
+            return "end"
+
         # Priority 1: If specific agents are requested, use collaboration
         requested_agents = state.get("requested_agents", [])
         if len(requested_agents) >= 1:
             # Always use collaboration for agent requests
             return "collaboration"
         
-        # Priority 2: Route based on request content
-        request = state["user_request"].lower()
-        if any(word in request for word in ["architecture", "design", "system", "structure"]):
-            return "architecture"
-        elif any(word in request for word in ["code", "implement", "develop", "build"]):
-            return "development"
-        else:
-            return "collaboration"  # Default to collaboration
-
-    def _route_after_architecture(self, state: SDLCState) -> str:
-        request = state["user_request"].lower()
-
-        if any(word in request for word in ["security", "secure", "vulnerability"]):
-            return "security"
-        elif any(word in request for word in ["code", "implement", "develop"]):
-            return "development"
-        elif len(state.get("requested_agents", [])) > 1:
-            return "collaboration"
-        else:
-            return "end"
-
-    def _route_after_development(self, state: SDLCState) -> str:
-        request = state["user_request"].lower()
-
-        if any(word in request for word in ["test", "testing", "qa", "quality"]):
-            return "testing"
-        elif any(word in request for word in ["security", "secure"]):
-            return "security"
-        elif len(state.get("requested_agents", [])) > 1:
-            return "collaboration"
-        else:
-            return "end"
-
-    def _route_after_testing(self, state: SDLCState) -> str:
-        request = state["user_request"].lower()
-
-        if any(word in request for word in ["deploy", "deployment", "production"]):
-            return "deployment"
-        elif any(word in request for word in ["fix", "bug", "issue"]):
-            return "development"
-        elif len(state.get("requested_agents", [])) > 1:
-            return "collaboration"
-        else:
-            return "end"
-
-    def _route_after_deployment(self, state: SDLCState) -> str:
-        if len(state.get("requested_agents", [])) > 1:
-            return "collaboration"
-        else:
-            return "management"
-
-    def _route_after_security(self, state: SDLCState) -> str:
-        request = state["user_request"].lower()
-
-        if any(word in request for word in ["fix", "implement", "code"]):
-            return "development"
-        elif any(word in request for word in ["test", "testing"]):
-            return "testing"
-        elif len(state.get("requested_agents", [])) > 1:
-            return "collaboration"
-        else:
-            return "end"
-
-    def _route_after_management(self, state: SDLCState) -> str:
-        if len(state.get("requested_agents", [])) > 1:
-            return "collaboration"
-        else:
-            return "end"
\ No newline at end of file
+        # Priority 2: Route to whoever the request is about once requirements are done
+        engine = get_routing_engine()
+        for agent_key in get_intent_classifier().select(engine.scan(state["user_request"]).tokens):
+            route = engine.by_key[agent_key].route
+            if route != "requirements":
+                return route
+        return "collaboration"  # Default to collaboration
@@ -0,0 +1,179 @@
+# workflows/turn_checkpointer.py
+"""
+Checkpoints for workflow turns, so a turn retried with the same turn ID skips the agents
+that already finished.
+
+LangGraph records each superstep's state and each finished task's writes (one per agent
+in a collaboration fan-out). Resuming a thread re-runs only the tasks without writes.
+Every turn is its own thread, keyed by session and turn ID.
+
+TurnCheckpointer is LangGraph's MemorySaver with every checkpoint and write also stored in
+the session store's Redis, so another worker can resume a turn after a crash. A thread is
+read back from Redis whenever a run starts. Without Redis it stays in process memory,
+which still covers dropped connections.
+
+    TURN_CHECKPOINTS=session    "session": Redis when the session store has it, else memory;
+                                "memory": this process only; "none": turns are not resumable
+    TURN_CHECKPOINT_TTL=3600    seconds a turn stays resumable
+"""
+import base64
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import redis
+from langgraph.checkpoint.memory import MemorySaver
+
+from utils.logging_config import get_logger
+from utils.metrics import record_error
+
+logger = get_logger("checkpoint")
+
+MODE = os.getenv("TURN_CHECKPOINTS", "session").lower()
+TTL = int(os.getenv("TURN_CHECKPOINT_TTL", 3600))
+
+
+def _encode(entry) -> str:
+    """JSON for a stored checkpoint or write tuple; serialized payloads are (type, bytes) pairs"""
+    return json.dumps([[item[0], base64.b64encode(item[1]).decode()] if isinstance(item, tuple) else item
+                       for item in entry])
+
+
+def _decode(raw) -> tuple:
+    return tuple((item[0], base64.b64decode(item[1])) if isinstance(item, list) else item
+                 for item in json.loads(raw))
+
+
+class TurnCheckpointer(MemorySaver):
+    """MemorySaver that writes through to Redis (when given a client) and forgets turns after `ttl` seconds"""
+
+    def __init__(self, redis_client: Optional[redis.Redis] = None, ttl: int = TTL):
+        super().__init__()
+        self.redis = redis_client
+        self.ttl = ttl
+        self._last_write: "OrderedDict[str, float]" = OrderedDict()  # thread ID -> monotonic time, oldest first
+        self._lock = threading.Lock()  # LangGraph's async API runs these methods in executor threads
+
+    @staticmethod
+    def _key(thread_id: str) -> str:
+        return f"turn_checkpoint:{thread_id}"
+
+    def get_tuple(self, config):
+        self._load(config["configurable"]["thread_id"])
+        return super().get_tuple(config)
+
+    def list(self, config, **kwargs):
+        if config:
+            self._load(config["configurable"]["thread_id"])
+        return super().list(config, **kwargs)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        saved = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = saved["configurable"]["thread_id"]
+        checkpoint_ns = saved["configurable"]["checkpoint_ns"]
+        checkpoint_id = saved["configurable"]["checkpoint_id"]
+        self._store(thread_id, {
+            json.dumps(["c", checkpoint_ns, checkpoint_id]): _encode(self.storage[thread_id][checkpoint_ns][checkpoint_id])
+        })
+        return saved
+
+    def put_writes(self, config, writes, task_id):
+        super().put_writes(config, writes, task_id)
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        task_writes = self.writes[(thread_id, checkpoint_ns, checkpoint_id)]
+        self._store(thread_id, {
+            json.dumps(["w", checkpoint_ns, checkpoint_id, *inner_key]): _encode(value)
+            for inner_key, value in task_writes.items() if inner_key[0] == task_id
+        })
+
+    def _store(self, thread_id: str, fields: dict) -> None:
+        with self._lock:
+            self._last_write[thread_id] = time.monotonic()
+            self._last_write.move_to_end(thread_id)
+            self._evict()
+        if self.redis is None or not fields:
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.hset(self._key(thread_id), mapping=fields)
+            pipe.expire(self._key(thread_id), self.ttl)
+            pipe.execute()
+        except Exception as e:
+            # The turn still runs; it just cannot be resumed on another worker
+            logger.warning("Could not store checkpoint for %s: %s", thread_id, e)
+            record_error("checkpoint", e)
+
+    def _load(self, thread_id: str) -> None:
+        """Replace this process's copy of a turn with Redis's, which another worker may have advanced"""
+        if self.redis is None:
+            return
+        try:
+            fields = self.redis.hgetall(self._key(thread_id))
+        except Exception as e:
+            logger.warning("Could not load checkpoint for %s: %s", thread_id, e)
+            record_error("checkpoint", e)
+            return
+        if not fields:
+            return
+        with self._lock:
+            self._forget(thread_id)
+            for raw_key, raw_value in fields.items():
+                kind, checkpoint_ns, checkpoint_id, *inner_key = json.loads(raw_key)
+                if kind == "c":
+                    self.storage[thread_id][checkpoint_ns][checkpoint_id] = _decode(raw_value)
+                else:
+                    self.writes[(thread_id, checkpoint_ns, checkpoint_id)][tuple(inner_key)] = _decode(raw_value)
+            self._last_write[thread_id] = time.monotonic()
+            self._last_write.move_to_end(thread_id)
+
+    def _evict(self) -> None:
+        """Drop turns nobody wrote to for `ttl` seconds (Redis expires its copies itself)"""
+        cutoff = time.monotonic() - self.ttl
+        while self._last_write:
+            thread_id, written = next(iter(self._last_write.items()))
+            if written > cutoff:
+                break
+            del self._last_write[thread_id]
+            self._forget(thread_id)
+
+    def _forget(self, thread_id: str) -> None:
+        self.storage.pop(thread_id, None)
+        for outer_key in [key for key in self.writes if key[0] == thread_id]:
+            del self.writes[outer_key]
+
+
+def _session_redis() -> Optional[redis.Redis]:
+    """A binary client for the session store's Redis, or None when it is not reachable"""
+    try:
+        client = redis.Redis(
+            host=os.getenv("REDIS_HOST", "localhost"),
+            port=int(os.getenv("REDIS_PORT", 6379)),
+            db=int(os.getenv("REDIS_DB", 0)),
+            socket_connect_timeout=1,
+            socket_timeout=1
+        )
+        client.ping()
+        return client
+    except Exception:
+        return None
+
+
+_checkpointer: Optional[TurnCheckpointer] = None
+_resolved = False
+
+
+def get_turn_checkpointer() -> Optional[TurnCheckpointer]:
+    """The process-wide checkpointer, or None when TURN_CHECKPOINTS=none"""
+    global _checkpointer, _resolved
+    if not _resolved:
+        _resolved = True
+        if MODE != "none":
+            client = _session_redis() if MODE == "session" else None
+            _checkpointer = TurnCheckpointer(client)
+            logger.info("Turn checkpoints in %s (resumable for %ss)", "Redis" if client else "memory", TTL)
+    return _checkpointer